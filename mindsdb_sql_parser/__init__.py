@@ -1,10 +1,21 @@
 import re
-from collections import defaultdict
+import os
+import codecs
+import pickle
+import itertools
+from collections import defaultdict, deque
+from concurrent import futures
 
 from sly.lex import Token
 
 from mindsdb_sql_parser.exceptions import ParsingException
 from mindsdb_sql_parser.ast import *
+from mindsdb_sql_parser.cache import ParseCache, TemplateParseCache
+from mindsdb_sql_parser.fingerprint import fingerprint, Fingerprint
+from mindsdb_sql_parser.session import ParseSession
+from mindsdb_sql_parser.completion import complete, Completion
+from mindsdb_sql_parser.buffer import StatementBuffer, statement_status, is_complete, COMPLETE, INCOMPLETE, INVALID
+from mindsdb_sql_parser.utils import unquote, LITERAL_TOKENS
 
 
 class ErrorHandling:
@@ -105,29 +116,10 @@ class ErrorHandling:
         # find error index
         error_index = None
         for i, token in enumerate(self.tokens):
-            if token is self.bad_token :
+            if token is self.bad_token or self._same_token(token, self.bad_token):
                 error_index = i
 
-        expected = {}  # value: token
-
-        for token_name in self.expected_tokens:
-            value = getattr(self.lexer, token_name, None)
-            if token_name == 'ID':
-                # a lot of other tokens could be ID
-                expected = {'[identifier]': token_name}
-                break
-            elif token_name in ('FLOAT', 'INTEGER'):
-                expected['[number]'] = token_name
-
-            elif token_name in ('DQUOTE_STRING', 'QUOTE_STRING'):
-                expected['[string]'] = token_name
-
-            elif isinstance(value, str):
-                value = value.replace('\\b', '').replace('\\', '')
-
-                # doesn't content regexp
-                if '\\s' not in value and '|' not in value:
-                    expected[value] = token_name
+        expected = self.expected_values()
 
         suggestions = []
         if len(expected) == 1:
@@ -140,7 +132,17 @@ class ErrorHandling:
                 # if this is the end of query, just show next expected keywords
                 return list(expected.keys())
 
-            # not every suggestion satisfy the end of the query. we have to check if it works
+            # not every suggestion satisfy the end of the query. we have to check if it works.
+            # the candidates are checked by LR tables from the states of the parser before
+            # the bad token (add) and before the previous token (replace)
+            tokens_after = self.tokens[error_index:] + [None]
+            if error_index > 0:
+                states_replace = self.parser.recognize(self.tokens[:error_index - 1])
+                states_add = self.parser.recognize([self.tokens[error_index - 1]], states_replace)
+            else:
+                states_replace = None
+                states_add = self.parser.recognize([])
+
             for value, token_name in expected.items():
                 # make up a token
                 token = Token()
@@ -151,30 +153,90 @@ class ErrorHandling:
                 token.lineno = 0
 
                 # try to add token
-                tokens2 = self.tokens[:error_index] + [token] + self.tokens[error_index:]
-                if self.query_is_valid(tokens2):
+                if self.parser.recognize([token] + tokens_after, states_add) is True:
                     suggestions.append(value)
                     continue
 
                 # try to replace token
-                tokens2 = self.tokens[:error_index - 1] + [token] + self.tokens[error_index:]
-                if self.query_is_valid(tokens2):
+                if states_replace is not None and self.parser.recognize([token] + tokens_after, states_replace) is True:
                     suggestions.append(value)
                     continue
 
         return suggestions
 
-    def query_is_valid(self, tokens):
-        # try to parse list of tokens
+    # (lexer class, expected tokens): {displayed value: token name}
+    _expected_cache = {}
 
-        ast = self.parser.parse(iter(tokens))
-        return ast is not None
+    def expected_values(self):
+        # expected tokens of the parser state are converted to displayed values once
+        key = (type(self.lexer), ' '.join(self.expected_tokens))
+        expected = self._expected_cache.get(key)
+        if expected is not None:
+            return expected
 
+        expected = {}  # value: token
+        for token_name in self.expected_tokens:
+            if token_name == 'ID':
+                # a lot of other tokens could be ID
+                expected = {'[identifier]': token_name}
+                break
 
-def parse_sql(sql, dialect=None):
+            value = self.token_value(self.lexer, token_name)
+            if value is not None:
+                expected[value] = token_name
+
+        self._expected_cache[key] = expected
+        return expected
+
+    @staticmethod
+    def token_value(lexer, token_name):
+        # displayed value of the token or None if it can't be displayed
+        if token_name == 'ID':
+            return '[identifier]'
+        if token_name in ('FLOAT', 'INTEGER'):
+            return '[number]'
+        if token_name in ('DQUOTE_STRING', 'QUOTE_STRING'):
+            return '[string]'
+
+        value = getattr(lexer, token_name, None)
+        if isinstance(value, str):
+            # words of keyword are separated by spaces: GROUP BY
+            value = value.replace('[\\s]+', ' ').replace('\\b', '').replace('\\', '')
+
+            # doesn't content regexp
+            if '|' not in value:
+                return value
+        return None
+
+    @staticmethod
+    def _same_token(token1, token2):
+        # tokens of TokenStream are created on access: compare positions
+        if token2 is None:
+            return False
+        return token1.index == token2.index and token1.end == token2.end and token1.type == token2.type
+
+
+def parse_sql(sql, dialect=None, columnar=False, flatten=False):
+    """
+    Parse the sql statement to AST.
+
+    Rows of plain INSERT ... VALUES (only literals in values) are read from the tokens
+    without the parser. If `columnar` is True the values of such INSERT are stored by
+    columns in ColumnarValues, Constant nodes are created only on access.
+    If `flatten` is True chains of AND, OR, || and UNION are merged to n-ary nodes (see ast.flatten)
+    """
+    return _parse_sql(sql, columnar=columnar, flatten=flatten)
+
+
+def _parse_sql(sql, columnar=False, flatten=False, tokens=None, text=None):
+    """
+    parse_sql and the statements of parse_script. `tokens` of the statement can be lexed by the caller,
+    their positions are in `text`. Plain INSERT and the statements which are not parsed from these tokens
+    are lexed again: the result and the error message are the same as for the separate statement
+    """
     from mindsdb_sql_parser.lexer import MindsDBLexer
     from mindsdb_sql_parser.parser import MindsDBParser
-    lexer, parser = MindsDBLexer(), MindsDBParser()
+    parser = MindsDBParser()
 
     def semicolon_checker(generator):
         """
@@ -193,8 +255,24 @@ def parse_sql(sql, dialect=None):
                 buffer = []
             yield token
 
-    tokens = lexer.tokenize(sql)
-    ast = parser.parse(semicolon_checker(tokens))
+    if tokens is not None and not _INSERT_RE.match(sql):
+        try:
+            ast = parser.parse(semicolon_checker(iter(tokens)), text=text)
+        except Exception:
+            ast = None
+        if ast is None:
+            return _parse_sql(sql, columnar=columnar, flatten=flatten)
+    else:
+        lexer = MindsDBLexer()
+        if _INSERT_RE.match(sql):
+            tokens = lexer.tokenize_compact(sql)
+            ast = _parse_plain_insert(tokens, parser, columnar)
+            if ast is not None:
+                return ast
+            parser = MindsDBParser()
+        else:
+            tokens = lexer.tokenize(sql)
+        ast = parser.parse(semicolon_checker(tokens), text=sql)
 
     if ast is None:
 
@@ -203,4 +281,341 @@ def parse_sql(sql, dialect=None):
 
         raise ParsingException(message)
 
+    if flatten:
+        from mindsdb_sql_parser.ast.visitor import flatten as flatten_tree
+        flatten_tree(ast)
     return ast
+
+
+_INSERT_RE = re.compile(r'\s*insert\b', re.IGNORECASE)
+
+# type of literal token: conversion of the value (the same as in the parser)
+_INSERT_LITERALS = {
+    **LITERAL_TOKENS,
+    'DQUOTE_STRING': lambda value: unquote(value, is_double_quoted=True).strip('\"'),
+    'NULL': lambda value: None,
+    'TRUE': lambda value: True,
+    'FALSE': lambda value: False,
+}
+
+
+def _parse_plain_insert(stream, parser, columnar):
+    """
+    Parse INSERT with rows of literals: the rows are scanned in one pass over the types of tokens.
+    Only the statement with one row of every combination of types of literals is parsed: the values
+    of these rows are checked against the parser's result, the other rows are converted in the same way.
+    Returns None if the statement is not plain INSERT
+    """
+    types, starts, ends, text = stream.types, stream.starts, stream.ends, stream.text
+    type_ids = stream.type_ids
+    convert = {type_ids[name]: func for name, func in _INSERT_LITERALS.items()}
+    numbers = {type_ids['INTEGER'], type_ids['FLOAT']}
+    lparen, rparen, comma = type_ids['LPAREN'], type_ids['RPAREN'], type_ids['COMMA']
+    minus, semicolon = type_ids['MINUS'], type_ids['SEMICOLON']
+
+    count = len(types)
+    while count and types[count - 1] == semicolon:
+        count -= 1
+
+    values_id = type_ids['VALUES']
+    i = next((i for i in range(min(count, 64)) if types[i] == values_id), None)
+    if i is None:
+        return None
+
+    # row: LPAREN literal (COMMA literal)* RPAREN, rows are separated by COMMA
+    columns = None
+    # types of tokens of the row: (start, end, index) of the first row with them
+    samples = {}
+    i += 1
+    while i < count:
+        if types[i] != lparen:
+            return None
+        row = []
+        row_start = i
+        while True:
+            i += 1
+            if i + 1 >= count:
+                return None
+            type_id = types[i]
+            if type_id == minus:
+                i += 1
+                if types[i] not in numbers:
+                    return None
+                value = -convert[types[i]](text[starts[i]:ends[i]])
+            elif type_id in convert:
+                value = convert[type_id](text[starts[i]:ends[i]])
+            else:
+                return None
+            row.append(value)
+
+            i += 1
+            if i == count:
+                return None
+            if types[i] == rparen:
+                break
+            if types[i] != comma:
+                return None
+
+        if columns is None:
+            columns = [[value] for value in row]
+        elif len(row) != len(columns):
+            return None
+        else:
+            for column, value in zip(columns, row):
+                column.append(value)
+        kinds = types[row_start:i + 1].tobytes()
+        if kinds not in samples:
+            samples[kinds] = (row_start, i, len(columns[0]) - 1)
+
+        i += 1
+        if i < count:
+            if types[i] != comma:
+                return None
+            i += 1
+            if i == count:
+                return None
+
+    if columns is None:
+        return None
+
+    # the statement with the sample rows, the rows after the first one are preceded by COMMA
+    samples = list(samples.values())
+    tokens = stream[:samples[0][1] + 1]
+    for start, end, _ in samples[1:]:
+        tokens += stream[start - 1:end + 1]
+    ast = parser.parse(iter(tokens), text=stream.text)
+    if not isinstance(ast, Insert) or ast.values is None or len(ast.values) != len(samples):
+        return None
+    # the sample rows are converted in the same way by the parser
+    for (_, _, index), values in zip(samples, ast.values):
+        row = [ColumnarValues.to_constant(column[index]).to_tree() for column in columns]
+        if [value.to_tree() for value in values] != row:
+            return None
+
+    ast.is_plain = True
+    if columnar:
+        ast.values = ColumnarValues(columns)
+    else:
+        ast.values = [
+            [ColumnarValues.to_constant(value) for value in row]
+            for row in zip(*columns)
+        ]
+    return ast
+
+
+def parse_many(sql_iterable, workers=None, chunksize=100, ordered=True):
+    """
+    Parse many sql statements in the pool of processes.
+
+    The statements are sent to the workers by chunks of `chunksize`, the iterable
+    is consumed lazily. `workers` is the number of processes, cpu count by default.
+
+    Yields (query, index) for every statement: the AST node or the exception raised
+    by parse_sql, and the index of the statement in the iterable. Results are
+    yielded in the order of the statements or, if `ordered` is False, in the order
+    of completion of the chunks
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    sql_iterable = iter(sql_iterable)
+
+    with futures.ProcessPoolExecutor(workers, initializer=_init_parse_worker) as executor:
+        try:
+            pending = deque()
+            start = 0
+            while True:
+                # no more than two chunks per worker are waiting
+                while len(pending) < workers * 2:
+                    chunk = list(itertools.islice(sql_iterable, chunksize))
+                    if not chunk:
+                        break
+                    pending.append((start, chunk, executor.submit(_parse_chunk, chunk)))
+                    start += len(chunk)
+
+                if not pending:
+                    return
+
+                if ordered:
+                    item = pending.popleft()
+                else:
+                    done, _ = futures.wait([future for _, _, future in pending], return_when=futures.FIRST_COMPLETED)
+                    item = next(item for item in pending if item[2] in done)
+                    pending.remove(item)
+                start_index, chunk, future = item
+
+                for i, query in enumerate(pickle.loads(future.result())):
+                    if query is _NotTransferred:
+                        # the result can't be pickled by the worker: it is parsed here
+                        query = _parse_one(chunk[i])
+                    yield query, start_index + i
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
+class _NotTransferred:
+    # the marker of the result which can't be sent from the worker: too deep tree, unpicklable error
+    pass
+
+
+def _init_parse_worker():
+    # LR tables are loaded once per process
+    import mindsdb_sql_parser.parser  # noqa
+
+
+def _parse_one(sql):
+    try:
+        return parse_sql(sql)
+    except Exception as e:
+        return e
+
+
+def _parse_chunk(sqls):
+    results = [_parse_one(sql) for sql in sqls]
+
+    # The whole chunk is pickled at once: classes and attribute names are written once.
+    # If it fails (unpicklable error, too deep tree) the results are checked one by one
+    try:
+        return pickle.dumps(results, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        pass
+    for i, result in enumerate(results):
+        try:
+            pickle.loads(pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            results[i] = _NotTransferred
+    return pickle.dumps(results, pickle.HIGHEST_PROTOCOL)
+
+
+# Closes any string, comment or quoted identifier left open at the end of the buffer:
+# such a token ends after the buffer and the script has to be read further
+_BUFFER_END = '\n*/\'"`'
+
+
+def parse_script(source, dialect=None, chunk_size=1024 * 1024, encoding='utf-8'):
+    """
+    Parse the script of sql statements delimited by semicolons.
+
+    Statements are split by SEMICOLON tokens outside of parentheses and by the ones in parentheses
+    which the parser doesn't accept at their place (not in a raw query body), the source
+    (str, text or binary file-like object, mmap) is read and tokenized by chunks.
+
+    Yields (statement, span) for every statement: the AST node or the exception raised
+    by the parsing of the statement (ParsingException, LexError, ...), and
+    (start, end) positions of the statement in the source: offsets of characters for
+    str and text files, offsets of bytes for binary files and mmap.
+    Statements are parsed as by parse_sql
+    """
+    from mindsdb_sql_parser.lexer import MindsDBLexer
+    from mindsdb_sql_parser.parser import MindsDBParser
+    lexer = MindsDBLexer()
+    parser = MindsDBParser()
+
+    def lex_error(token):
+        # the statement will be parsed again to get the error message
+        lexer.index += 1
+        return token
+    lexer.error = lex_error
+
+    binary = False
+    if isinstance(source, str):
+        read = None
+    else:
+        decoder = codecs.getincrementaldecoder(encoding)()
+
+        def read(size):
+            # returns None at the end of the source
+            nonlocal binary
+            chunk = source.read(size)
+            if isinstance(chunk, str):
+                return chunk or None
+            binary = True
+            if not chunk:
+                decoder.decode(b'', final=True)
+                return None
+            return decoder.decode(chunk)
+
+    text = source if read is None else ''
+    eof = read is None
+    offset = 0  # position of the buffer in the source
+    lineno = 1
+    # the last position in the buffer which was converted to the position in the source
+    cursor, cursor_offset = 0, 0
+
+    def position(index):
+        # position of the character of the buffer in the source, the positions are requested in ascending order
+        nonlocal cursor, cursor_offset
+        if binary:
+            cursor_offset += len(text[cursor:index].encode(encoding))
+        else:
+            cursor_offset += index - cursor
+        cursor = index
+        return offset + cursor_offset
+    while True:
+        if not eof:
+            # the size of the unfinished statement at least: it is tokenized again
+            chunk = read(max(chunk_size, len(text)))
+            if chunk is None:
+                eof = True
+            else:
+                text += chunk
+        size = len(text)
+
+        # the position of the current statement and its line number
+        start = 0
+        start_lineno = lineno
+        statement, depth, error = [], 0, False
+        # states of the parser after the first `recognized` tokens of the statement
+        states, recognized = [0], 0
+        for token in lexer.tokenize(text if eof else text + _BUFFER_END, lineno=lineno):
+            if token.end > size:
+                break
+
+            if token.type == 'SEMICOLON' and depth > 0:
+                # the semicolon in parentheses doesn't end the statement only if the parser accepts it there:
+                # the body of raw query "create view v from db (select 1; select 2)"
+                if states is not None:
+                    states = parser.recognize(statement[recognized:], states)
+                    recognized = len(statement)
+                if states is None or parser.recognize([token], states) is None:
+                    depth = 0
+
+            if token.type == 'SEMICOLON' and depth == 0:
+                if statement:
+                    span = position(statement[0].index), position(statement[-1].end)
+                    yield _parse_statement(statement, error, text), span
+                start = token.end
+                start_lineno = token.lineno
+                statement, error = [], False
+                states, recognized = [0], 0
+                continue
+
+            if token.type == 'LPAREN':
+                depth += 1
+            elif token.type == 'RPAREN' and depth > 0:
+                depth -= 1
+            elif token.type == 'ERROR':
+                error = True
+            statement.append(token)
+
+        if eof:
+            if statement:
+                span = position(statement[0].index), position(statement[-1].end)
+                yield _parse_statement(statement, error, text), span
+            return
+
+        # keep the unfinished statement and read more
+        lineno = start_lineno
+        offset = position(start)
+        cursor, cursor_offset = 0, 0
+        text = text[start:]
+
+
+def _parse_statement(tokens, error, text):
+    sql = text[tokens[0].index:tokens[-1].end]
+    try:
+        if error:
+            # the statement is lexed again to get the same error as from parse_sql
+            return _parse_sql(sql)
+        return _parse_sql(sql, tokens=tokens, text=text)
+    except Exception as e:
+        return e
@@ -15,5 +15,6 @@ from .delete import *
 from .drop import *
 from .create import *
 from .variable import *
+from .visitor import walk, iter_children, Visitor, Transformer, flatten
 
 from .mindsdb.latest import Latest
@@ -1,10 +1,52 @@
 import copy
+import datetime as dt
+import io
+from collections.abc import Sequence
+from decimal import Decimal
 
 from mindsdb_sql_parser.exceptions import ParsingException
-from mindsdb_sql_parser.utils import to_single_line
+
+# value of the attribute which is not set
+_MISSING = object()
+
+# values which are not changed: they are not copied by ASTNode.copy()
+_ATOMIC = frozenset((str, int, float, bool, type(None), bytes, Decimal, dt.date, dt.datetime, dt.time, dt.timedelta))
+
+# functions which create the copy of the node, for every class (see _make_clone)
+_clones = {}
+
+# classes of the frozen nodes: subclasses which don't allow to change the attributes (see freeze)
+_frozen_classes = {}
 
 
 class ASTNode:
+    # _hash is set by freeze(), _sql is rendered sql of the frozen node (see to_string)
+    __slots__ = ('alias', 'parentheses', '_hash', '_sql')
+
+    # pickle and copy save the attributes from __slotnames__ (without _hash and _sql, see _set_fields).
+    # the size of the object is checked against them unless the arguments of __new__ are given
+    __getnewargs__ = staticmethod(tuple)
+
+    # attributes which are not compared by __eq__: they are derived from the other attributes
+    _not_compared = ()
+
+    # attributes which are compared by the sql of the node: the nodes which differ only in them are equal
+    # if they are rendered the same (quotes which are not required, flags which are not rendered)
+    _compared_by_sql = ()
+
+    # attributes which are usually not set (it is faster to copy them with getattr)
+    _optional = ()
+
+    # attributes which don't contain nodes: they are skipped by the traversal (see visitor.py)
+    _not_children = ()
+
+    # frozen nodes of the class are not copied by copy()
+    _share_frozen = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _set_fields(cls)
+
     def __init__(self, alias=None, parentheses=False):
         self.alias = alias
         self.parentheses = parentheses
@@ -31,22 +73,388 @@ class ASTNode:
         pass
 
     def to_string(self, alias=True):
-        return self.maybe_add_alias(self.maybe_add_parentheses(self.get_string()), alias=alias)
+        if not (alias and self._render_parts):
+            return self.maybe_add_alias(self.maybe_add_parentheses(self.get_string()), alias=alias)
+
+        # the frozen tree can't be changed: its sql is rendered once
+        sql = getattr(self, '_sql', None)
+        if sql is None:
+            sql = self.maybe_add_alias(self.maybe_add_parentheses(self.get_string()))
+            if hasattr(self, '_hash'):
+                object.__setattr__(self, '_sql', sql)
+        return sql
+
+    def get_string_parts(self):
+        """
+        Parts of get_string(): strings and child nodes which are rendered as their to_string().
+        Classes which define it render get_string() by render_parts(): without recursion into the children
+        """
+        yield self.get_string()
+
+    def render_parts(self):
+        # get_string() from get_string_parts()
+        parts = []
+        _render(self.get_string_parts(), parts.append)
+        return ''.join(parts)
+
+    def render(self, stream=None):
+        """
+        Writes to_string() of the node to the stream (object with write method) by fragments.
+        The tree is rendered without recursion (for the classes which have get_string_parts).
+        Returns the string if the stream is not given
+        """
+        if stream is None:
+            stream = io.StringIO()
+            _render(iter([self]), stream.write)
+            return stream.getvalue()
+        _render(iter([self]), stream.write)
+
+    def copy(self, share_frozen=False):
+        """
+        Copies the tree. Values which are not changed (strings, numbers, frozen constants) are shared with
+        the original tree. With share_frozen=True the frozen subtrees are shared too (they must not be changed).
+        The copy of the node is created by the function generated from the attributes of its class,
+        the tree is copied without recursion
+        """
+        stack = []
+        # lists which are converted to tuples after their items are copied
+        tuples = []
+        root = _get_clone(type(self))(self, stack)
+        while stack:
+            value, target, key = stack.pop()
+            cls = value.__class__
+            if isinstance(value, ASTNode):
+                if (share_frozen or cls._share_frozen) and hasattr(value, '_hash'):
+                    new = value
+                else:
+                    clone = _clones.get(cls)
+                    if clone is None:
+                        clone = _get_clone(cls)
+                    new = clone(value, stack)
+            elif cls is list or cls is tuple or cls is _FrozenList:
+                new = list(value)
+                for i, item in enumerate(value):
+                    if item.__class__ not in _ATOMIC:
+                        stack.append((item, new, i))
+                if cls is tuple:
+                    tuples.append((new, target, key))
+            elif cls is dict or cls is _FrozenDict:
+                new = dict(value)
+                for name, item in value.items():
+                    if item.__class__ not in _ATOMIC:
+                        stack.append((item, new, name))
+            else:
+                new = copy.deepcopy(value)
 
-    def copy(self):
-        return copy.deepcopy(self)
+            if target.__class__ is list or target.__class__ is dict:
+                target[key] = new
+            else:
+                setattr(target, key, new)
+
+        # nested tuples are after their parents
+        for items, target, key in reversed(tuples):
+            if target.__class__ is list or target.__class__ is dict:
+                target[key] = tuple(items)
+            else:
+                setattr(target, key, tuple(items))
+        return root
+
+    def __deepcopy__(self, memo):
+        return self.copy()
 
     def __str__(self):
         return self.to_string()
 
     def __eq__(self, other):
-        if isinstance(other, ASTNode):
-            return self.to_tree() == other.to_tree() and to_single_line(str(self)) == to_single_line(str(other))
-        else:
-            return False
+        # the trees have the same classes of nodes and the same values of attributes,
+        # lists and tuples are equal if they have equal items
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if a is b:
+                continue
+            if isinstance(a, ASTNode):
+                if type(a) is not type(b) and (
+                    not isinstance(b, ASTNode) or a._node_class is not b._node_class
+                ):
+                    return False
+                hash_a, hash_b = getattr(a, '_hash', None), getattr(b, '_hash', None)
+                if hash_a is not None and hash_b is not None and hash_a != hash_b:
+                    return False
+                for name in type(a)._fields:
+                    stack.append((getattr(a, name, _MISSING), getattr(b, name, _MISSING)))
+                if any(
+                    getattr(a, name, _MISSING) != getattr(b, name, _MISSING) for name in type(a)._compared_by_sql
+                ) and a.to_string() != b.to_string():
+                    return False
+            elif _is_sequence(a):
+                if not _is_sequence(b) or len(a) != len(b):
+                    return False
+                stack.extend(zip(a, b))
+            elif isinstance(a, dict):
+                if not isinstance(b, dict) or a.keys() != b.keys():
+                    return False
+                stack.extend((value, b[key]) for key, value in a.items())
+            elif type(a) is not type(b) or a != b:
+                return False
+        return True
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            raise TypeError(f'unhashable AST node: {type(self).__name__}, use freeze()') from None
+
+    def freeze(self):
+        """
+        Makes the tree hashable: the hash is computed for every node of the tree and stored in it.
+        Attributes of the frozen nodes can't be changed (AttributeError), their lists and dicts are replaced
+        by the ones which can't be changed (TypeError). to_string() of the frozen nodes (which contain other
+        nodes) is cached. Copies of the tree (copy(), pickle) are not frozen.
+
+        The class of the node is replaced by its frozen subclass with the same name: isinstance(node, Select)
+        is true, `type(node) is Select` is not
+        """
+        # nodes of the tree, parents before children
+        nodes = []
+        stack = [self]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, ASTNode):
+                if not hasattr(value, '_hash'):
+                    nodes.append(value)
+                    stack.extend(getattr(value, name, _MISSING) for name in type(value)._fields)
+            elif _is_sequence(value):
+                stack.extend(value)
+            elif isinstance(value, dict):
+                stack.extend(value.values())
+
+        for node in reversed(nodes):
+            cls = type(node)
+            for name in cls.__slotnames__:
+                value = getattr(node, name, _MISSING)
+                if value.__class__ in _CONTAINERS:
+                    setattr(node, name, _freeze_value(value))
+            node._hash = hash((cls, tuple(
+                _hash_value(getattr(node, name, _MISSING)) for name in cls._fields
+            )))
+            node.__class__ = _frozen_classes.get(cls) or _make_frozen_class(cls)
+        return self
 
     def __repr__(self):
         sql = self.to_string().replace('\n', ' ')
         if len(sql) > 500:
             sql = sql[:500] + '...'
         return f'{self.__class__.__name__}:<{sql}>'
+
+
+def _set_fields(cls):
+    # attributes of the node: __slots__ of the class and its bases.
+    # __slotnames__ is used by pickle and copy: hash and sql of frozen node are not copied,
+    # _fields are compared by __eq__ (without _not_compared and _compared_by_sql), _children are traversed by walk() and Visitor,
+    # _render_parts: get_string is made from get_string_parts (see render),
+    # _node_class: the class of the node which is not frozen (see freeze)
+    names = []
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get('__slots__', ()):
+            if name not in ('_hash', '_sql') and name not in names:
+                names.append(name)
+    cls.__slotnames__ = names
+    cls._node_class = cls
+    cls._fields = tuple(
+        name for name in names if name not in cls._not_compared and name not in cls._compared_by_sql
+    )
+    cls._children = tuple(name for name in names if name not in cls._not_children)
+
+    # get_string is rendered from get_string_parts if the class defines (or inherits) both of them,
+    # and they are not overridden by other methods of the subclasses
+    def defined_in(name):
+        return next(klass for klass in cls.__mro__ if name in klass.__dict__)
+    get_string = defined_in('get_string')
+    cls._render_parts = (
+        defined_in('get_string_parts') is get_string and get_string is not ASTNode
+        and defined_in('to_string') is ASTNode
+    )
+
+
+def _iter_parts(node, alias=True):
+    # parts of to_string() of the node
+    if not node._render_parts:
+        yield node.to_string(alias=alias)
+        return
+    if node.parentheses:
+        yield '('
+    yield from node.get_string_parts()
+    if node.parentheses:
+        yield ')'
+    if alias and node.alias:
+        yield f' AS {node.alias.to_string(alias=False)}'
+
+
+def _render(parts, write):
+    # the stack of the iterators of the parts of the nodes which are being rendered
+    stack = [parts]
+    while stack:
+        for part in stack[-1]:
+            if part.__class__ is str:
+                write(part)
+            elif part._render_parts:
+                sql = getattr(part, '_sql', None)
+                if sql is not None:
+                    write(sql)
+                    continue
+                if part.parentheses or part.alias:
+                    stack.append(_iter_parts(part))
+                else:
+                    stack.append(part.get_string_parts())
+                break
+            else:
+                write(part.to_string())
+        else:
+            stack.pop()
+
+
+def _make_clone(cls):
+    # the function copies the attributes of the node which are not changed and the lists,
+    # other values are added to the stack: (value, copy of the node or list, name of attribute or index)
+    lines = ['def clone(node, stack):', '    new = new_node(cls)']
+    for name in cls.__slotnames__:
+        if name in cls._optional:
+            lines += [
+                f'    value = getattr(node, {name!r}, missing)',
+                '    if value is not missing:',
+            ]
+        else:
+            lines += [
+                '    try:',
+                f'        value = node.{name}',
+                '    except AttributeError:',
+                '        pass',
+                '    else:',
+            ]
+        lines += [
+            '        if value.__class__ in atomic:',
+            f'            new.{name} = value',
+            '        elif value.__class__ is list or value.__class__ is frozen_list:',
+            f'            new.{name} = items = list(value)',
+            '            for i, item in enumerate(value):',
+            '                if item.__class__ not in atomic:',
+            '                    stack.append((item, items, i))',
+            '        else:',
+            f'            stack.append((value, new, {name!r}))',
+        ]
+    lines.append('    return new')
+    # copies of the frozen nodes are not frozen
+    cls = cls._node_class
+    namespace = {
+        'new_node': cls.__new__, 'cls': cls, 'atomic': _ATOMIC, 'missing': _MISSING, 'frozen_list': _FrozenList
+    }
+    exec('\n'.join(lines), namespace)
+    return namespace['clone']
+
+
+def _frozen_setattr(self, name, value):
+    raise AttributeError(f'{self._node_class.__name__} node is frozen, it can not be changed (change its copy)')
+
+
+def _frozen_delattr(self, name):
+    _frozen_setattr(self, name, None)
+
+
+def _new_node(cls):
+    return cls.__new__(cls)
+
+
+def _frozen_reduce_ex(self, protocol):
+    # pickled as the node of the original class: the copy is not frozen
+    _, _, *state = object.__reduce_ex__(self, protocol)
+    return (_new_node, (self._node_class,), *state)
+
+
+def _make_frozen_class(cls):
+    frozen = type(cls.__name__, (cls,), {
+        '__slots__': (),
+        '__module__': cls.__module__,
+        '__qualname__': cls.__qualname__,
+        '__setattr__': _frozen_setattr,
+        '__delattr__': _frozen_delattr,
+        '__reduce_ex__': _frozen_reduce_ex,
+    })
+    frozen._node_class = cls
+    _frozen_classes[cls] = frozen
+    return frozen
+
+
+def _frozen_container(self, *args, **kwargs):
+    raise TypeError(f'{type(self).__base__.__name__} of the frozen node can not be changed (change its copy)')
+
+
+class _FrozenList(list):
+    # list in the attribute of the frozen node, it is pickled and copied as list
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _frozen_container
+    append = extend = insert = pop = remove = clear = sort = reverse = _frozen_container
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self),)
+
+
+class _FrozenDict(dict):
+    # dict in the attribute of the frozen node, it is pickled and copied as dict
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _frozen_container
+    pop = popitem = clear = update = setdefault = _frozen_container
+
+    def __reduce_ex__(self, protocol):
+        return dict, (dict(self),)
+
+
+_CONTAINERS = (list, tuple, dict)
+
+
+def _freeze_value(value):
+    # lists and dicts in the value (they can be nested) are replaced by the frozen ones
+    cls = value.__class__
+    if cls is list:
+        return _FrozenList([_freeze_value(item) if item.__class__ in _CONTAINERS else item for item in value])
+    if cls is tuple:
+        return tuple([_freeze_value(item) if item.__class__ in _CONTAINERS else item for item in value])
+    return _FrozenDict({
+        key: _freeze_value(item) if item.__class__ in _CONTAINERS else item for key, item in value.items()
+    })
+
+
+def _get_clone(cls):
+    clone = _clones.get(cls)
+    if clone is None:
+        clone = _clones[cls] = _make_clone(cls)
+    return clone
+
+
+def _is_sequence(value):
+    return isinstance(value, (list, tuple)) or (
+        isinstance(value, Sequence) and not isinstance(value, (str, bytes, bytearray))
+    )
+
+
+def _hash_value(value):
+    # hash of the value of the attribute which is consistent with ASTNode.__eq__
+    if isinstance(value, ASTNode):
+        try:
+            return value._hash
+        except AttributeError:
+            # nodes which are created on access: rows of ColumnarValues
+            return value.freeze()._hash
+    if _is_sequence(value):
+        return hash(tuple(_hash_value(item) for item in value))
+    if isinstance(value, dict):
+        return hash(frozenset((key, _hash_value(item)) for key, item in value.items()))
+    try:
+        return hash(value)
+    except TypeError:
+        return hash(type(value))
+
+
+_set_fields(ASTNode)
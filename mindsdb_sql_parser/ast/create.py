@@ -9,6 +9,8 @@ except ImportError:
 
 
 class TableColumn():
+    __slots__ = ('name', 'type', 'is_primary_key', 'default', 'length', 'length2', 'nullable')
+
     def __init__(self, name, type='integer', length=None, length2=None, default=None,
                  is_primary_key=False, nullable=None):
         self.name = name
@@ -32,6 +34,8 @@ class TableColumn():
 
 
 class CreateTable(ASTNode):
+    __slots__ = ('name', 'is_replace', 'from_select', 'columns', 'if_not_exists')
+
     def __init__(self,
                  name,
                  from_select=None,
@@ -105,12 +109,18 @@ class CreateTable(ASTNode):
                         len_str += f", {col.length2}"
                     type = f'{type}({len_str})'
                 col_str = f'{col.name} {type}'
+                if col.default is not None:
+                    col_str += f' DEFAULT {col.default}'
                 if col.nullable is True:
                     col_str += ' NULL'
                 elif col.nullable is False:
                     col_str += ' NOT NULL'
                 columns.append(col_str)
 
+            primary_keys = [col.name for col in self.columns if col.is_primary_key]
+            if primary_keys:
+                columns.append('PRIMARY KEY ({})'.format(', '.join(primary_keys)))
+
             columns_str = '({})'.format(', '.join(columns))
 
         from_select_str = ''
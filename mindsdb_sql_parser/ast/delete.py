@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Delete(ASTNode):
+    __slots__ = ('table', 'where')
+
     def __init__(self,
                  table,
                  where=None,
@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Describe(ASTNode):
+    __slots__ = ('type', 'value')
+
     def __init__(self,
                  value,
                  type=None,
@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Drop(ASTNode):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -15,6 +17,8 @@ class Drop(ASTNode):
 
 class DropTables(Drop):
 
+    __slots__ = ('tables', 'if_exists', 'only_temporary')
+
     def __init__(self,
                  tables,
                  if_exists=False,
@@ -47,6 +51,8 @@ class DropTables(Drop):
 
 class DropDatabase(Drop):
 
+    __slots__ = ('name', 'if_exists')
+
     def __init__(self,
                  name,
                  if_exists=False,
@@ -73,6 +79,8 @@ class DropDatabase(Drop):
 
 class DropView(Drop):
 
+    __slots__ = ('names', 'if_exists')
+
     def __init__(self,
                  names,
                  if_exists=False,
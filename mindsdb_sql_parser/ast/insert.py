@@ -1,11 +1,80 @@
+from array import array
+from collections.abc import Sequence
+
 from mindsdb_sql_parser.ast.base import ASTNode
 from mindsdb_sql_parser.utils import indent
 from mindsdb_sql_parser.ast.create import TableColumn
 from mindsdb_sql_parser.ast.select.identifier import Identifier
-from mindsdb_sql_parser.ast.select.constant import Constant
+from mindsdb_sql_parser.ast.select.constant import Constant, NullConstant
+
+
+class ColumnarValues(Sequence):
+    """
+    Values of plain INSERT (only literals) stored by columns.
+
+    It can be used as a read-only list of rows: Constant nodes of the row are created on access.
+    Columns are lists of python values (None for NULL), columns of integers and floats
+    without NULL are arrays ('q' and 'd')
+    """
+
+    __slots__ = ('columns',)
+
+    def __init__(self, columns):
+        self.columns = [self.pack(column) for column in columns]
+
+    @staticmethod
+    def pack(column):
+        for typecode, value_type in (('q', int), ('d', float)):
+            if all(type(value) is value_type for value in column):
+                try:
+                    return array(typecode, column)
+                except OverflowError:
+                    break
+        return column
+
+    @staticmethod
+    def to_constant(value):
+        if value is None:
+            return NullConstant()
+        return Constant(value)
+
+    def rows(self):
+        # tuples of values
+        return zip(*self.columns)
+
+    def to_list(self):
+        return list(self)
+
+    def render(self):
+        # rendered values of the rows
+        columns = []
+        for column in self.columns:
+            if isinstance(column, array):
+                columns.append(map(str, column))
+            else:
+                columns.append(self.to_constant(value).to_string() for value in column)
+        return zip(*columns)
+
+    def __len__(self):
+        if not self.columns:
+            return 0
+        return len(self.columns[0])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return [self.to_constant(column[index]) for column in self.columns]
+
+    def __iter__(self):
+        for row in self.rows():
+            yield [self.to_constant(value) for value in row]
+
 
 class Insert(ASTNode):
 
+    __slots__ = ('table', 'values', 'from_select', 'is_plain', 'columns')
+    _not_compared = ('is_plain',)
+
     def __init__(self,
                  table,
                  columns=None,
@@ -29,6 +98,7 @@ class Insert(ASTNode):
         self.from_select = from_select
 
         # True if values in query are constant (without subselects and operations)
+        # values can be ColumnarValues in this case
         self.is_plain = is_plain
 
     def to_column(self, col):
@@ -45,6 +115,11 @@ class Insert(ASTNode):
             return val.to_string()
         return repr(val)
 
+    def render_values(self):
+        if isinstance(self.values, ColumnarValues):
+            return self.values.render()
+        return ([self.to_value(i) for i in row] for row in self.values)
+
     def to_tree(self, *args, level=0, **kwargs):
         ind = indent(level)
         ind1 = indent(level + 1)
@@ -56,8 +131,8 @@ class Insert(ASTNode):
 
         if self.values is not None:
             values = []
-            for row in self.values:
-                row_str = f', '.join([self.to_value(i) for i in row])
+            for row in self.render_values():
+                row_str = f', '.join(row)
                 values.append(f'{ind2}[{row_str}]')
             values_str = f'\n'.join(values)
             values_str = f'{ind1}values=[\n{values_str}]\n'
@@ -85,8 +160,8 @@ class Insert(ASTNode):
 
         if self.values is not None:
             values = []
-            for row in self.values:
-                row_str = ', '.join([self.to_value(i) for i in row])
+            for row in self.render_values():
+                row_str = ', '.join(row)
                 values.append(f'({row_str})')
             values_str = 'VALUES ' + ', '.join(values)
         else:
@@ -7,6 +7,8 @@ class AlterDatabase(ASTNode):
     """
     Alter a database.
     """
+
+    __slots__ = ('name', 'params')
     def __init__(self, name: Identifier, altered_params: dict, *args, **kwargs):
         """
         Args:
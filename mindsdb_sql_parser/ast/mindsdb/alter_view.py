@@ -7,6 +7,8 @@ class AlterView(ASTNode):
     """
     Alter a view.
     """
+
+    __slots__ = ('name', 'query_str', 'from_table', 'using')
     def __init__(
         self,
         name: Identifier,
@@ -6,6 +6,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class CreateChatBot(ASTNode):
+    __slots__ = ('name', 'database', 'model', 'agent', 'params')
+
     def __init__(self,
                  name,
                  database,
@@ -51,6 +53,8 @@ class CreateChatBot(ASTNode):
 
 
 class UpdateChatBot(ASTNode):
+    __slots__ = ('name', 'params')
+
     def __init__(self, name, updated_params, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.name = name
@@ -74,6 +78,8 @@ class UpdateChatBot(ASTNode):
 
 
 class DropChatBot(ASTNode):
+    __slots__ = ('name',)
+
     def __init__(self,
                  name,
                  *args, **kwargs):
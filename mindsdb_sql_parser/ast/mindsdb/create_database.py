@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent, dump_json
 
 
 class CreateDatabase(ASTNode):
+    __slots__ = ('name', 'engine', 'parameters', 'is_replace', 'if_not_exists')
+
     def __init__(self,
                  name,
                  engine,
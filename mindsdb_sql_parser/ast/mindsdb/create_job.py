@@ -3,6 +3,11 @@ from mindsdb_sql_parser.utils import indent
 
 
 class CreateJob(ASTNode):
+    __slots__ = (
+        'name', 'query_str', 'start_str', 'end_str', 'repeat_str', 'date_format', 'if_not_exists',
+        'if_query_str'
+    )
+
     def __init__(self,
                  name,
                  query_str,
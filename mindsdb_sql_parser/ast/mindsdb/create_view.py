@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent, dump_using_dict
 
 
 class CreateView(ASTNode):
+    __slots__ = ('name', 'query_str', 'from_table', 'if_not_exists', 'using')
+
     def __init__(self,
                  name,
                  query_str,
@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class DropDatasource(Drop):
+    __slots__ = ('name', 'if_exists')
+
     def __init__(self,
                  name,
                  if_exists=False,
@@ -3,6 +3,8 @@ from mindsdb_sql_parser.ast.base import ASTNode
 
 
 class Evaluate(ASTNode):
+    __slots__ = ('name', 'using', 'query_str', 'data')
+
     def __init__(self,
                  name,
                  query_str,
@@ -7,6 +7,8 @@ class CreateKnowledgeBase(ASTNode):
     """
     Create a new knowledge base
     """
+
+    __slots__ = ('name', 'model', 'storage', 'params', 'if_not_exists', 'from_query')
     def __init__(
         self,
         name,
@@ -83,6 +85,8 @@ class AlterKnowledgeBase(ASTNode):
     """
     Update the knowledge base
     """
+
+    __slots__ = ('name', 'params')
     def __init__(
         self,
         name,
@@ -132,6 +136,8 @@ class DropKnowledgeBase(ASTNode):
     """
     Delete a knowledge base
     """
+
+    __slots__ = ('name', 'if_exists')
     def __init__(self, name, if_exists=False, *args, **kwargs):
         """
         Args:
@@ -160,6 +166,8 @@ class CreateKnowledgeBaseIndex(ASTNode):
     """
     Create a new index in the knowledge base
     """
+
+    __slots__ = ('name', 'params')
     def __init__(self, name, params=None, *args, **kwargs):
         """
         Args:
@@ -195,6 +203,8 @@ class DropKnowledgeBaseIndex(ASTNode):
     """
     Delete an index in the knowledge base
     """
+
+    __slots__ = ('name',)
     def __init__(self, name, *args, **kwargs):
         """
         Args:
@@ -217,6 +227,8 @@ class EvaluateKnowledgeBase(ASTNode):
     """
     Evaluate a knowledge base.
     """
+
+    __slots__ = ('name', 'params')
     def __init__(self, name: Identifier, params: dict = None, *args, **kwargs):
         """
         Args:
@@ -2,6 +2,8 @@ from mindsdb_sql_parser.ast.base import ASTNode
 
 
 class Latest(ASTNode):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, alias=None, parentheses=False, **kwargs)
 
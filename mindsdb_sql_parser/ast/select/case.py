@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Case(ASTNode):
+    __slots__ = ('arg', 'rules', 'default')
+
     def __init__(self, rules, default=None, arg=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -47,19 +49,21 @@ class Case(ASTNode):
                f'{ind})'
 
     def get_string(self, *args, alias=True, **kwargs):
+        return self.render_parts()
+
+    def get_string_parts(self):
+        yield 'CASE '
+        if self.arg is not None:
+            yield self.arg
+            yield ' '
         # rules
-        rules_ar = []
-        for condition, result in self.rules:
-            rules_ar.append(
-                f'WHEN {condition.to_string()} THEN {result.to_string()}'
-            )
-        rules_str = ' '.join(rules_ar)
+        for i, (condition, result) in enumerate(self.rules):
+            yield 'WHEN ' if i == 0 else ' WHEN '
+            yield condition
+            yield ' THEN '
+            yield result
 
-        default_str = ''
         if self.default is not None:
-            default_str = f' ELSE {self.default.to_string()}'
-
-        arg_str = ''
-        if self.arg is not None:
-            arg_str = f'{self.arg.to_string()} '
-        return f"CASE {arg_str}{rules_str}{default_str} END"
+            yield ' ELSE '
+            yield self.default
+        yield ' END'
@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class CommonTableExpression(ASTNode):
+    __slots__ = ('name', 'columns', 'query')
+
     def __init__(self, name, query, columns=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.name = name
@@ -20,7 +22,11 @@ class CommonTableExpression(ASTNode):
         return out_str
 
     def get_string(self, *args, **kwargs):
+        return self.render_parts()
+
+    def get_string_parts(self):
         name_str = self.name.to_string(alias=False)
         columns_str = '' if not self.columns else f'( {", ".join([c.to_string(alias=False) for c in self.columns])} )'
-        query_str = self.query.to_string()
-        return f'{name_str}{columns_str} AS ( {query_str} )'
+        yield f'{name_str}{columns_str} AS ( '
+        yield self.query
+        yield ' )'
@@ -4,6 +4,12 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Constant(ASTNode):
+    __slots__ = ('value', 'with_quotes')
+
+    _share_frozen = True
+    _not_children = ('value', 'with_quotes')
+    _compared_by_sql = ('with_quotes',)
+
     def __init__(self, value, with_quotes=True, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.value = value
@@ -27,6 +33,8 @@ class Constant(ASTNode):
 
 
 class NullConstant(Constant):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(value=None, *args, **kwargs)
 
@@ -38,6 +46,8 @@ class NullConstant(Constant):
 
 
 class Last(Constant):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         self.value = 'last'
         super().__init__(self.value)
@@ -1,5 +1,4 @@
 import re
-from copy import copy, deepcopy
 from typing import List, Optional
 
 from mindsdb_sql_parser.ast.base import ASTNode
@@ -36,6 +35,14 @@ keywords_to_escape = {
 
 
 class Identifier(ASTNode):
+    __slots__ = ('parts', 'is_quoted', 'is_outer', 'with_rollup', 'sub_select')
+
+    # sub_select is set outside the parser
+    _optional = ('sub_select',)
+    _not_children = ('parts', 'is_quoted', 'is_outer', 'with_rollup')
+    # is_outer is not rendered: "a(+)" is equal to its sql "a"
+    _compared_by_sql = ('is_quoted', 'is_outer')
+
     def __init__(
             self, path_str=None, parts=None, is_outer=False, with_rollup=False,
             is_quoted: Optional[List[bool]] = None, *args, **kwargs
@@ -91,23 +98,5 @@ class Identifier(ASTNode):
         return self.parts_to_str()
 
     def __copy__(self):
-        identifier = Identifier(parts=copy(self.parts))
-        identifier.alias = deepcopy(self.alias)
-        identifier.parentheses = self.parentheses
-        identifier.is_quoted = deepcopy(self.is_quoted)
-        identifier.is_outer = self.is_outer
-        identifier.with_rollup = self.with_rollup
-        if hasattr(self, 'sub_select'):
-            identifier.sub_select = deepcopy(self.sub_select)
-        return identifier
-
-    def __deepcopy__(self, memo):
-        identifier = Identifier(parts=copy(self.parts))
-        identifier.alias = deepcopy(self.alias)
-        identifier.parentheses = self.parentheses
-        identifier.is_quoted = deepcopy(self.is_quoted)
-        identifier.is_outer = self.is_outer
-        identifier.with_rollup = self.with_rollup
-        if hasattr(self, 'sub_select'):
-            identifier.sub_select = deepcopy(self.sub_select)
-        return identifier
+        # alias, is_quoted and sub_select are not shared with the copy
+        return self.copy()
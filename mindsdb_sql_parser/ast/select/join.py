@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Join(ASTNode):
+    __slots__ = ('join_type', 'left', 'right', 'condition', 'implicit')
+
     def __init__(self, join_type, left, right, condition=None, implicit=False, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if join_type is not None:
@@ -25,6 +27,12 @@ class Join(ASTNode):
         return out_str
 
     def get_string(self, *args, **kwargs):
-        join_type_str = f' {self.join_type} ' if not self.implicit else ', '
-        condition_str = f' ON {self.condition.to_string()}' if self.condition else ''
-        return f'{self.left.to_string()}{join_type_str}{self.right.to_string()}{condition_str}'
+        return self.render_parts()
+
+    def get_string_parts(self):
+        yield self.left
+        yield f' {self.join_type} ' if not self.implicit else ', '
+        yield self.right
+        if self.condition:
+            yield ' ON '
+            yield self.condition
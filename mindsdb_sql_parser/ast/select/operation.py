@@ -4,6 +4,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Operation(ASTNode):
+    __slots__ = ('op', 'args')
+
     def __init__(self, op, args, *args_, **kwargs):
         super().__init__(*args_, **kwargs)
 
@@ -25,41 +27,64 @@ class Operation(ASTNode):
         return out_str
 
     def get_string(self, *args, alias=True, **kwargs):
-        arg_strs = [arg.to_string() for arg in self.args]
-        args_str = ','.join(arg_strs)
+        return self.render_parts()
 
-        return f'{self.op}({args_str})'
+    def get_string_parts(self):
+        yield f'{self.op}('
+        for i, arg in enumerate(self.args):
+            if i > 0:
+                yield ','
+            yield arg
+        yield ')'
 
 
 class BetweenOperation(Operation):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(op='between', *args, **kwargs)
 
     def get_string(self, *args, **kwargs):
-        arg_strs = [arg.to_string() for arg in self.args]
-        return f'{arg_strs[0]} BETWEEN {arg_strs[1]} AND {arg_strs[2]}'
+        return self.render_parts()
+
+    def get_string_parts(self):
+        yield self.args[0]
+        yield ' BETWEEN '
+        yield self.args[1]
+        yield ' AND '
+        yield self.args[2]
 
 
 class BinaryOperation(Operation):
+    __slots__ = ()
+
+    # operations which can have more than two arguments: `a OR b OR c` (see flatten)
+    associative_ops = ('and', 'or', '||')
+
     def get_string(self, *args, **kwargs):
-        arg_strs = []
-        for arg in self.args:
-            arg_str = arg.to_string()
-            # if isinstance(arg, BinaryOperation) or isinstance(arg, BetweenOperation):
-            #     # to parens
-            #     arg_str = f'({arg_str})'
-            arg_strs.append(arg_str)
+        return self.render_parts()
 
-        return f'{arg_strs[0]} {self.op.upper()} {arg_strs[1]}'
+    def get_string_parts(self):
+        separator = f' {self.op.upper()} '
+        for i, arg in enumerate(self.args):
+            if i > 0:
+                yield separator
+            yield arg
 
     def assert_arguments(self):
-        if len(self.args) != 2:
+        if len(self.args) != 2 and not (len(self.args) > 2 and self.op in self.associative_ops):
             raise ParsingException(f'Expected two arguments for operation "{self.op}"')
 
 
 class UnaryOperation(Operation):
+    __slots__ = ()
+
     def get_string(self, *args, **kwargs):
-        return f'{self.op} {self.args[0].to_string()}'
+        return self.render_parts()
+
+    def get_string_parts(self):
+        yield f'{self.op} '
+        yield self.args[0]
 
     def assert_arguments(self):
         if len(self.args) != 1:
@@ -67,6 +92,8 @@ class UnaryOperation(Operation):
 
 
 class Function(Operation):
+    __slots__ = ('distinct', 'from_arg', 'namespace')
+
     def __init__(self, *args, distinct=False, from_arg=None, namespace=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.distinct = distinct
@@ -90,15 +117,25 @@ class Function(Operation):
         return out_str
 
     def get_string(self, *args, **kwargs):
-        args_str = ', '.join([arg.to_string() for arg in self.args])
-        distinct_str = 'DISTINCT ' if self.distinct else ''
+        return self.render_parts()
 
-        from_str = f' FROM {self.from_arg.to_string()}' if self.from_arg else ''
+    def get_string_parts(self):
+        distinct_str = 'DISTINCT ' if self.distinct else ''
         namespace = self.namespace + '.' if self.namespace else ''
-        return f'{namespace}{self.op}({distinct_str}{args_str}{from_str})'
+        yield f'{namespace}{self.op}({distinct_str}'
+        for i, arg in enumerate(self.args):
+            if i > 0:
+                yield ', '
+            yield arg
+        if self.from_arg:
+            yield ' FROM '
+            yield self.from_arg
+        yield ')'
 
 
 class WindowFunction(ASTNode):
+    __slots__ = ('function', 'partition', 'order_by', 'modifier')
+
     def __init__(self, function, partition=None, order_by=None, alias=None, modifier=None):
         super().__init__()
         self.function = function
@@ -157,6 +194,8 @@ class WindowFunction(ASTNode):
 
 
 class Object(ASTNode):
+    __slots__ = ('type', 'params')
+
     def __init__(self, type, params=None, **kwargs):
         super().__init__(**kwargs)
 
@@ -183,6 +222,8 @@ class Object(ASTNode):
 
 class Interval(Operation):
 
+    __slots__ = ()
+
     def __init__(self, info):
         super().__init__(op='interval', args=[info, ])
 
@@ -203,12 +244,16 @@ class Interval(Operation):
 
 
 class Exists(Operation):
+    __slots__ = ('query',)
+
     def __init__(self, query):
         self.query = query
         super().__init__(op='exists', args=[query])
 
 
 class NotExists(Operation):
+    __slots__ = ('query',)
+
     def __init__(self, query):
         self.query = query
         super().__init__(op='not exists', args=[query])
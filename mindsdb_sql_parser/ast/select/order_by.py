@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class OrderBy(ASTNode):
+    __slots__ = ('field', 'direction', 'nulls')
+
     def __init__(self, field, direction='default', nulls='default', *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.field = field
@@ -13,9 +15,11 @@ class OrderBy(ASTNode):
         return indent(level) + f'OrderBy(field={self.field.to_tree()}, direction={repr(self.direction)}, nulls={repr(self.nulls)})'
 
     def get_string(self, *args, **kwargs):
-        out_str = self.field.to_string()
+        return self.render_parts()
+
+    def get_string_parts(self):
+        yield self.field
         if self.direction != 'default':
-            out_str += f' {self.direction}'
+            yield f' {self.direction}'
         if self.nulls != 'default':
-            out_str += f' {self.nulls}'
-        return out_str
+            yield f' {self.nulls}'
@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Parameter(ASTNode):
+    __slots__ = ('value',)
+
     def __init__(self, value, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.value = value
@@ -6,6 +6,11 @@ from mindsdb_sql_parser.ast.select.operation import Object
 
 class Select(ASTNode):
 
+    __slots__ = (
+        'targets', 'distinct', 'from_table', 'where', 'group_by', 'having', 'order_by', 'limit', 'offset',
+        'cte', 'mode', 'modifiers', 'using'
+    )
+
     def __init__(self,
                  targets,
                  distinct: Union[List, bool] = False,
@@ -100,57 +105,69 @@ class Select(ASTNode):
         return out_str
 
     def get_string(self, *args, **kwargs):
+        return self.render_parts()
+
+    @staticmethod
+    def _list_parts(items):
+        for i, item in enumerate(items):
+            if i > 0:
+                yield ', '
+            yield item
+
+    def get_string_parts(self):
         from mindsdb_sql_parser.ast.select.identifier import Identifier
-        out_str = ''
         if self.cte is not None:
-            cte_str = ', '.join([out.to_string() for out in self.cte])
-            out_str += f'WITH {cte_str} '
+            yield 'WITH '
+            yield from self._list_parts(self.cte)
+            yield ' '
 
-        out_str += "SELECT"
+        yield "SELECT"
 
         if self.distinct is True:
-            out_str += ' DISTINCT'
+            yield ' DISTINCT'
         elif isinstance(self.distinct, list):
-            distinct_str = ', '.join([c.to_string() for c in self.distinct])
+            yield ' DISTINCT ON ('
+            yield from self._list_parts(self.distinct)
+            yield ')'
 
-            out_str += f' DISTINCT ON ({distinct_str})'
-
-        targets_str = ', '.join([out.to_string() for out in self.targets])
-        out_str += f' {targets_str}'
+        yield ' '
+        yield from self._list_parts(self.targets)
 
         if self.from_table is not None:
-            from_table_str = str(self.from_table)
-            out_str += f' FROM {from_table_str}'
+            yield ' FROM '
+            yield self.from_table
 
         if self.where is not None:
-            out_str += f' WHERE {self.where.to_string()}'
+            yield ' WHERE '
+            yield self.where
 
         if self.group_by is not None:
-            parts = []
-            for item in self.group_by:
-                part = item.to_string()
+            yield ' GROUP BY '
+            for i, item in enumerate(self.group_by):
+                if i > 0:
+                    yield ', '
+                yield item
                 if isinstance(item, Identifier) and item.with_rollup:
-                    part += ' WITH ROLLUP'
-                parts.append(part)
-            group_by_str = ', '.join(parts)
-            out_str += f' GROUP BY {group_by_str}'
+                    yield ' WITH ROLLUP'
 
         if self.having is not None:
-            having_str = str(self.having)
-            out_str += f' HAVING {having_str}'
+            yield ' HAVING '
+            yield self.having
 
         if self.order_by is not None:
-            order_by_str = ', '.join([out.to_string() for out in self.order_by])
-            out_str += f' ORDER BY {order_by_str}'
+            yield ' ORDER BY '
+            yield from self._list_parts(self.order_by)
 
         if self.limit is not None:
-            out_str += f' LIMIT {self.limit.to_string()}'
+            yield ' LIMIT '
+            yield self.limit
 
         if self.offset is not None:
-            out_str += f' OFFSET {self.offset.to_string()}'
+            yield ' OFFSET '
+            yield self.offset
 
         if self.mode is not None:
-            out_str += f' {self.mode}'
+            yield f' {self.mode}'
 
         if self.using:
 
@@ -170,7 +187,5 @@ class Select(ASTNode):
 
                 using_ar.append(f'{Identifier(key).to_string()}={value}')
 
-            out_str += f' USING ' + ', '.join(using_ar)
-
-        return out_str
+            yield ' USING ' + ', '.join(using_ar)
 
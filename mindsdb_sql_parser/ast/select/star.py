@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Star(ASTNode):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         if 'alias' in kwargs:
             from mindsdb_sql_parser.exceptions import ParsingException
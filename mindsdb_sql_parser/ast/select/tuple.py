@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Tuple(ASTNode):
+    __slots__ = ('items',)
+
     def __init__(self, items, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.items = items
@@ -14,8 +16,12 @@ class Tuple(ASTNode):
         return out_str
 
     def get_string(self, *args, **kwargs):
-        item_strs = []
-        for item in self.items:
-            item_strs.append(str(item))
+        return self.render_parts()
 
-        return f'({", ".join(item_strs)})'
+    def get_string_parts(self):
+        yield '('
+        for i, item in enumerate(self.items):
+            if i > 0:
+                yield ', '
+            yield item if isinstance(item, ASTNode) else str(item)
+        yield ')'
@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class TypeCast(ASTNode):
+    __slots__ = ('type_name', 'arg', 'precision')
+
     def __init__(self, type_name, arg, precision=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -15,8 +17,13 @@ class TypeCast(ASTNode):
         return out_str
 
     def get_string(self, *args, **kwargs):
+        return self.render_parts()
+
+    def get_string_parts(self):
         type_name = self.type_name
         if self.precision is not None:
             precision = map(str, self.precision)
             type_name += f'({",".join(precision)})'
-        return f'CAST({str(self.arg)} AS {type_name})'
+        yield 'CAST('
+        yield self.arg if isinstance(self.arg, ASTNode) else str(self.arg)
+        yield f' AS {type_name})'
@@ -3,19 +3,25 @@ from mindsdb_sql_parser.utils import indent
 
 
 class CombiningQuery(ASTNode):
+    __slots__ = ('left', 'right', 'unique', 'distinct_key', 'queries')
     operation = None
 
+    # chains of the operation can be combined in one node (see flatten)
+    associative = False
+
     def __init__(self,
-                 left,
-                 right,
+                 left=None,
+                 right=None,
                  unique=True,
                  distinct_key=False,
-                 *args, **kwargs):
+                 *args, queries=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.left = left
         self.right = right
         self.unique = unique
         self.distinct_key = distinct_key
+        # more than two queries: left and right are None
+        self.queries = queries
 
         if self.alias:
             self.parentheses = True
@@ -24,8 +30,13 @@ class CombiningQuery(ASTNode):
         ind = indent(level)
         ind1 = indent(level+1)
 
-        left_str = f'\n{ind1}left=\n{self.left.to_tree(level=level + 2)},'
-        right_str = f'\n{ind1}right=\n{self.right.to_tree(level=level + 2)},'
+        if self.queries is not None:
+            queries_str = ',\n'.join([query.to_tree(level=level + 2) for query in self.queries])
+            left_str = f'\n{ind1}queries=[\n{queries_str}\n{ind1}],'
+            right_str = ''
+        else:
+            left_str = f'\n{ind1}left=\n{self.left.to_tree(level=level + 2)},'
+            right_str = f'\n{ind1}right=\n{self.right.to_tree(level=level + 2)},'
 
         cls_name = self.__class__.__name__
         out_str = f'{ind}{cls_name}(unique={repr(self.unique)}, distinct_key={repr(self.distinct_key)}' \
@@ -35,25 +46,34 @@ class CombiningQuery(ASTNode):
         return out_str
 
     def get_string(self, *args, **kwargs):
-        left_str = str(self.left)
-        right_str = str(self.right)
+        return self.render_parts()
+
+    def get_string_parts(self):
         keyword = self.operation
         if not self.unique:
             keyword += ' ALL'
         if self.distinct_key:
             keyword += ' DISTINCT'
-        out_str = f"""{left_str}\n{keyword}\n{right_str}"""
-
-        return out_str
+        separator = f'\n{keyword}\n'
+        queries = self.queries if self.queries is not None else (self.left, self.right)
+        for i, query in enumerate(queries):
+            if i > 0:
+                yield separator
+            yield query
 
 
 class Union(CombiningQuery):
+    __slots__ = ()
     operation = 'UNION'
+    associative = True
 
 
 class Intersect(CombiningQuery):
+    __slots__ = ()
     operation = 'INTERSECT'
+    associative = True
 
 
 class Except(CombiningQuery):
+    __slots__ = ()
     operation = 'EXCEPT'
@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Show(ASTNode):
+    __slots__ = ('category', 'modes', 'where', 'from_table', 'in_table', 'like', 'name')
+
     def __init__(self,
                  category,
                  modes=None,
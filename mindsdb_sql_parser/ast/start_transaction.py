@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class StartTransaction(ASTNode):
+    __slots__ = ()
+
     def __init__(self,
                  *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Update(ASTNode):
+    __slots__ = ('table', 'keys', 'update_columns', 'where', 'from_select', 'from_select_alias')
+
     def __init__(self,
                  table,
                  update_columns=None,
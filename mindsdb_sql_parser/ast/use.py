@@ -3,6 +3,8 @@ from mindsdb_sql_parser.utils import indent
 
 
 class Use(ASTNode):
+    __slots__ = ('value',)
+
     def __init__(self,
                  value,
                  *args, **kwargs):
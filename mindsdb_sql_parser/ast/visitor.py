@@ -0,0 +1,285 @@
+from mindsdb_sql_parser.ast.base import ASTNode, _ATOMIC
+
+
+def _container_children(container, name, index, children):
+    if isinstance(container, dict):
+        items = container.items()
+    else:
+        items = enumerate(container)
+    for key, item in items:
+        if item.__class__ in _ATOMIC:
+            continue
+        if isinstance(item, ASTNode):
+            children.append((item, name, index + (key,)))
+        elif isinstance(item, (list, tuple, dict)):
+            _container_children(item, name, index + (key,), children)
+
+
+def _children(node):
+    children = []
+    for name in node._children:
+        value = getattr(node, name, None)
+        if value.__class__ in _ATOMIC:
+            continue
+        if isinstance(value, ASTNode):
+            children.append((value, name, ()))
+        elif isinstance(value, (list, tuple, dict)):
+            _container_children(value, name, (), children)
+    return children
+
+
+def iter_children(node):
+    """
+    Child nodes of the node: tuples (child, name of attribute, index).
+    Index is the path to the child inside of the value of attribute (lists, tuples and dicts):
+    () if the value is the child, (2,) for node.args[2], (0, 1) for node.rules[0][1]
+    """
+    return iter(_children(node))
+
+
+def walk(node, postorder=False, prune=None):
+    """
+    Iterates the nodes of the tree without recursion: parents before children,
+    or children before parents if postorder is True.
+    prune(node) is called before the children of the node: if it returns True, they are skipped
+    """
+    stack = [(node, False)]
+    while stack:
+        node, leave = stack.pop()
+        if leave:
+            yield node
+            continue
+
+        if not postorder:
+            yield node
+        if prune is not None and prune(node):
+            if postorder:
+                yield node
+            continue
+        if postorder:
+            stack.append((node, True))
+        children = _children(node)
+        for i in range(len(children) - 1, -1, -1):
+            stack.append((children[i][0], False))
+
+
+class Visitor:
+    """
+    Traverses the tree without recursion and calls the methods for the classes of nodes:
+    enter_<Class>(node) before the children of the node and leave_<Class>(node) after them.
+    If the class doesn't have the method, the method of its base class is used
+    (enter_Operation for BinaryOperation), enter_node and leave_node are called for other nodes.
+    If enter method returns Visitor.SKIP the children of the node are not visited.
+
+    During the call self.path contains the current node and its parents, from the root:
+    tuples (node, name of attribute in the parent, index in the value of attribute, see iter_children)
+    """
+
+    # returned by enter method to skip the children of the node
+    SKIP = object()
+
+    # (enter, leave) methods for the classes of nodes, every class of visitor has its own
+    _handlers = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._handlers = {}
+
+    def __init__(self):
+        self.path = []
+
+    @property
+    def parent(self):
+        if len(self.path) < 2:
+            return None
+        return self.path[-2][0]
+
+    def enter_node(self, node):
+        pass
+
+    def leave_node(self, node):
+        pass
+
+    def enter(self, node):
+        handlers = self._handlers.get(node.__class__) or self._find_handlers(node.__class__)
+        return handlers[0](self, node)
+
+    def leave(self, node):
+        handlers = self._handlers.get(node.__class__) or self._find_handlers(node.__class__)
+        return handlers[1](self, node)
+
+    @classmethod
+    def _find_handlers(cls, node_cls):
+        handlers = []
+        for prefix in ('enter', 'leave'):
+            for klass in node_cls.__mro__:
+                method = getattr(cls, f'{prefix}_{klass.__name__}', None)
+                if method is not None:
+                    break
+            else:
+                method = getattr(cls, f'{prefix}_node')
+            handlers.append(method)
+        cls._handlers[node_cls] = handlers
+        return handlers
+
+    def visit(self, node):
+        path = self.path = []
+        # (node, name, index, depth of the node, True if the children are visited)
+        stack = [(node, None, (), 0, False)]
+        while stack:
+            node, name, index, depth, leave = stack.pop()
+            del path[depth + leave:]
+            if leave:
+                self.leave(node)
+                continue
+
+            path.append((node, name, index))
+            stack.append((node, name, index, depth, True))
+            if self.enter(node) is self.SKIP:
+                continue
+
+            children = _children(node)
+            for i in range(len(children) - 1, -1, -1):
+                child, child_name, child_index = children[i]
+                stack.append((child, child_name, child_index, depth + 1, False))
+        self.path = []
+
+
+def _set_child(parent, name, index, node):
+    # puts the node to the place of the child (see iter_children), tuples are replaced by the new ones
+    if not index:
+        setattr(parent, name, node)
+        return
+    containers = [getattr(parent, name)]
+    for key in index[:-1]:
+        containers.append(containers[-1][key])
+    value = node
+    for container, key in zip(reversed(containers), reversed(index)):
+        if not isinstance(container, tuple):
+            container[key] = value
+            return
+        items = list(container)
+        items[key] = value
+        value = tuple(items)
+    setattr(parent, name, value)
+
+
+class Transformer(Visitor):
+    """
+    Visitor which changes the tree in place, bottom-up: leave method of the node is called after
+    the children of the node are changed. The result of leave method:
+      - None: the node is not changed
+      - the node itself: the node was changed by the method
+      - other node: it replaces the node in its parent
+
+    visit() returns the root of the tree (the new one if it was replaced).
+    After visit self.changed contains the changed and the new nodes and all their parents,
+    the nodes which are not in it have the same subtrees as before (for example, rendered sql
+    of them can be kept). self.replaced is the list of (old node, new node)
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.root = None
+        self.replaced = []
+        self._changed = {}
+
+    @property
+    def changed(self):
+        return list(self._changed.values())
+
+    def is_changed(self, node):
+        return id(node) in self._changed
+
+    def visit(self, node):
+        self.root = node
+        self.replaced = []
+        self._changed = {}
+        super().visit(node)
+        return self.root
+
+    def leave(self, node):
+        new = super().leave(node)
+        if new is None:
+            return
+
+        path = self.path
+        if new is not node:
+            _, name, index = path[-1]
+            if len(path) == 1:
+                self.root = new
+            else:
+                _set_child(path[-2][0], name, index, new)
+            self.replaced.append((node, new))
+
+        changed = self._changed
+        changed[id(new)] = new
+        # the parents are marked up to the first marked one: its parents are marked already
+        for i in range(len(path) - 2, -1, -1):
+            parent = path[i][0]
+            if id(parent) in changed:
+                break
+            changed[id(parent)] = parent
+
+
+def _flat_items(node, get_items, mergeable):
+    # items of the node and of the nested nodes which are merged into it, in the order of sql
+    items = []
+    stack = list(reversed(get_items(node)))
+    while stack:
+        item = stack.pop()
+        if mergeable(item):
+            stack.extend(reversed(get_items(item)))
+        else:
+            items.append(item)
+    return items
+
+
+def _query_items(node):
+    if node.queries is not None:
+        return node.queries
+    return [node.left, node.right]
+
+
+def flatten(node):
+    """
+    Replaces chains of the same associative operation by one node with all the arguments:
+    `a OR b OR c` is BinaryOperation(op='or', args=[a, b, c]) instead of the nested binary operations,
+    UNION (INTERSECT) of many queries is one node with the list of `queries` (left and right are None).
+    Operations AND, OR, || are merged, and unions with the same `unique` and `distinct_key`.
+    Nodes in parentheses or with alias are not merged into their parents, sql of the tree is not changed.
+    The tree is changed in place, returns the node
+    """
+    from mindsdb_sql_parser.ast.select.operation import BinaryOperation
+    from mindsdb_sql_parser.ast.select.union import CombiningQuery
+
+    # parents before children: the merged nodes are not visited
+    for item in walk(node):
+        if isinstance(item, BinaryOperation):
+            if item.op not in item.associative_ops:
+                continue
+
+            def mergeable(child, parent=item):
+                return (
+                    child.__class__ is parent.__class__ and child.op == parent.op
+                    and not child.parentheses and not child.alias
+                )
+            args = _flat_items(item, lambda op: op.args, mergeable)
+            if len(args) > len(item.args):
+                item.args = args
+
+        elif isinstance(item, CombiningQuery):
+            if not item.associative:
+                continue
+
+            def mergeable(child, parent=item):
+                return (
+                    child.__class__ is parent.__class__ and child.unique == parent.unique
+                    and child.distinct_key == parent.distinct_key
+                    and not child.parentheses and not child.alias
+                )
+            queries = _flat_items(item, _query_items, mergeable)
+            if len(queries) > len(_query_items(item)):
+                item.queries = queries
+                item.left = item.right = None
+    return node
@@ -0,0 +1,276 @@
+import re
+import string
+
+from sly.lex import LexError
+
+
+COMPLETE = 'complete'
+INCOMPLETE = 'incomplete'
+INVALID = 'invalid'
+
+# the beginning of unterminated string, quoted identifier or variable
+_QUOTE_RE = re.compile(r'@{0,2}([\'"`])')
+
+
+class StatementBuffer:
+    """
+    Input of interactive client which is received by chunks (lines of CLI, packets of protocol).
+    feed(chunk) adds the chunk and returns the status of the text of the buffer:
+    - COMPLETE: the text is a statement (trailing semicolons are allowed).
+      It is checked by LR tables, parse_sql can still reject it in the grammar rules
+    - INCOMPLETE: the text is the beginning of a statement: unterminated quote or comment,
+      unbalanced parentheses, the statement can't be finished here
+    - INVALID: no continuation of the text is a statement
+
+    Tokens which can't be changed by the next chunks are passed to the automaton of the parser
+    and removed from the buffer, only the last tokens are lexed again with the next chunk.
+
+        buffer = StatementBuffer()
+        for line in lines:
+            if buffer.feed(line) != INCOMPLETE:
+                break
+        ast = parse_sql(buffer.text)
+    """
+
+    # the last tokens can be changed by the next chunk: "GROUP" + " BY", "sel" + "ect"
+    relex_back = 2
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.status = INCOMPLETE
+        self._chunks = []
+
+        self._tail = ''  # text after the tokens which are passed to the automaton
+        self._states = [0]  # stack of states of the automaton after these tokens
+        self._invalid = False
+        self._wait = None  # the tail is not lexed till this string appears: end of quote or comment
+        self._waiting = []  # chunks received after the tail during the waiting
+        self._wait_prefix = ''  # the end of the text before the last chunk, it can be a part of the string
+
+    @property
+    def text(self):
+        if len(self._chunks) > 1:
+            self._chunks = [''.join(self._chunks)]
+        return self._chunks[0] if self._chunks else ''
+
+    def feed(self, chunk):
+        self._chunks.append(chunk)
+        if self._invalid:
+            return INVALID
+
+        if self._wait is not None:
+            self._waiting.append(chunk)
+            text = self._wait_prefix + chunk
+            if self._wait not in text:
+                self._wait_prefix = text[len(text) - len(self._wait) + 1:]
+                return self.status
+            chunk = ''.join(self._waiting)
+            self._wait, self._waiting = None, []
+        self._tail += chunk
+
+        self.status = self._check()
+        if self.status == INVALID and self._invalid:
+            self._tail = ''
+        return self.status
+
+    def _check(self):
+        from mindsdb_sql_parser.lexer import MindsDBLexer
+        from mindsdb_sql_parser.parser import MindsDBParser
+
+        lexer, parser = MindsDBLexer(), MindsDBParser()
+        tail = self._tail
+
+        end = len(tail)  # end of the lexed text
+        wait = None
+        partial = False  # the end of the text is not a token yet: "@", "!"
+        error = None
+        try:
+            stream = lexer.tokenize_compact(tail)
+        except LexError as e:
+            end = error = e.error_index
+            stream = lexer.tokenize_compact(tail[:end])
+
+        types, starts, ends = stream.types, stream.starts, stream.ends
+        count = len(types)
+
+        # the string which ends with an escaped quote ('it\') is continued by a quote in the next chunks,
+        # the text after it is lexed again with them
+        reopen = _reopenable_string(stream, count)
+
+        # unterminated comment: "/*" is lexed as DIVIDE and STAR
+        divide, star = stream.type_ids.get('DIVIDE'), stream.type_ids.get('STAR')
+        for i in range((count if reopen is None else reopen) - 1):
+            if types[i] == divide and types[i + 1] == star and ends[i] == starts[i + 1]:
+                count, end = i, starts[i]
+                wait = '*/'
+                reopen = None
+                break
+
+        if wait is None and error is not None:
+            match = _QUOTE_RE.match(tail, end)
+            if reopen is not None:
+                # the character can be a part of the string
+                partial = True
+            elif match is not None:
+                wait = match.group(1)
+            elif tail[end:].split() != [tail[end:]] or not any(_extended_tokens(lexer, tail[end:])):
+                # illegal character
+                self._invalid = True
+                return INVALID
+            else:
+                partial = True
+
+        # trailing semicolons are skipped as in parse_sql
+        semicolon = stream.type_ids.get('SEMICOLON')
+        last = count
+        while last and types[last - 1] == semicolon:
+            last -= 1
+
+        # tokens which can't be changed are passed to the automaton, the last ones are checked separately
+        stable = max(min(count - self.relex_back, last - 1), 0)
+        if reopen is not None:
+            stable = min(stable, reopen)
+        if stable:
+            states = parser.recognize(stream.slice(0, stable), self._states)
+            if states is None:
+                self._invalid = True
+                return INVALID
+            self._states = states
+
+            cut = starts[stable] if stable < count else end
+            self._tail = tail[cut:]
+        if wait is not None:
+            # only the next chunks can close the quote or the comment
+            self._wait = wait
+            self._wait_prefix = tail[len(tail) - len(wait) + 1:]
+
+        if last == 0:
+            # empty input
+            return INCOMPLETE
+
+        states = self._states
+        for i in range(stable, last):
+            next_states = parser.recognize(stream.slice(i, i + 1), states)
+            if next_states is None:
+                if reopen is not None and i > reopen:
+                    # the token can be a part of the string
+                    return INCOMPLETE
+                if last == count and wait is None and not partial and self._can_continue(
+                    parser, lexer, stream, i, last - 1, states, end
+                ):
+                    return INCOMPLETE
+                return INVALID
+            states = next_states
+
+        if wait is not None or partial:
+            return INCOMPLETE
+        if parser.recognize([None], states) is True:
+            return COMPLETE
+        if last < count and reopen is None and parser.recognize(stream.slice(last, count), states) is None:
+            # semicolon is the end of the statement, it is not a part of the raw query
+            return INVALID
+        return INCOMPLETE
+
+    @staticmethod
+    def _can_continue(parser, lexer, stream, index, last, states, end):
+        # the token at the index is not accepted, it can be changed by the next chunk:
+        # the last token is continued or it is joined with the next word (GROUP BY)
+        from mindsdb_sql_parser.completion import _get_grammar_info, _WORD_RE
+
+        text = stream.text
+        gap = text[stream.ends[last]:end]
+        if gap.strip():
+            return False
+        _, _, _, keywords = _get_grammar_info(parser, lexer)
+
+        # keywords of two words: the word before the token can be joined with it
+        for first in range(max(last - 1, 0), min(index, last) + 1):
+            words = _get_words(stream, first, last)
+            if words is None:
+                continue
+            for name, keyword in keywords.items():
+                for keyword_words in (keyword.upper().split(' '), name.split('_')):
+                    if len(keyword_words) < len(words) or (gap and len(keyword_words) == len(words)):
+                        continue
+                    if gap and keyword_words[:len(words)] == words:
+                        return True
+                    if (
+                        not gap and keyword_words[:len(words) - 1] == words[:-1]
+                        and keyword_words[len(words) - 1].startswith(words[-1])
+                    ):
+                        return True
+
+        if index < last or gap:
+            return False
+
+        # the last token is continued
+        value = text[stream.starts[last]:stream.ends[last]]
+        if _WORD_RE.fullmatch(value):
+            for name in parser.next_terminals(states):
+                if name == 'ID':
+                    return True
+                if name in keywords and (
+                    keywords[name].upper().startswith(value.upper()) or name.startswith(value.upper())
+                ):
+                    return True
+        for tok in _extended_tokens(lexer, value):
+            if parser.recognize([tok], states) is not None:
+                return True
+        return False
+
+
+def _reopenable_string(stream, count):
+    # index of the first quoted string which ends with an escaped quote: 'it\' + "s'" is one string
+    string_ids = {stream.type_ids.get('QUOTE_STRING'), stream.type_ids.get('DQUOTE_STRING')}
+    types, text = stream.types, stream.text
+    for i in range(count):
+        if types[i] in string_ids:
+            value = text[stream.starts[i]:stream.ends[i] - 1]
+            if (len(value) - len(value.rstrip('\\'))) % 2:
+                return i
+    return None
+
+
+def _get_words(stream, first, last):
+    # upper case words of the tokens separated by whitespaces, None if there are other tokens
+    from mindsdb_sql_parser.completion import _WORD_RE
+
+    text = stream.text
+    words = []
+    for i in range(first, last + 1):
+        value = text[stream.starts[i]:stream.ends[i]]
+        if not _WORD_RE.fullmatch(value) or (i > first and text[stream.ends[i - 1]:stream.starts[i]].strip()):
+            return None
+        words.append(value.upper())
+    return words
+
+
+# the next characters of the token: "@" + "aa" is a variable
+_EXTENSIONS = ['a', 'aa', '0'] + list(string.punctuation)
+
+
+def _extended_tokens(lexer, value):
+    # the first tokens of the value followed by the extensions
+    for extension in _EXTENSIONS:
+        try:
+            tok = next(iter(lexer.tokenize(value + extension)), None)
+        except LexError:
+            continue
+        if tok is not None and tok.index == 0 and tok.end > len(value):
+            yield tok
+
+
+def statement_status(text):
+    """
+    COMPLETE, INCOMPLETE or INVALID: the status of the text for StatementBuffer
+    """
+    return StatementBuffer().feed(text)
+
+
+def is_complete(text):
+    """
+    The text is a complete statement: the result of parser tables (LR), parse_sql still can reject it
+    """
+    return statement_status(text) == COMPLETE
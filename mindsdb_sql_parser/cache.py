@@ -0,0 +1,260 @@
+import io
+import pickle
+import threading
+from collections import OrderedDict
+
+from mindsdb_sql_parser.utils import LITERAL_TOKENS
+
+
+class ParseCache:
+    """
+    LRU cache of parsed queries, keyed by sql text and dialect.
+
+    ASTs are stored pickled: every call returns a new copy of the tree, so the
+    caller can change it without affecting the cache. Loading the copy is much
+    faster than parsing.
+    The size of the pickled tree and the sql text is counted in max_bytes.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+
+        self._entries = OrderedDict()  # key: (pickled ast, size)
+        self._lock = threading.Lock()
+
+    def parse_sql(self, sql, dialect=None):
+        from mindsdb_sql_parser import parse_sql
+
+        key = (sql, dialect)
+        entry = self._get(key)
+        if entry is not None:
+            return pickle.loads(entry)
+
+        # errors are not cached
+        ast = parse_sql(sql, dialect)
+        try:
+            data = pickle.dumps(ast, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # too deep tree
+            return ast
+        self._put(key, data, len(data) + len(sql))
+        return ast
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _put(self, key, data, size):
+        if size > self.max_bytes or self.max_entries < 1:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                # parsed concurrently
+                return
+            self._entries[key] = (data, size)
+            self.nbytes += size
+
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self.nbytes -= size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.nbytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TemplateParseCache(ParseCache):
+    """
+    Cache of parsed queries, keyed by the query text with lifted literals
+    (integer, float, single quoted string). Queries which differ only in the
+    values of literals are parsed once.
+
+    For a new template the query is parsed again with unique marker literals and
+    the positions of the markers in AST are recorded (negated numbers are
+    supported). Only the literals which are the values of constants are lifted:
+    the other ones (for example, alias 'x.y' is split to the parts of identifier)
+    are kept in the skeleton, queries with other values of them are parsed (fallbacks).
+    The skeleton is used only if every lifted literal is found exactly once and the
+    substitution of the values gives the same AST as parse_sql, otherwise the
+    queries of the template are parsed every time (fallbacks).
+
+    On a hit the skeleton is cloned and the new values are put into their
+    positions in the same pass, without lexing of the literals and LALR parsing.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024):
+        super().__init__(max_entries, max_bytes)
+        self.fallbacks = 0
+
+    def parse_sql(self, sql, dialect=None):
+        from mindsdb_sql_parser import parse_sql
+
+        try:
+            parts, kinds, values, texts = _lift_literals(sql)
+        except Exception:
+            # the error of lexer
+            return parse_sql(sql, dialect)
+
+        key = (parts, kinds, dialect)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                skeleton = entry[0]
+                if skeleton is None or any(values[i] != value for i, value in skeleton[1]):
+                    skeleton = None
+                    self.fallbacks += 1
+                else:
+                    self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            if skeleton is None:
+                return parse_sql(sql, dialect)
+            return _Skeleton.load(skeleton[0], values)
+
+        ast = parse_sql(sql, dialect)
+        skeleton = _Skeleton.build(ast, parts, kinds, values, texts, dialect)
+        self._put(key, skeleton, (len(skeleton[0]) if skeleton else 0) + len(sql))
+        return ast
+
+    def stats(self):
+        stats = super().stats()
+        stats['fallbacks'] = self.fallbacks
+        return stats
+
+
+def _lift_literals(sql):
+    # text between literals, types, values and text of literals
+    from mindsdb_sql_parser.lexer import MindsDBLexer
+
+    stream = MindsDBLexer().tokenize_compact(sql)
+    parts, kinds, values, texts = [], [], [], []
+    pos = 0
+    for i, type_id in enumerate(stream.types):
+        kind = stream.type_names[type_id]
+        convert = LITERAL_TOKENS.get(kind)
+        if convert is not None:
+            start, end = stream.starts[i], stream.ends[i]
+            parts.append(sql[pos:start])
+            kinds.append(kind)
+            values.append(convert(sql[start:end]))
+            texts.append(sql[start:end])
+            pos = end
+    parts.append(sql[pos:])
+    return tuple(parts), tuple(kinds), values, texts
+
+
+class _Skeleton:
+    # Literals in the pickled AST are persistent ids: index of the value or ~index for the negated value
+
+    MARKERS = {
+        'INTEGER': lambda i: str(10 ** 15 + i),
+        'FLOAT': lambda i: f'{10 ** 15 + i}.5',
+        'QUOTE_STRING': lambda i: f"'__Literal_{i}__'",
+    }
+
+    class Pickler(pickle.Pickler):
+        def __init__(self, file, markers):
+            super().__init__(file, pickle.HIGHEST_PROTOCOL)
+            self.markers = markers  # (type, value): persistent id
+            self.found = []
+
+        def persistent_id(self, obj):
+            if type(obj) in (int, float, str):
+                pid = self.markers.get((type(obj), obj))
+                if pid is not None:
+                    self.found.append(pid)
+                    return pid
+            return None
+
+    class Unpickler(pickle.Unpickler):
+        def __init__(self, data, values):
+            super().__init__(io.BytesIO(data))
+            self.values = values
+
+        def persistent_load(self, pid):
+            if pid >= 0:
+                return self.values[pid]
+            return -self.values[~pid]
+
+    @classmethod
+    def build(cls, ast, parts, kinds, values, texts, dialect):
+        # returns (pickled skeleton, ((index, value) of the literals which are not lifted))
+        # or None if the template can't be cached
+        from mindsdb_sql_parser import parse_sql
+        from mindsdb_sql_parser.ast import Constant, walk
+
+        def probe(lifted):
+            markers = {}
+            text = [parts[0]]
+            for i, kind in enumerate(kinds):
+                if i in lifted:
+                    marker_text = cls.MARKERS[kind](i)
+                    marker = LITERAL_TOKENS[kind](marker_text)
+                    markers[(type(marker), marker)] = i
+                    if kind != 'QUOTE_STRING':
+                        markers[(type(marker), -marker)] = ~i
+                    text.append(marker_text)
+                else:
+                    text.append(texts[i])
+                text.append(parts[i + 1])
+            return parse_sql(''.join(text), dialect), markers
+
+        try:
+            skeleton, markers = probe(range(len(kinds)))
+            # the value of the literal in other places can change the structure of AST
+            constants = {
+                (type(node.value), node.value) for node in walk(skeleton) if isinstance(node, Constant)
+            }
+            lifted = {i for key, i in markers.items() if key in constants}
+            lifted = {i if i >= 0 else ~i for i in lifted}
+            if len(lifted) < len(kinds):
+                skeleton, markers = probe(lifted)
+
+            file = io.BytesIO()
+            pickler = cls.Pickler(file, markers)
+            pickler.dump(skeleton)
+            data = file.getvalue()
+        except Exception:
+            return None
+
+        # every literal is found once and it is the only dependency on the values
+        if sorted(pid if pid >= 0 else ~pid for pid in pickler.found) != sorted(lifted):
+            return None
+        if cls.load(data, values) != ast:
+            return None
+        fixed = tuple((i, values[i]) for i in range(len(kinds)) if i not in lifted)
+        return data, fixed
+
+    @classmethod
+    def load(cls, data, values):
+        return cls.Unpickler(data, values).load()
@@ -0,0 +1,244 @@
+import re
+import bisect
+from collections import namedtuple
+
+from sly.lex import LexError
+
+
+Completion = namedtuple('Completion', ['expected', 'prefix', 'statement', 'clause', 'symbols'])
+
+_WORD_RE = re.compile(r'[a-zA-Z_][a-zA-Z_$0-9]*')
+
+# (heads of statements, terminals of `id`, other keywords used as names, keywords): computed from the grammar once
+_grammar_info = None
+
+
+def complete(sql, cursor_offset=None):
+    """
+    Valid continuations of the query at the cursor, computed from the LR tables of the
+    parser without the text after the cursor.
+
+    Returns Completion(expected, prefix, statement, clause, symbols):
+    - expected: the values which can be typed at the cursor: keywords (displayed as in
+      the error messages) and "[identifier]", "[number]", "[string]". Keywords which
+      can be used as identifiers are not listed if identifier is expected, keywords which
+      can be used as names of functions (LEFT) are listed after the other values
+    - prefix: the part of the word before the cursor, keywords are filtered by it
+    - statement: keywords of the statement at the cursor, for example 'SELECT', 'CREATE KNOWLEDGE_BASE'
+    - clause: the last keyword of the statement before the cursor, for example 'FROM', 'USING'
+    - symbols: grammar symbols recognized before the cursor, for example ['select', 'FROM']
+
+    expected is empty if the cursor is in a string or a comment or there is a syntax
+    error before it. Statements before the cursor separated by semicolon are skipped.
+    """
+    from mindsdb_sql_parser.lexer import MindsDBLexer
+
+    if cursor_offset is None:
+        cursor_offset = len(sql)
+    text = sql[:cursor_offset]
+
+    try:
+        stream = MindsDBLexer().tokenize_compact(text)
+    except LexError:
+        # unterminated string or quoted identifier
+        return Completion([], '', None, None, [])
+    return _complete(text, cursor_offset, stream)
+
+
+def _complete(text, cursor_offset, stream, checkpoints=()):
+    # tokens of the stream can continue after the cursor,
+    # checkpoints are (index of token, stack of states before it)
+    from mindsdb_sql_parser.lexer import MindsDBLexer
+    from mindsdb_sql_parser.parser import MindsDBParser
+
+    starts, ends = stream.starts, stream.ends
+    count = bisect.bisect_left(starts, cursor_offset)
+    unchanged = count  # checkpoints after the changed tokens are not used
+    last_end = ends[count - 1] if count else 0
+    if last_end > cursor_offset or text[last_end:cursor_offset].strip():
+        # the cursor is inside of the token or the comment: the text from the last token to the cursor
+        # is lexed again, the result is the same as for the text without the part after the cursor
+        index, lineno = (starts[count - 1], stream.linenos[count - 1]) if count else (0, 1)
+        unchanged = max(count - 1, 0)
+        stream = stream.slice(0, unchanged)
+        try:
+            for tok in MindsDBLexer().tokenize(text[:cursor_offset], lineno, index):
+                stream.append(tok.type, tok.index, tok.end, tok.lineno, tok.value)
+        except LexError:
+            # unterminated string or quoted identifier
+            return Completion([], '', None, None, [])
+        starts, ends = stream.starts, stream.ends
+        count = len(stream)
+
+    if _in_comment(text, cursor_offset, stream, count):
+        return Completion([], '', None, None, [])
+
+    # the word at the cursor is replaced by the completion
+    prefix = ''
+    if count and ends[count - 1] == cursor_offset:
+        word = text[starts[count - 1]:cursor_offset]
+        if _WORD_RE.fullmatch(word):
+            prefix = word
+            count -= 1
+
+    parser = MindsDBParser()
+    start, states = 0, None
+    for index, checkpoint_states in checkpoints:
+        if index <= min(count, unchanged):
+            start, states = index, checkpoint_states
+    statestack = parser.recognize(stream.slice(start, count), states)
+    if statestack is None:
+        # try the last statement
+        semicolon = stream.type_ids.get('SEMICOLON')
+        start = count
+        while start and stream.types[start - 1] != semicolon:
+            start -= 1
+        if start:
+            statestack = parser.recognize(stream.slice(start, count))
+    if statestack is None:
+        return Completion([], prefix, None, None, [])
+
+    lexer = MindsDBLexer()
+    heads, id_terminals, name_keywords, keywords = _get_grammar_info(parser, lexer)
+
+    terminals = parser.next_terminals(statestack)
+    expected, names = [], []
+    for name in terminals:
+        if name == 'ID':
+            value = '[identifier]'
+        elif name in id_terminals and 'ID' in terminals:
+            continue
+        elif name in keywords:
+            value = keywords[name]
+            if not value.upper().startswith(prefix.upper()):
+                continue
+        elif prefix:
+            # not a word
+            continue
+        else:
+            value = _token_value(lexer, name)
+        if value is None or value in expected or value in names:
+            continue
+        if name in name_keywords and 'ID' in terminals:
+            # it is expected as the name of function and as keyword (LEFT JOIN): after other values
+            names.append(value)
+        else:
+            expected.append(value)
+    expected.extend(names)
+
+    symbols = parser.stack_symbols(statestack)
+    statement, clause = _get_context(symbols, heads, keywords)
+    return Completion(expected, prefix, statement, clause, symbols)
+
+
+def _in_comment(text, cursor_offset, stream, count):
+    # the comment between the last token and the cursor
+    gap = text[stream.ends[count - 1] if count else 0:cursor_offset]
+    if '--' in gap.rsplit('\n', 1)[-1]:
+        return True
+    pos = gap.rfind('/*')
+    if pos != -1 and '*/' not in gap[pos + 2:]:
+        return True
+
+    # unterminated "/*" is lexed as DIVIDE and STAR
+    divide = stream.type_ids.get('DIVIDE')
+    pos = text.find('/*', 0, cursor_offset)
+    while pos != -1:
+        i = bisect.bisect_left(stream.starts, pos)
+        if i < len(stream) and stream.starts[i] == pos and stream.types[i] == divide:
+            return True
+        pos = text.find('/*', pos + 1, cursor_offset)
+    return False
+
+
+def _get_context(symbols, heads, keywords):
+    # the nearest statement to the cursor and the last keyword after its beginning.
+    # nested select can be anywhere, other statements are at the beginning or after "("
+    start = len(symbols) - 1
+    while start >= 0:
+        symbol = symbols[start]
+        if symbol in ('select', 'SELECT'):
+            break
+        if symbol in heads and (start == 0 or symbols[start - 1] == 'LPAREN'):
+            break
+        start -= 1
+    if start < 0:
+        return None, None
+
+    # keywords at the beginning of the statement, optional parts (*_or_empty) are skipped
+    words = [symbols[start].upper()]
+    if words[0] != 'SELECT':
+        for symbol in symbols[start + 1:]:
+            if symbol in keywords:
+                words.append(symbol)
+            elif not symbol.endswith('_or_empty'):
+                break
+
+    clause = words[0]
+    for symbol in symbols[start + 1:]:
+        if symbol in keywords:
+            clause = symbol
+    return ' '.join(words), clause
+
+
+def _token_value(lexer, token_name):
+    from mindsdb_sql_parser import ErrorHandling
+
+    value = ErrorHandling.token_value(lexer, token_name)
+    if value is not None:
+        return value
+
+    # keywords with alternatives: KNOWLEDGE_BASE
+    regexp = getattr(lexer, token_name, None)
+    if isinstance(regexp, str) and regexp.startswith('\\b'):
+        for value in (token_name.replace('_', ' '), token_name):
+            if re.fullmatch(regexp, value, re.IGNORECASE):
+                return value
+    return None
+
+
+def _get_grammar_info(parser, lexer):
+    global _grammar_info
+
+    if _grammar_info is None:
+        # statements start from these terminals
+        heads = set(parser.next_terminals([0]))
+        heads.discard('LPAREN')
+
+        productions = parser._grammar.Productions
+        nonterminals = {p.name for p in productions}
+
+        # keywords which are identifiers: alternatives of `id` and the first keywords of
+        # the rules which are alternatives of `id` (CHARACTER SET)
+        id_terminals = set()
+        rules, visited = ['id'], {'id'}
+        while rules:
+            rule = rules.pop()
+            for p in productions:
+                if p.name != rule or not p.prod:
+                    continue
+                first = p.prod[0]
+                if first not in nonterminals:
+                    if first != 'ID':
+                        id_terminals.add(first)
+                elif first not in visited and (len(p.prod) == 1 or rule != 'id'):
+                    visited.add(first)
+                    rules.append(first)
+
+        # keywords which are alternatives of `id` in other rules (function_name: LEFT)
+        name_rules = {p.name for p in productions if list(p.prod) == ['id']}
+        name_keywords = {
+            p.prod[0] for p in productions
+            if p.name in name_rules and len(p.prod) == 1 and p.prod[0] not in nonterminals
+        } - id_terminals - {'ID'}
+
+        keywords = {}
+        for name in parser._lrtable.lr_symbols[:parser._lrtable.nterminals]:
+            regexp = getattr(lexer, name, None)
+            if isinstance(regexp, str) and regexp.startswith('\\b'):
+                value = _token_value(lexer, name)
+                if value is not None:
+                    keywords[name] = value
+
+        _grammar_info = heads, id_terminals, name_keywords, keywords
+    return _grammar_info
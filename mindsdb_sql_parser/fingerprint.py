@@ -0,0 +1,85 @@
+import hashlib
+from collections import namedtuple
+
+from mindsdb_sql_parser.utils import LITERAL_TOKENS
+
+
+Fingerprint = namedtuple('Fingerprint', ['template', 'hash', 'literals'])
+
+# tokens which are not keywords
+_NAMES = {'ID', 'VARIABLE', 'SYSTEM_VARIABLE', 'PARAMETER', 'DQUOTE_STRING'}
+
+_NO_SPACE_BEFORE = {',', ')', '.'}
+_NO_SPACE_AFTER = {'(', '.'}
+
+
+def fingerprint(sql):
+    """
+    Normalized template of the query, computed from the tokens without parsing.
+
+    Literals (integer, float, single quoted string) are replaced by "?", lists of
+    literals in IN (...) are collapsed to "(...)". Keywords are in upper case,
+    comments and trailing semicolons are removed.
+
+    Returns Fingerprint(template, hash, literals): hash is a stable hex digest of the
+    template, literals are the values of the replaced literals in order
+    (tuple of values for collapsed IN list)
+    """
+    from mindsdb_sql_parser.lexer import MindsDBLexer
+
+    stream = MindsDBLexer().tokenize_compact(sql)
+    types = [stream.type_names[type_id] for type_id in stream.types]
+    starts, ends = stream.starts, stream.ends
+
+    count = len(types)
+    while count and types[count - 1] == 'SEMICOLON':
+        count -= 1
+
+    parts = []
+    literals = []
+    prev = None
+    i = 0
+    while i < count:
+        token_type = types[i]
+        value = sql[starts[i]:ends[i]]
+
+        if token_type in LITERAL_TOKENS:
+            literals.append(LITERAL_TOKENS[token_type](value))
+            value = '?'
+
+        elif token_type == 'LPAREN' and i and types[i - 1] in ('IN', 'NOT_IN'):
+            values = _literal_list(sql, types, starts, ends, i + 1, count)
+            if values is not None:
+                literals.append(tuple(values))
+                value = '(...)'
+                # skip values and RPAREN
+                i += len(values) * 2
+
+        elif token_type not in _NAMES and (value[0].isalpha() or value[0] == '_'):
+            # keyword
+            value = ' '.join(value.split()).upper()
+
+        if parts and prev not in _NO_SPACE_AFTER and value not in _NO_SPACE_BEFORE:
+            parts.append(' ')
+        parts.append(value)
+        prev = value
+        i += 1
+
+    template = ''.join(parts)
+    return Fingerprint(template, hashlib.blake2b(template.encode(), digest_size=8).hexdigest(), literals)
+
+
+def _literal_list(sql, types, starts, ends, i, count):
+    # values of "literal, literal, ... )" or None if there is something else
+    values = []
+    while i + 1 < count:
+        convert = LITERAL_TOKENS.get(types[i])
+        if convert is None:
+            return None
+        values.append(convert(sql[starts[i]:ends[i]]))
+        if types[i + 1] == 'RPAREN':
+            return values
+        if types[i + 1] != 'COMMA':
+            return None
+        i += 2
+    return None
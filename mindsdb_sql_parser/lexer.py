@@ -10,6 +10,8 @@ as a string.
 """
 class MindsDBLexer(Lexer):
     reflags = re.IGNORECASE
+    identifier = 'ID'
+    quoted_strings = {'QUOTE_STRING': "'", 'DQUOTE_STRING': '"'}
     ignore = ' \t\r'
     ignore_multi_comment = r'/\*[\s\S]*?\*/'
     ignore_line_comment = r'--[^\n]*'
@@ -342,25 +344,11 @@ class MindsDBLexer(Lexer):
 
     COLON = r'\:'
 
-    @_(r'(?:([a-zA-Z_$0-9]*[a-zA-Z_$]+[a-zA-Z_$0-9]*)|(?:`([^`]+)`))')
-    def ID(self, t):
-        return t
-
-    @_(r'\d+\.\d+')
-    def FLOAT(self, t):
-        return t
-
-    @_(r'\d+')
-    def INTEGER(self, t):
-        return t
-
-    @_(r"'(?:\\.|[^'])*(?:''(?:\\.|[^'])*)*'")
-    def QUOTE_STRING(self, t):
-        return t
-
-    @_(r'"(?:\\.|[^"])*(?:""(?:\\.|[^"])*)*"')
-    def DQUOTE_STRING(self, t):
-        return t
+    ID = r'(?:([a-zA-Z_$0-9]*[a-zA-Z_$]+[a-zA-Z_$0-9]*)|(?:`([^`]+)`))'
+    FLOAT = r'\d+\.\d+'
+    INTEGER = r'\d+'
+    QUOTE_STRING = r"'(?:\\.|[^'])*(?:''(?:\\.|[^'])*)*'"
+    DQUOTE_STRING = r'"(?:\\.|[^"])*(?:""(?:\\.|[^"])*)*"'
 
     @_(r'\n+')
     def ignore_newline(self, t):
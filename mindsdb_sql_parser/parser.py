@@ -1,6 +1,7 @@
 import re
 
 from sly import Parser
+from sly.lex import Token, TokenStream
 from mindsdb_sql_parser.ast import *
 from mindsdb_sql_parser.ast.drop import DropDatabase, DropView
 from mindsdb_sql_parser.ast.mindsdb.alter_database import AlterDatabase
@@ -26,7 +27,8 @@ from mindsdb_sql_parser.ast.mindsdb.skills import CreateSkill, DropSkill, Update
 from mindsdb_sql_parser.exceptions import ParsingException
 from mindsdb_sql_parser.ast.mindsdb.retrain_predictor import RetrainPredictor
 from mindsdb_sql_parser.ast.mindsdb.finetune_predictor import FinetunePredictor
-from mindsdb_sql_parser.utils import ensure_select_keyword_order, JoinType, tokens_to_string, unquote
+from mindsdb_sql_parser.utils import ensure_select_keyword_order, JoinType, tokens_to_string, unquote, \
+    RawQueryParts
 from mindsdb_sql_parser.logger import ParserLogger
 
 from mindsdb_sql_parser.lexer import MindsDBLexer
@@ -34,6 +36,8 @@ from mindsdb_sql_parser.lexer import MindsDBLexer
 all_tokens_list = MindsDBLexer.tokens.copy()
 all_tokens_list.remove('RPAREN')
 all_tokens_list.remove('LPAREN')
+# the order of productions has to be the same in every process to reuse prebuilt LR tables
+all_tokens_list = sorted(all_tokens_list)
 
 """
 Unfortunately the rules are not iherited from base SQLParser, because it just doesn't work with Sly due to metaclass magic.
@@ -44,6 +48,7 @@ class MindsDBParser(Parser):
     log = ParserLogger()
     tokens = MindsDBLexer.tokens
     start = "query"
+    text = None
 
     precedence = (
         ('left', OR),
@@ -253,7 +258,7 @@ class MindsDBParser(Parser):
     @_('CREATE TRIGGER identifier ON identifier LPAREN raw_query RPAREN')
     @_('CREATE TRIGGER identifier ON identifier COLUMNS column_list LPAREN raw_query RPAREN')
     def create_trigger(self, p):
-        query_str = tokens_to_string(p.raw_query)
+        query_str = self.raw_query_str(p.raw_query)
 
         columns = None
         if hasattr(p, 'column_list'):
@@ -282,10 +287,10 @@ class MindsDBParser(Parser):
        )
     def create_job(self, p):
         if hasattr(p, 'raw_query0'):
-            query_str = tokens_to_string(p.raw_query0)
-            if_query_str = tokens_to_string(p.raw_query1)
+            query_str = self.raw_query_str(p.raw_query0)
+            if_query_str = self.raw_query_str(p.raw_query1)
         else:
-            query_str = tokens_to_string(p.raw_query)
+            query_str = self.raw_query_str(p.raw_query)
             if_query_str = None
 
         job_schedule = getattr(p, 'job_schedule', {})
@@ -683,9 +688,10 @@ class MindsDBParser(Parser):
         columns = getattr(p, 'column_list', None)
         return Insert(table=p.identifier, columns=columns, values=p.expr_list_set)
 
-    @_('expr_list_set COMMA expr_list_set')
+    @_('expr_list_set COMMA LPAREN expr_list RPAREN')
     def expr_list_set(self, p):
-        return p.expr_list_set0 + p.expr_list_set1
+        p.expr_list_set.append(p.expr_list)
+        return p.expr_list_set
 
     @_('LPAREN expr_list RPAREN')
     def expr_list_set(self, p):
@@ -727,7 +733,7 @@ class MindsDBParser(Parser):
        'CREATE VIEW if_not_exists_or_empty identifier create_view_from_table_or_nothing AS LPAREN raw_query RPAREN',
        'CREATE VIEW if_not_exists_or_empty identifier create_view_from_table_or_nothing LPAREN raw_query RPAREN')
     def create_view(self, p):
-        query_str = tokens_to_string(p.raw_query)
+        query_str = self.raw_query_str(p.raw_query)
         using = getattr(p, 'kw_parameter_list', None)
 
         return CreateView(name=p.identifier,
@@ -742,7 +748,7 @@ class MindsDBParser(Parser):
        'ALTER VIEW identifier create_view_from_table_or_nothing AS LPAREN raw_query RPAREN',
        'ALTER VIEW identifier create_view_from_table_or_nothing LPAREN raw_query RPAREN')
     def alter_view(self, p):
-        query_str = tokens_to_string(p.raw_query)
+        query_str = self.raw_query_str(p.raw_query)
         using = getattr(p, 'kw_parameter_list', None)
 
         return AlterView(
@@ -911,7 +917,7 @@ class MindsDBParser(Parser):
     def create_predictor(self, p):
         query_str = None
         if hasattr(p, 'raw_query'):
-            query_str = tokens_to_string(p.raw_query)
+            query_str = self.raw_query_str(p.raw_query)
 
         if hasattr(p, 'identifier'):
             # single identifier field
@@ -942,7 +948,7 @@ class MindsDBParser(Parser):
 
         query_str = None
         if hasattr(p, 'raw_query'):
-            query_str = tokens_to_string(p.raw_query)
+            query_str = self.raw_query_str(p.raw_query)
 
         if hasattr(p, 'identifier'):
             # single identifier field
@@ -980,7 +986,7 @@ class MindsDBParser(Parser):
     def create_predictor(self, p):
         query_str = None
         if hasattr(p, 'raw_query'):
-            query_str = tokens_to_string(p.raw_query)
+            query_str = self.raw_query_str(p.raw_query)
 
         if hasattr(p, 'identifier'):
             # single identifier field
@@ -1002,7 +1008,7 @@ class MindsDBParser(Parser):
     def create_predictor(self, p):
         query_str = None
         if hasattr(p, 'raw_query'):
-            query_str = tokens_to_string(p.raw_query)
+            query_str = self.raw_query_str(p.raw_query)
 
         if hasattr(p, 'identifier'):
             # single identifier field
@@ -1032,7 +1038,7 @@ class MindsDBParser(Parser):
 
         return Evaluate(
             name=name,
-            query_str=tokens_to_string(p.raw_query),
+            query_str=self.raw_query_str(p.raw_query),
             using=using
         )
 
@@ -1341,7 +1347,7 @@ class MindsDBParser(Parser):
     def from_table(self, p):
         query = NativeQuery(
             integration=p.identifier,
-            query=tokens_to_string(p.raw_query)
+            query=self.raw_query_str(p.raw_query)
         )
         return query
 
@@ -2055,17 +2061,28 @@ class MindsDBParser(Parser):
 
     # for raw query
 
+    # raw_query is a token or RawQueryParts: the tokens are not copied
+
     @_('LPAREN raw_query RPAREN')
     def raw_query(self, p):
-        return [p._slice[0]] + p[1] + [p._slice[2]]
+        return RawQueryParts((p._slice[0], p[1], p._slice[2]))
 
     @_('raw_query LPAREN RPAREN')
     def raw_query(self, p):
-        return p[0] + [p._slice[1], p._slice[2]]
+        return RawQueryParts((p[0], p._slice[1], p._slice[2]))
+
+    @_('raw_query LPAREN raw_query RPAREN')
+    def raw_query(self, p):
+        return RawQueryParts((p[0], p._slice[1], p[2], p._slice[3]))
 
-    @_('raw_query raw_query')
+    # left recursion: the tokens are reduced one by one and don't pile up in the parser stack
+    @_('raw_query raw_query_token')
     def raw_query(self, p):
-        return p[0] + p[1]
+        return RawQueryParts((p[0], p[1]))
+
+    @_('raw_query_token')
+    def raw_query(self, p):
+        return p[0]
 
     @_('variable')
     def table_or_subquery(self, p):
@@ -2111,13 +2128,42 @@ class MindsDBParser(Parser):
         return False
 
     @_(*all_tokens_list)
-    def raw_query(self, p):
-        return p._slice
+    def raw_query_token(self, p):
+        return p._slice[0]
+
+    def raw_query_str(self, raw_query):
+        # the body of raw query is sliced from the source text, it is restored from the tokens
+        # if the text is unknown
+        if self.text is None:
+            return tokens_to_string(list(self.raw_query_tokens(raw_query)))
+        first = last = raw_query
+        while not isinstance(first, Token):
+            first = first[0]
+        while not isinstance(last, Token):
+            last = last[-1]
+        return self.text[first.index:last.end]
+
+    @staticmethod
+    def raw_query_tokens(raw_query):
+        stack = [raw_query]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Token):
+                yield item
+            else:
+                stack.extend(reversed(item))
 
     @_('')
     def empty(self, p):
         pass
 
+    def parse(self, tokens, text=None, stacks=None):
+        # text is the source of the tokens, TokenStream keeps it
+        if isinstance(tokens, TokenStream):
+            text = tokens.text
+        self.text = text
+        return super().parse(tokens, stacks)
+
     def error(self, p, expected_tokens=None):
 
         if not hasattr(self, 'used_tokens'):
@@ -2127,9 +2173,16 @@ class MindsDBParser(Parser):
             else:
                 raise ParsingException("Syntax error at EOF")
 
+        # the rest of the input is consumed: parsing is not continued after the error
+        tokens = list(self.tokens)
+        if self.token_stream is not None:
+            tokens = self.token_stream[:len(self.token_stream) - len(tokens)] + tokens
+        else:
+            tokens = self.used_tokens.copy() + tokens
+
         # save error info for future usage
         self.error_info = dict(
-            tokens=self.used_tokens.copy() + list(self.tokens),
+            tokens=tokens,
             bad_token=p,
             expected_tokens=expected_tokens
         )
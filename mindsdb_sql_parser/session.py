@@ -0,0 +1,258 @@
+import io
+import bisect
+import pickle
+from array import array
+
+from sly.lex import Token, TokenStream, LexError
+
+from mindsdb_sql_parser.exceptions import ParsingException
+from mindsdb_sql_parser.utils import RawQueryParts
+
+
+class ParseSession:
+    """
+    Parsing of the text which is changed by small edits (buffer of sql editor).
+
+    Tokens of the text are kept between the edits, only the tokens around the edit are
+    lexed again. During the parsing the stacks of the parser are saved every
+    `checkpoint_interval` tokens: parse() continues from the last checkpoint before the
+    first changed token.
+
+        session = ParseSession(sql)
+        query = session.parse()
+        session.edit(offset, length, text)  # replace `length` characters at `offset` by `text`
+        query = session.parse()
+
+    parse() returns the same AST or raises the same exception as parse_sql(session.text)
+    """
+
+    # tokens of several words (GROUP BY, NOT IN, ...) before the edit are lexed again
+    relex_back = 2
+
+    # checkpoint is skipped if the size of the previous one is larger than this number of bytes
+    # per token from it: AST nodes in the stacks are copied to the checkpoint
+    checkpoint_bytes_per_token = 64
+
+    def __init__(self, text='', checkpoint_interval=256):
+        self.text = text
+        self.checkpoint_interval = checkpoint_interval
+
+        self.tokens = None  # TokenStream of the text, None if it has to be lexed
+        self._checkpoints = []  # (token index, stack of states, pickled stack of symbols, tokens in it)
+
+        # statistics: the number of tokens lexed by the last edit and parsed by the last parse
+        self.relexed = 0
+        self.reparsed = 0
+
+    def edit(self, offset, length, text):
+        if offset < 0 or length < 0 or offset + length > len(self.text):
+            raise ValueError(f'Edit ({offset}, {length}) is out of the text')
+
+        self.text = self.text[:offset] + text + self.text[offset + length:]
+
+        first = 0
+        if self.tokens is not None:
+            try:
+                first = self._relex(offset, length, len(text))
+            except LexError:
+                # the error is raised by parse()
+                self.tokens = None
+                first = 0
+
+        # checkpoints after the changed tokens are not valid
+        while self._checkpoints and self._checkpoints[-1][0] > first:
+            self._checkpoints.pop()
+
+    def parse(self):
+        from mindsdb_sql_parser import ErrorHandling, parse_sql
+        from mindsdb_sql_parser.lexer import MindsDBLexer
+        from mindsdb_sql_parser.parser import MindsDBParser
+
+        if self.tokens is None:
+            self._checkpoints = []
+            self.relexed = 0
+            try:
+                self.tokens = MindsDBLexer().tokenize_compact(self.text)
+            except LexError:
+                # parse_sql lexes lazily: the parser can fail before the illegal character
+                self.reparsed = 0
+                return parse_sql(self.text)
+        stream = self.tokens
+
+        # trailing semicolons are skipped as in parse_sql
+        count = len(stream)
+        semicolon = stream.type_ids.get('SEMICOLON')
+        while count and stream.types[count - 1] == semicolon:
+            count -= 1
+
+        while self._checkpoints and self._checkpoints[-1][0] > count:
+            self._checkpoints.pop()
+
+        start, stacks = 0, None
+        if self._checkpoints:
+            start, states, data, refs = self._checkpoints[-1]
+            stacks = (list(states), _Unpickler(data, refs).load())
+        self.reparsed = count - start
+
+        parser = MindsDBParser()
+        ast = parser.parse(self._iter_tokens(parser, start, count), text=self.text, stacks=stacks)
+
+        if ast is None:
+            # the rest of the tokens is read by the parser after the error: the checkpoints are not valid
+            error_info = parser.error_info
+            bad_token = error_info['bad_token']
+            bad_index = count if bad_token is None else bisect.bisect_left(stream.starts, bad_token.index)
+            while self._checkpoints and self._checkpoints[-1][0] > bad_index:
+                self._checkpoints.pop()
+
+            # tokens before the checkpoint are required for the error message
+            error_info['tokens'] = [stream.token(i) for i in range(start)] + error_info['tokens']
+            raise ParsingException(ErrorHandling(MindsDBLexer(), parser).process())
+        return ast
+
+    def complete(self, cursor_offset):
+        """
+        The same as complete(session.text, cursor_offset), the tokens of the session are used
+        and the automaton is started from the checkpoint of the last parse() before the cursor
+        """
+        from mindsdb_sql_parser.completion import complete, _complete
+        from mindsdb_sql_parser.lexer import MindsDBLexer
+
+        if self.tokens is None:
+            self._checkpoints = []
+            try:
+                self.tokens = MindsDBLexer().tokenize_compact(self.text)
+            except LexError:
+                # the text before the cursor can be correct
+                return complete(self.text, cursor_offset)
+
+        checkpoints = [(index, states) for index, states, _, _ in self._checkpoints]
+        return _complete(self.text, cursor_offset, self.tokens, checkpoints)
+
+    def _iter_tokens(self, parser, start, count):
+        stream = self.tokens
+        interval = self.checkpoint_interval
+        for i in range(start, count):
+            if i > start and i % interval == 0:
+                # the parser is waiting for the token i: tokens before it are processed
+                self._save_checkpoint(parser, i)
+            yield stream.token(i)
+
+    def _save_checkpoint(self, parser, index):
+        if self._checkpoints:
+            last_index, _, last_data, _ = self._checkpoints[-1]
+            if len(last_data) > (index - last_index) * self.checkpoint_bytes_per_token:
+                return
+
+        # AST nodes in the stack can be changed by the next reductions: they are copied.
+        # tokens and parts of raw queries are not changed, they are kept as is
+        file = io.BytesIO()
+        pickler = _Pickler(file)
+        try:
+            pickler.dump(parser.symstack)
+        except Exception:
+            # too deep tree
+            return
+        self._checkpoints.append((index, list(parser.statestack), file.getvalue(), pickler.refs))
+
+    def _relex(self, offset, length, inserted):
+        # updates the tokens of the edited text, returns index of the first changed token
+        from mindsdb_sql_parser.lexer import MindsDBLexer
+
+        stream = self.tokens
+        text = self.text
+        starts, ends, linenos = stream.starts, stream.ends, stream.linenos
+        count = len(stream)
+        delta = inserted - length
+
+        # lexing is started from the boundary of the token before the edit
+        first = max(bisect.bisect_left(ends, offset) - self.relex_back, 0)
+        if '*/' in text[max(offset - 1, 0):offset + inserted + 1]:
+            # the end of the comment: unclosed "/*" before the edit was lexed as DIVIDE and STAR
+            divide, star = stream.type_ids.get('DIVIDE'), stream.type_ids.get('STAR')
+            types = stream.types
+            for i in range(first):
+                if types[i] == divide and types[i + 1] == star and ends[i] == starts[i + 1]:
+                    first = i
+                    break
+        if first > 0:
+            index, lineno = starts[first], linenos[first]
+        else:
+            index, lineno = 0, 1
+
+        # tokens after the edit are the same after the first token which is the same
+        tail = bisect.bisect_left(starts, offset + length)
+        edit_end = offset + inserted
+        new_tokens = []
+        same = count
+        line_delta = 0
+        for tok in MindsDBLexer().tokenize(text, lineno, index):
+            if tok.index >= edit_end:
+                old_start = tok.index - delta
+                j = bisect.bisect_left(starts, old_start, tail)
+                if (
+                    j < count and starts[j] == old_start and ends[j] == tok.end - delta
+                    and stream.type(j) == tok.type
+                ):
+                    same = j
+                    line_delta = tok.lineno - linenos[j]
+                    break
+            new_tokens.append(tok)
+        self.relexed = len(new_tokens)
+
+        new_stream = TokenStream(text, stream.type_ids)
+        new_stream.types = stream.types[:first]
+        new_stream.starts = starts[:first]
+        new_stream.ends = ends[:first]
+        new_stream.linenos = linenos[:first]
+        new_stream.values = {i: value for i, value in stream.values.items() if i < first}
+
+        for tok in new_tokens:
+            value = tok.value
+            if value == text[tok.index:tok.end]:
+                value = None
+            new_stream.append(tok.type, tok.index, tok.end, tok.lineno, value)
+
+        shift = len(new_stream) - same
+        new_stream.types.extend(stream.types[same:])
+        new_stream.starts.extend(array('I', [start + delta for start in starts[same:]]))
+        new_stream.ends.extend(array('I', [end + delta for end in ends[same:]]))
+        new_stream.linenos.extend(array('I', [lineno + line_delta for lineno in linenos[same:]]))
+        for i, value in stream.values.items():
+            if i >= same:
+                new_stream.values[i + shift] = value
+        self.tokens = new_stream
+
+        # relexed tokens before the edit can be the same
+        changed = first
+        for tok in new_tokens:
+            if (
+                tok.end > offset or changed >= count or tok.index != starts[changed]
+                or tok.end != ends[changed] or tok.type != stream.type(changed)
+            ):
+                break
+            changed += 1
+        return changed
+
+
+class _Pickler(pickle.Pickler):
+    # tokens and raw query parts are saved by reference
+
+    def __init__(self, file):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.refs = []
+
+    def persistent_id(self, obj):
+        if type(obj) is Token or type(obj) is RawQueryParts:
+            self.refs.append(obj)
+            return len(self.refs) - 1
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, data, refs):
+        super().__init__(io.BytesIO(data))
+        self.refs = refs
+
+    def persistent_load(self, pid):
+        return self.refs[pid]
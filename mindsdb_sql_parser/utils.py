@@ -59,6 +59,11 @@ def to_single_line(text):
     return text
 
 
+class RawQueryParts(tuple):
+    # parts of the raw query: tokens and RawQueryParts, they are not changed after parsing
+    __slots__ = ()
+
+
 def tokens_to_string(tokens):
     # converts list of token (after lexer) to original string
 
@@ -100,7 +105,9 @@ def tokens_to_string(tokens):
 
 
 def unquote(s, is_double_quoted=False):
-    s = s.replace('\\"', '"').replace("\\'", "'")
+    # str.replace doesn't copy the string if there is nothing to replace
+    if '\\' in s:
+        s = s.replace('\\"', '"').replace("\\'", "'")
     if is_double_quoted:
         s = s.replace('""', '"')
     else:
@@ -108,6 +115,15 @@ def unquote(s, is_double_quoted=False):
     return s
 
 
+# token type of the literal: conversion of the token to the value of Constant (the same as in the parser).
+# Used by the modules which read the literals from the tokens without the parser (fingerprint, cache)
+LITERAL_TOKENS = {
+    'INTEGER': int,
+    'FLOAT': float,
+    'QUOTE_STRING': lambda value: unquote(value).strip('\''),
+}
+
+
 def dump_json(obj) -> str:
     '''
        dump dict into json-like string using:
@@ -8,11 +8,13 @@ with open("mindsdb_sql_parser/__about__.py") as fp:
 
 class Build(build_module.build):
   def run(self):
+    # generates mindsdb_sql_parser/parser_tab.py: it is packaged as the other modules
     from mindsdb_sql_parser.parser import MindsDBParser
     try:
-        MindsDBParser.build_to_file()
+        MindsDBParser.build_module()
     except Exception as e:
         print(f'Problem with building syntax. Import might be not efficient: {e}')
+    super().run()
 
 
 setuptools.setup(
@@ -25,9 +27,6 @@ setuptools.setup(
     author_email=about['__email__'],
     description=about['__description__'],
     packages=setuptools.find_packages(exclude=('tests*',)),
-    package_data={
-        about['__title__']: ['*.json'],
-    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "Operating System :: OS Independent",
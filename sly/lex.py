@@ -31,10 +31,16 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 # -----------------------------------------------------------------------------
 
-__all__ = ['Lexer', 'LexerStateChange', 'Token']
+__all__ = ['Lexer', 'LexerStateChange', 'Token', 'TokenStream']
 
 import re
 import copy
+from array import array
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
 
 
 class LexError(Exception):
@@ -49,6 +55,9 @@ class LexError(Exception):
         self.text = text
         self.error_index = error_index
 
+    def __reduce__(self):
+        return type(self), (self.args[0], self.text, self.error_index)
+
 class PatternError(Exception):
     '''
     Exception raised if there's some kind of problem with the specified
@@ -74,10 +83,99 @@ class Token(object):
     '''
     Representation of a single token.
     '''
-    __slots__ = ('type', 'value', 'lineno', 'index', 'end')
+    __slots__ = ('type', 'value', 'lineno', 'index', 'end', 'type_id')
     def __repr__(self):
         return f'Token(type={self.type!r}, value={self.value!r}, lineno={self.lineno}, index={self.index}, end={self.end})'
 
+class TokenStream(object):
+    '''
+    Compact representation of the tokens of a text, created by Lexer.tokenize_compact().
+    Tokens are stored in parallel arrays: numbers of the types (indexes in
+    type_names), start and end offsets in the text and line numbers. Values
+    are sliced from the text on access, only the values which were changed by
+    token functions are stored (in values).
+    Token objects are created on access by index or by iteration.
+    '''
+    __slots__ = ('text', 'type_names', 'type_ids', 'types', 'starts', 'ends', 'linenos', 'values')
+
+    def __init__(self, text, type_ids):
+        self.text = text
+        self.type_ids = type_ids                       # type name -> number
+        self.type_names = sorted(type_ids, key=type_ids.get)
+        self.types = array('H')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.linenos = array('I')
+        self.values = {}                               # index of token -> changed value
+
+    def append(self, type, start, end, lineno, value=None):
+        type_id = self.type_ids.get(type)
+        if type_id is None:
+            # type which is not declared in the lexer
+            if len(self.type_ids) == len(self.type_names):
+                self.type_ids = dict(self.type_ids)
+            type_id = self.type_ids[type] = len(self.type_names)
+            self.type_names.append(type)
+        if value is not None:
+            self.values[len(self.types)] = value
+        self.types.append(type_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.linenos.append(lineno)
+
+    def __len__(self):
+        return len(self.types)
+
+    def type(self, i):
+        return self.type_names[self.types[i]]
+
+    def value(self, i):
+        if i < 0:
+            i += len(self.types)
+        value = self.values.get(i)
+        if value is None:
+            value = self.text[self.starts[i]:self.ends[i]]
+        return value
+
+    def token(self, i):
+        if i < 0:
+            i += len(self.types)
+        tok = Token()
+        tok.type_id = self.types[i]
+        tok.type = self.type_names[tok.type_id]
+        tok.value = self.value(i)
+        tok.lineno = self.linenos[i]
+        tok.index = self.starts[i]
+        tok.end = self.ends[i]
+        return tok
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.token(n) for n in range(*i.indices(len(self.types)))]
+        if not -len(self.types) <= i < len(self.types):
+            raise IndexError('token index out of range')
+        return self.token(i)
+
+    def __iter__(self):
+        for i in range(len(self.types)):
+            yield self.token(i)
+
+    def slice(self, start, stop):
+        '''
+        TokenStream of the tokens from start to stop (the same text)
+        '''
+        stream = TokenStream(self.text, self.type_ids)
+        stream.type_names = self.type_names
+        stream.types = self.types[start:stop]
+        stream.starts = self.starts[start:stop]
+        stream.ends = self.ends[start:stop]
+        stream.linenos = self.linenos[start:stop]
+        stream.values = {i - start: value for i, value in self.values.items() if start <= i < stop}
+        return stream
+
+    def __repr__(self):
+        return f'TokenStream(tokens={len(self.types)})'
+
 class TokenStr(str):
     @staticmethod
     def __new__(cls, value, key=None, remap=None):
@@ -96,6 +194,157 @@ class TokenStr(str):
         if self.remap is not None:
             self.remap[self.key, key] = self.key
 
+# -----------------------------------------------------------------------------
+# Keyword rules
+#
+# Rules like r'\bSELECT\b', r'\bGROUP[\s]+BY\b', r'\bKNOWLEDGE([_]|[\s]+)BASE\b'
+# or r'\bFETCH[\s]+(FIRST|NEXT)\b' match whole words. If the lexer defines the
+# identifier token, such rules are not included into the master regex: words
+# are matched by the rule of identifier and then looked up in the keyword table.
+# -----------------------------------------------------------------------------
+
+_keyword_word = r'[A-Za-z_][A-Za-z0-9_]*'
+_keyword_item_re = re.compile(rf'(?:({_keyword_word})|\(((?:{_keyword_word})(?:\|{_keyword_word})*)\))')
+_keyword_separators = {
+    r'[\s]+': (False,),            # whitespace between the words
+    r'\s+': (False,),
+    r'([_]|[\s]+)': (True, False), # the words are joined with "_" or separated by whitespace
+}
+_word_re = re.compile(r'\w+')
+_space_word_re = re.compile(r'\s+(\w+)')
+
+def _keyword_phrases(pattern):
+    '''
+    Returns the list of phrases matched by a keyword rule (tuples of words)
+    or None if the pattern is not a keyword rule
+    '''
+    if not (pattern.startswith(r'\b') and pattern.endswith(r'\b')):
+        return None
+    body = pattern[2:-2]
+
+    phrases = [((), False)]         # (words, join the next word to the last one)
+    pos = 0
+    while True:
+        m = _keyword_item_re.match(body, pos)
+        if m is None:
+            return None
+        alternatives = [m.group(1)] if m.group(1) else m.group(2).split('|')
+        pos = m.end()
+
+        phrases = [
+            (words[:-1] + (f'{words[-1]}_{word}',) if join else words + (word,), False)
+            for words, join in phrases
+            for word in alternatives
+        ]
+        if pos == len(body):
+            return [words for words, _ in phrases]
+
+        for separator, joins in _keyword_separators.items():
+            if body.startswith(separator, pos):
+                pos += len(separator)
+                break
+        else:
+            return None
+        phrases = [(words, join) for words, _ in phrases for join in joins]
+
+def _first_chars(pattern, flags=0):
+    '''
+    Characters which can start a match of the pattern or None if they are unknown
+    '''
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+
+    def first(items):
+        if not items:
+            return None
+        op, av = items[0]
+        if op is sre_parse.LITERAL:
+            return {chr(av)}
+        if op is sre_parse.SUBPATTERN:
+            return first(list(av[-1]))
+        if op is sre_parse.BRANCH:
+            chars = set()
+            for branch in av[1]:
+                branch_chars = first(list(branch))
+                if branch_chars is None:
+                    return None
+                chars |= branch_chars
+            return chars
+        return None
+
+    chars = first(list(parsed))
+    if chars is not None and flags & re.IGNORECASE:
+        chars |= {c.swapcase() for c in chars}
+    return chars
+
+def _match_keyword(text, index, keywords, upper):
+    '''
+    Match the keyword at the position of an identifier. Returns (token, end) or None
+    '''
+    # \b before the word
+    if index and (text[index - 1].isalnum() or text[index - 1] == '_'):
+        return None
+    m = _word_re.match(text, index)
+    if m is None:
+        return None
+    word = m.group()
+    rules = keywords.get(word.upper() if upper else word)
+    if rules is None:
+        return None
+
+    for next_words, tokname in rules:
+        end = m.end()
+        for next_word in next_words:
+            s = _space_word_re.match(text, end)
+            if s is None or (s.group(1).upper() if upper else s.group(1)) != next_word:
+                break
+            end = s.end()
+        else:
+            return tokname, end
+    return None
+
+# -----------------------------------------------------------------------------
+# Quoted strings
+#
+# Tokens listed in Lexer.quoted_strings are string literals with the pattern
+# Q(?:\\.|[^Q])*(?:QQ(?:\\.|[^Q])*)*Q for the quote character Q: "\" escapes the
+# next character and the doubled quote is a part of the string. The regex
+# backtracks exponentially on an unterminated string with many backslashes,
+# such literals are matched by the linear scanner instead.
+# -----------------------------------------------------------------------------
+
+_quoted_bodies = {}
+
+def _scan_quoted(text, index, quote):
+    '''
+    Match the string literal which starts with the quote at the index.
+    Returns the end of the literal (the same as the regex would match) or -1
+    '''
+    body = _quoted_bodies.get(quote)
+    if body is None:
+        # Alternatives start with different characters and nothing follows the
+        # repetition: the match never backtracks
+        q = re.escape(quote)
+        body = _quoted_bodies[quote] = re.compile(rf'(?:[^\\{q}]+|\\[\s\S]|{q}{q})*')
+
+    # The regex prefers escapes and doubled quotes
+    end = body.match(text, index + 1).end()
+    if end < len(text) and text[end] == quote:
+        return end + 1
+
+    # The end of the text is reached this way, the regex backtracks:
+    # the literal ends at the last quote of the text
+    last = text.rfind(quote, index + 1)
+    if last < 0:
+        return -1
+    end = body.match(text, index + 1, last).end()
+    if end == last - 1 and text[end] == quote:
+        # the last quote is doubled, the first one ends the literal
+        return last
+    return last + 1
+
 class _Before:
     def __init__(self, tok, pattern):
         self.tok = tok
@@ -189,10 +438,21 @@ class Lexer(metaclass=LexerMeta):
     reflags = 0
     regex_module = re
 
+    # Token of identifiers. Keyword rules defined before it are not included into
+    # the master regex, the words matched by it are looked up in the keyword table
+    identifier = None
+
+    # String literals matched by the scanner of quoted strings: {token: quote character}
+    quoted_strings = {}
+
     _token_names = set()
     _token_funcs = {}
     _ignored_tokens = set()
     _remapping = {}
+    _token_ids = {}
+    _keywords = {}
+    _string_starts = None
+    _quotes = {}
     _delete = {}
     _remap = {}
 
@@ -253,7 +513,7 @@ class Lexer(metaclass=LexerMeta):
                     rules.append((key, value))
                     existing[key] = value
 
-            elif isinstance(value, str) and not key.startswith('_') and key not in {'ignore', 'literals'}:
+            elif isinstance(value, str) and not key.startswith('_') and key not in {'ignore', 'literals', 'identifier'}:
                 raise LexerBuildError(f'{key} does not match a name in tokens')
 
         # Apply deletion rules
@@ -289,10 +549,21 @@ class Lexer(metaclass=LexerMeta):
             missing = ', '.join(undefined)
             raise LexerBuildError(f'{missing} not included in token(s)')
 
+        # Numbers of the token types. The parser numbers its terminals in the same order
+        cls._token_ids = {name: i for i, name in enumerate(sorted(cls._token_names | set(cls.literals)))}
+
         cls._collect_rules()
 
+        # Keyword table: first word -> ((next words, token), ...) in the order of the rules
+        keywords = {}
+        keyword_rules = cls.identifier in dict(cls._rules)
+        upper = bool(cls.reflags & re.IGNORECASE)
+
         parts = []
         for tokname, value in cls._rules:
+            if tokname == cls.identifier:
+                keyword_rules = False
+
             if tokname.startswith('ignore_'):
                 tokname = tokname[7:]
                 cls._ignored_tokens.add(tokname)
@@ -300,12 +571,23 @@ class Lexer(metaclass=LexerMeta):
             if isinstance(value, str):
                 pattern = value
 
+                phrases = _keyword_phrases(pattern) if keyword_rules else None
+                if phrases is not None:
+                    for phrase in phrases:
+                        if upper:
+                            phrase = tuple(word.upper() for word in phrase)
+                        keywords.setdefault(phrase[0], []).append((phrase[1:], tokname))
+                    continue
+
             elif callable(value):
                 cls._token_funcs[tokname] = value
                 pattern = getattr(value, 'pattern')
             else:
                 continue
 
+            if tokname in cls.quoted_strings:
+                continue
+
             # Form the regular expression component
             part = f'(?P<{tokname}>{pattern})'
 
@@ -335,7 +617,15 @@ class Lexer(metaclass=LexerMeta):
             else:
                 filtered_parts.append(p)
         cls._master_re = cls.regex_module.compile('|'.join(filtered_parts), cls.reflags)
-        cls._strings_pattern_re = cls.regex_module.compile('|'.join(string_parts), cls.reflags)
+        # "(?!)" never matches: a lexer without string tokens
+        cls._strings_pattern_re = cls.regex_module.compile('|'.join(string_parts) or '(?!)', cls.reflags)
+        # string patterns are tried only at the characters which can start them
+        cls._string_starts = _first_chars('|'.join(string_parts), cls.reflags) if string_parts else set()
+        rules = dict(cls._rules)
+        cls._quotes = {quote: tokname for tokname, quote in cls.quoted_strings.items() if tokname in rules}
+        if cls._string_starts is not None:
+            cls._string_starts |= set(cls._quotes)
+        cls._keywords = {word: tuple(rules) for word, rules in keywords.items()}
 
         # Verify that that ignore and literals specifiers match the input type
         if not isinstance(cls.ignore, str):
@@ -368,12 +658,19 @@ class Lexer(metaclass=LexerMeta):
         '''
         self.begin(self.__state_stack.pop())
 
-    def tokenize(self, text, lineno=1, index=0):
-        _ignored_tokens = _master_re =_strings_pattern_re = _ignore = _token_funcs = _literals = _remapping = None
+    def _scan(self, text, lineno=1, index=0):
+        '''
+        Scan the text. Yields (type, type_id, index, end, lineno, token) for every token:
+        token is the Token returned by the token function or by error(), None for other
+        tokens (their value is the text between index and end)
+        '''
+        _ignored_tokens = _master_re =_strings_pattern_re = _ignore = _token_funcs = _literals = _remapping = _token_ids = None
+        _identifier = _keywords = _upper = _string_starts = _quotes = None
 
         # --- Support for state changes
         def _set_state(cls):
-            nonlocal _ignored_tokens, _master_re, _strings_pattern_re, _ignore, _token_funcs, _literals, _remapping
+            nonlocal _ignored_tokens, _master_re, _strings_pattern_re, _ignore, _token_funcs, _literals, _remapping, _token_ids
+            nonlocal _identifier, _keywords, _upper, _string_starts, _quotes
             _ignored_tokens = cls._ignored_tokens
             _master_re = cls._master_re
             _strings_pattern_re = cls._strings_pattern_re
@@ -381,6 +678,12 @@ class Lexer(metaclass=LexerMeta):
             _token_funcs = cls._token_funcs
             _literals = cls.literals
             _remapping = cls._remapping
+            _token_ids = cls._token_ids
+            _identifier = cls.identifier if cls._keywords else None
+            _keywords = cls._keywords
+            _upper = bool(cls.reflags & re.IGNORECASE)
+            _string_starts = cls._string_starts
+            _quotes = cls._quotes
 
         self.__set_state = _set_state
         _set_state(type(self))
@@ -401,8 +704,7 @@ class Lexer(metaclass=LexerMeta):
             _set_state(cls)
         self.reject = _reject
 
-
-        # --- Main tokenization function
+        # --- Main scanning loop
         self.text = text
         try:
             while True:
@@ -413,57 +715,79 @@ class Lexer(metaclass=LexerMeta):
                 except IndexError:
                     return
 
-                tok = Token()
-                tok.lineno = lineno
-                tok.index = index
-
-                m = _strings_pattern_re.match(text, index)
-                if m is None:
+                start = index
+                m = None
+                end = -1
+                if _string_starts is None or text[index] in _string_starts:
+                    if text[index] in _quotes:
+                        end = _scan_quoted(text, index, text[index])
+                    if end < 0:
+                        m = _strings_pattern_re.match(text, index)
+                if end >= 0:
+                    toktype = _quotes[text[index]]
+                elif m is None:
                     m = _master_re.match(text, index)
 
                 if m:
-                    tok.end = index = m.end()
-                    tok.value = m.group()
-                    tok.type = m.lastgroup
-
-                    if tok.type in _remapping:
-                        tok.type = _remapping[tok.type].get(tok.value, tok.type)
-
-                    if tok.type in _token_funcs:
+                    end = m.end()
+                    toktype = m.lastgroup
+
+                if end >= 0:
+                    index = end
+
+                    if toktype == _identifier:
+                        keyword = _match_keyword(text, start, _keywords, _upper)
+                        if keyword is not None:
+                            toktype, index = keyword
+
+                    if toktype in _remapping:
+                        toktype = _remapping[toktype].get(text[start:index], toktype)
+
+                    if toktype in _token_funcs:
+                        tok = Token()
+                        tok.type = toktype
+                        tok.value = text[start:index]
+                        tok.lineno = lineno
+                        tok.index = start
+                        tok.end = index
                         self.index = index
                         self.lineno = lineno
-                        tok = _token_funcs[tok.type](self, tok)
+                        tok = _token_funcs[toktype](self, tok)
                         index = self.index
                         lineno = self.lineno
-                        if not tok:
+                        if not tok or tok.type in _ignored_tokens:
                             continue
+                        tok.type_id = _token_ids.get(tok.type)
+                        yield tok.type, tok.type_id, tok.index, tok.end, tok.lineno, tok
+                        continue
 
-                    if tok.type in _ignored_tokens:
+                    if toktype in _ignored_tokens:
                         continue
 
-                    yield tok
+                    yield toktype, _token_ids.get(toktype), start, index, lineno, None
 
-                else:
-                    # No match, see if the character is in literals
-                    if text[index] in _literals:
-                        tok.value = text[index]
-                        tok.end = index + 1
-                        tok.type = tok.value
-                        index += 1
-                        yield tok
-                    else:
-                        # A lexing error
-                        self.index = index
-                        self.lineno = lineno
-                        tok.type = 'ERROR'
-                        tok.value = text[index:]
-                        tok = self.error(tok)
-                        if tok is not None:
-                            tok.end = self.index
-                            yield tok
+                elif text[index] in _literals:
+                    # No match, the character is in literals
+                    index += 1
+                    yield text[start], _token_ids.get(text[start]), start, index, lineno, None
 
-                        index = self.index
-                        lineno = self.lineno
+                else:
+                    # A lexing error
+                    tok = Token()
+                    tok.lineno = lineno
+                    tok.index = index
+                    tok.type = 'ERROR'
+                    tok.value = text[index:]
+                    self.index = index
+                    self.lineno = lineno
+                    tok = self.error(tok)
+                    if tok is not None:
+                        tok.end = self.index
+                        tok.type_id = _token_ids.get(tok.type)
+                        yield tok.type, tok.type_id, tok.index, tok.end, tok.lineno, tok
+
+                    index = self.index
+                    lineno = self.lineno
 
         # Set the final state of the lexer before exiting (even if exception)
         finally:
@@ -471,6 +795,32 @@ class Lexer(metaclass=LexerMeta):
             self.index = index
             self.lineno = lineno
 
+    def tokenize(self, text, lineno=1, index=0):
+        for toktype, type_id, start, end, tok_lineno, tok in self._scan(text, lineno, index):
+            if tok is None:
+                tok = Token()
+                tok.type = toktype
+                tok.type_id = type_id
+                tok.value = text[start:end]
+                tok.lineno = tok_lineno
+                tok.index = start
+                tok.end = end
+            yield tok
+
+    def tokenize_compact(self, text, lineno=1, index=0):
+        '''
+        Tokenize the text into TokenStream. Token objects are created only for
+        the tokens which are processed by token functions
+        '''
+        stream = TokenStream(text, type(self)._token_ids)
+        append = stream.append
+        for toktype, _, start, end, tok_lineno, tok in self._scan(text, lineno, index):
+            if tok is not None and tok.value != text[start:end]:
+                append(toktype, start, end, tok_lineno, tok.value)
+            else:
+                append(toktype, start, end, tok_lineno)
+        return stream
+
     # Default implementations of the error handler. May be changed in subclasses
     def error(self, t):
         raise LexError(f'Illegal character {t.value[0]!r} at index {self.index}', t.value, self.index)
@@ -33,10 +33,20 @@
 
 import sys
 import os
+import re
 import inspect
-import json
+import base64
+import hashlib
+import importlib
+import marshal
+import struct
+import tempfile
+import zlib
+from array import array
 from collections import OrderedDict, defaultdict, Counter
 
+from .lex import TokenStream
+
 __all__        = [ 'Parser' ]
 
 class YaccError(Exception):
@@ -55,6 +65,9 @@ class YaccError(Exception):
 ERROR_COUNT = 3                # Number of symbols that must be shifted to leave recovery mode
 MAXINT = sys.maxsize
 
+LRTAB_MAGIC = b'SLYLRT'        # Header of the binary file with LR tables
+LRTAB_VERSION = 2              # Version of the binary format. Increment it on any format change
+
 # This object is a stand-in for a logging object created by the
 # logging module.   SLY will use this by default to create things
 # such as the parser.out file.  If a user wants more detailed
@@ -842,6 +855,27 @@ class Grammar(object):
                 i += 1
             p.lr_items = lr_items
 
+    # -----------------------------------------------------------------------------
+    # fingerprint()
+    #
+    # Computes a digest of everything the LR tables depend on: the terminals, the
+    # precedence rules and the productions (in order). Relative order of the rule
+    # definitions is also included because reduce/reduce conflicts are resolved
+    # by it. The digest is used to validate previously built tables.
+    # -----------------------------------------------------------------------------
+
+    def fingerprint(self):
+        h = hashlib.sha256()
+        h.update(f'lrtab:{LRTAB_VERSION}\n'.encode())
+        h.update(' '.join(sorted(self.Terminals)).encode() + b'\n')
+        for term, (assoc, level) in sorted(self.Precedence.items()):
+            h.update(f'{term} {assoc} {level}\n'.encode())
+        for p in self.Productions:
+            h.update(f'{p} [{p.prec[0]} {p.prec[1]}]\n'.encode())
+        lines_order = sorted(range(len(self.Productions)), key=lambda n: self.Productions[n].line)
+        h.update(' '.join(map(str, lines_order)).encode())
+        return h.hexdigest()
+
 
     # ----------------------------------------------------------------------
     # Debugging output.  Printing the grammar will produce a detailed
@@ -929,6 +963,265 @@ def traverse(x, N, stack, F, X, R, FP):
 class LALRError(YaccError):
     pass
 
+ERROR_ACTION = 0x7fffffff      # Stored value of explicit error actions (nonassoc operators)
+
+# -----------------------------------------------------------------------------
+# pack_rows()
+#
+# Row displacement compression of a sparse table. rows is a list of dicts
+# {column: value}. Every row gets an offset (base) in the shared arrays check
+# and value, so that the entry of the row n for column c is value[base[n] + c]
+# if check[base[n] + c] == c. Rows are placed with first fit, starting from the
+# longest one. Identical rows share the same base, other rows never get the
+# same base: that makes the column check sufficient. The arrays are padded so
+# that the column ncols (unknown symbol) can be looked up for any row.
+# -----------------------------------------------------------------------------
+
+def pack_rows(rows, ncols):
+    base = array('i', [0]) * len(rows)
+    occupied = bytearray()          # occupied slots, the same as the bits of mask
+    mask = 0
+    entries = {}                    # slot -> (column, value)
+    bases = {}                      # row contents -> base
+    taken = set()                   # used bases
+
+    for n in sorted(range(len(rows)), key=lambda n: -len(rows[n])):
+        key = tuple(sorted(rows[n].items()))
+        if key in bases:
+            base[n] = bases[key]
+            continue
+
+        cols = [c for c, _ in key]
+        row_mask = sum(1 << c for c in cols)
+        first = cols[0] if cols else 0
+        probe = cols[1::max(len(cols) // 4, 1)]
+        b = 0
+        while True:
+            # the first column has to get a free slot
+            slot = occupied.find(0, b + first)
+            if slot < 0:
+                b = max(len(occupied) - first, 0)
+                while b in taken:
+                    b += 1
+                break
+            b = slot - first
+            # cheap check of a few columns before the check of the whole row
+            end = len(occupied) - b
+            for c in probe:
+                if c < end and occupied[b + c]:
+                    break
+            else:
+                if b not in taken and not (mask >> b) & row_mask:
+                    break
+            b += 1
+
+        mask |= row_mask << b
+        if cols and b + cols[-1] >= len(occupied):
+            occupied.extend(bytes(b + cols[-1] + 1 - len(occupied)))
+        for c, value in key:
+            occupied[b + c] = 1
+            entries[b + c] = (c, value)
+
+        base[n] = bases[key] = b
+        taken.add(b)
+
+    size = max(base, default=0) + ncols + 1
+    check = array('i', [-1]) * size
+    value = array('i', [0]) * size
+    for slot, (c, v) in entries.items():
+        check[slot] = c
+        value[slot] = v
+    return base, check, value
+
+def unpack_rows(base, check, value, ncols):
+    rows = []
+    for b in base:
+        rows.append({c: value[b + c] for c in range(ncols) if check[b + c] == c})
+    return rows
+
+# -----------------------------------------------------------------------------
+# write_lrtable()
+# read_lrtable()
+#
+# Binary file with LR tables. The header contains the format version, the byte
+# order of the integer arrays and the grammar fingerprint, the rest of the file
+# is the marshalled dump of LRTable. The file is written atomically: the tables
+# are saved to a temporary file which replaces the target.
+# read_lrtable() returns None if the file is missing, damaged or was built for
+# another grammar.
+# -----------------------------------------------------------------------------
+
+_lrtab_header = struct.Struct('<6sHc32s')
+
+def _swap_tables(tables):
+    swapped = []
+    for data in tables:
+        table = array('i')
+        table.frombytes(data)
+        table.byteswap()
+        swapped.append(table.tobytes())
+    return tuple(swapped)
+
+def _write_atomic(path, data):
+    dirname = os.path.dirname(os.path.abspath(path))
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix='.lrtab-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def write_lrtable(path, lrtable, fingerprint):
+    header = _lrtab_header.pack(LRTAB_MAGIC, LRTAB_VERSION, sys.byteorder[0].encode(), bytes.fromhex(fingerprint))
+    _write_atomic(path, header + marshal.dumps(lrtable.dump()))
+
+def read_lrtable(path, fingerprint):
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, byteorder, digest = _lrtab_header.unpack_from(data)
+        if magic != LRTAB_MAGIC or version != LRTAB_VERSION or digest.hex() != fingerprint:
+            return None
+        symbols, nterminals, productions, tables = marshal.loads(data[_lrtab_header.size:])
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return None
+
+    if byteorder.decode() != sys.byteorder[0]:
+        tables = _swap_tables(tables)
+
+    return symbols, nterminals, productions, tables
+
+# -----------------------------------------------------------------------------
+# write_module()
+# read_module()
+#
+# Python module generated for a parser. It contains the packed LR tables (the
+# same dump as in the binary file, compressed) and a factory of reduce functions,
+# one function per production. A reduce function calls the rule function
+# directly, passes it an instance of a production class with an attribute for
+# every symbol of the production (instead of lookups in the namemap), removes
+# the symbols from the stacks and returns the goto state. The goto column of
+# the production is a constant.
+# read_module() returns the dump of the tables or None if the module was built
+# for another grammar.
+# -----------------------------------------------------------------------------
+
+_reduce_template = """
+    production_{n} = productions[{n}]
+    func_{n} = production_{n}.func
+    cls_{n} = production_class(production_{n}.namemap)
+    def reduce_{n}(parser, symstack, statestack):
+        parser.production = production_{n}
+        s = {slice}
+        p = new(cls_{n})
+        p._slice = s
+        p._stack = symstack
+        value = func_{n}(parser, p)
+        if value is p:
+            value = ({name!r}, *(sym.value for sym in s))
+        sym = YaccSymbol()
+        sym.type = {name!r}
+        sym.value = value
+        if parser.track_positions:
+{positions}
+            parser._line_positions[id(value)] = sym.lineno
+            parser._index_positions[id(value)] = (sym.index, sym.end)
+{pop}        symstack.append(sym)
+        state = goto_value[goto_base[statestack[-1]] + {goto}]
+        statestack.append(state)
+        return state
+"""
+
+def write_module(path, lrtable, fingerprint, source=''):
+    dump = base64.b64encode(zlib.compress(marshal.dumps(lrtable.dump()), 9)).decode()
+    lines = [
+        f'# Generated by sly from {source}. Do not edit',
+        '',
+        f'LRTAB_VERSION = {LRTAB_VERSION}',
+        f'FINGERPRINT = {fingerprint!r}',
+        f'BYTEORDER = {sys.byteorder!r}',
+        '',
+        '# Packed LR tables, see LRTable.dump()',
+        'DUMP = (',
+    ]
+    lines.extend(f'    {dump[i:i + 100]!r}' for i in range(0, len(dump), 100))
+    lines.extend([
+        ')',
+        '',
+        '',
+        'def reducers(productions, goto_base, goto_value, YaccSymbol, production_class):',
+        '    new = object.__new__',
+    ])
+
+    names = ['None']
+    for p in lrtable.lr_productions[1:]:
+        if p.len:
+            slice_ = f'symstack[-{p.len}:]'
+            positions = '\n'.join([
+                '            sym.lineno = s[0].lineno',
+                '            sym.index = s[0].index',
+                '            sym.end = s[-1].end',
+            ])
+            pop = f'        del symstack[-{p.len}:]\n        del statestack[-{p.len}:]\n'
+        else:
+            slice_ = '[]'
+            positions = '            sym.lineno = sym.index = sym.end = None'
+            pop = ''
+        lines.append(_reduce_template.format(
+            n=p.number, name=p.name, slice=slice_, positions=positions, pop=pop,
+            goto=lrtable.nonterminal_ids[p.name],
+        ).rstrip('\n'))
+        names.append(f'reduce_{p.number}')
+
+    lines.append('')
+    lines.append('    return (')
+    lines.extend(f'        {name},' for name in names)
+    lines.append('    )')
+    lines.append('')
+    _write_atomic(path, '\n'.join(lines).encode())
+
+def read_module(module, fingerprint):
+    if getattr(module, 'LRTAB_VERSION', None) != LRTAB_VERSION or getattr(module, 'FINGERPRINT', None) != fingerprint:
+        return None
+    try:
+        symbols, nterminals, productions, tables = marshal.loads(zlib.decompress(base64.b64decode(''.join(module.DUMP))))
+    except (ValueError, EOFError, TypeError, zlib.error):
+        return None
+
+    if module.BYTEORDER != sys.byteorder:
+        tables = _swap_tables(tables)
+
+    return symbols, nterminals, productions, tables
+
+# -----------------------------------------------------------------------------
+# production_class()
+#
+# Subclass of YaccProduction with properties for the symbols of a production.
+# Names which are attributes of YaccProduction (lineno, index, ...) are left
+# as they are to keep the same behavior as YaccProduction.__getattr__
+# -----------------------------------------------------------------------------
+
+_production_classes = {}
+
+def production_class(namemap):
+    key = tuple(namemap.items())
+    if key not in _production_classes:
+        attrs = {
+            '__slots__': (),
+            '__setattr__': object.__setattr__,
+            '_namemap': namemap,
+        }
+        for name, index in namemap.items():
+            if name.isidentifier() and not hasattr(YaccProduction, name):
+                attrs[name] = property(lambda p, index=index: p._slice[index].value)
+        _production_classes[key] = type('Production', (YaccProduction,), attrs)
+    return _production_classes[key]
+
+
 # -----------------------------------------------------------------------------
 #                             == LRGeneratedTable ==
 #
@@ -957,47 +1250,194 @@ class LRTable(object):
 
         self.sr_conflicts  = []
         self.rr_conflicts  = []
-
-        # Build the tables
-        self.grammar.build_lritems()
-        self.grammar.compute_first()
-        self.grammar.compute_follow()
+        self.expected_cache = {}       # state: expected terminals
+        self.symbol_cache = {}         # state: accessing symbol
 
         if lr_dump is not None:
+            # Tables were built before: grammar analysis is not required
             self.load(lr_dump)
         else:
+            # Build the tables
+            self.grammar.build_lritems()
+            self.grammar.compute_first()
+            self.grammar.compute_follow()
+
             self.lr_action     = {}        # Action table
             self.lr_goto       = {}        # Goto table
             self.lr_parse_table()
 
-        # Build default states
-        # This identifies parser states where there is only one possible reduction action.
-        # For such states, the parser can make a choose to make a rule reduction without consuming
-        # the next look-ahead token.  This delayed invocation of the tokenizer can be useful in
-        # certain kinds of advanced parsing situations where the lexer and parser interact with
-        # each other or change states (i.e., manipulation of scope, lexer states, etc.).
-        #
-        # See:  http://www.gnu.org/software/bison/manual/html_node/Default-Reductions.html#Default-Reductions
-        self.defaulted_states = {}
-        for state, actions in self.lr_action.items():
-            rules = list(actions.values())
-            if len(rules) == 1 and rules[0] < 0:
-                self.defaulted_states[state] = rules[0]
+            # Build default states
+            # This identifies parser states where there is only one possible reduction action.
+            # For such states, the parser can make a choose to make a rule reduction without consuming
+            # the next look-ahead token.  This delayed invocation of the tokenizer can be useful in
+            # certain kinds of advanced parsing situations where the lexer and parser interact with
+            # each other or change states (i.e., manipulation of scope, lexer states, etc.).
+            #
+            # See:  http://www.gnu.org/software/bison/manual/html_node/Default-Reductions.html#Default-Reductions
+            self.defaulted_states = {}
+            for state, actions in self.lr_action.items():
+                rules = list(actions.values())
+                if len(rules) == 1 and rules[0] < 0:
+                    self.defaulted_states[state] = rules[0]
+
+            self.pack()
+
         # clear cache
         self.lr_goto_cache = None
         self.lr_goto_cache2 = None
         self.lr0_cidhash = None
 
+    # ----------------------------------------------------------------------
+    # pack()
+    #
+    # Integer-coded tables used by the parser. Symbols are numbered: terminals
+    # first (in the order of token names, the same as in the lexer, then '$end'
+    # and 'error'), nonterminals after them. The action table is indexed by the
+    # terminal number, the goto table by the number of nonterminal minus the
+    # number of terminals. Both are compressed with pack_rows().
+    #   lr_defaults[state] - default reduction of the state or 0
+    #   lr_prod_lhs[prodnum] - goto column of the left side of the production
+    # ----------------------------------------------------------------------
+    def pack(self):
+        terminals = sorted(name for name in self.grammar.Terminals if name != 'error')
+        symbols = terminals + ['$end', 'error'] + sorted(self.grammar.Nonterminals)
+        self.set_symbols(tuple(symbols), len(terminals) + 2)
+
+        nstates = len(self.lr_action)
+        actions = [{} for _ in range(nstates)]
+        for state, row in self.lr_action.items():
+            for name, value in row.items():
+                actions[state][self.terminal_ids[name]] = ERROR_ACTION if value is None else value
+        gotos = [{} for _ in range(nstates)]
+        for state, row in self.lr_goto.items():
+            for name, value in row.items():
+                gotos[state][self.nonterminal_ids[name]] = value
+
+        self.lr_action_base, self.lr_action_check, self.lr_action_value = pack_rows(actions, self.nterminals)
+        self.lr_goto_base, self.lr_goto_check, self.lr_goto_value = pack_rows(gotos, len(self.nonterminal_ids))
+        self.lr_defaults = array('i', [0]) * nstates
+        for state, rule in self.defaulted_states.items():
+            self.lr_defaults[state] = rule
+
+    def set_symbols(self, symbols, nterminals):
+        self.lr_symbols = symbols
+        self.nterminals = nterminals
+        self.terminal_ids = {name: i for i, name in enumerate(symbols[:nterminals])}
+        self.nonterminal_ids = {name: i for i, name in enumerate(symbols[nterminals:])}
+        self.lr_prod_lhs = array('i', [self.nonterminal_ids.get(p.name, -1) for p in self.lr_productions])
+
+    # ----------------------------------------------------------------------
+    # lr_action / lr_goto
+    #
+    # Tables in the form of {state: {symbol name: value}}. They are created by
+    # the table generator, for the tables loaded from a file they are decoded
+    # from the packed arrays on the first access.
+    # ----------------------------------------------------------------------
+    @property
+    def lr_action(self):
+        if self._lr_action is None:
+            rows = unpack_rows(self.lr_action_base, self.lr_action_check, self.lr_action_value, self.nterminals)
+            self._lr_action = {
+                state: {self.lr_symbols[c]: (None if v == ERROR_ACTION else v) for c, v in row.items()}
+                for state, row in enumerate(rows)
+            }
+        return self._lr_action
+
+    @lr_action.setter
+    def lr_action(self, value):
+        self._lr_action = value
+
+    @property
+    def lr_goto(self):
+        if self._lr_goto is None:
+            rows = unpack_rows(self.lr_goto_base, self.lr_goto_check, self.lr_goto_value, len(self.nonterminal_ids))
+            self._lr_goto = {
+                state: {self.lr_symbols[self.nterminals + c]: v for c, v in row.items()}
+                for state, row in enumerate(rows)
+            }
+        return self._lr_goto
+
+    @lr_goto.setter
+    def lr_goto(self, value):
+        self._lr_goto = value
+
+    # ----------------------------------------------------------------------
+    # expected_terminals()
+    #
+    # Names of the terminals which have an action in the state
+    # ----------------------------------------------------------------------
+    def expected_terminals(self, state):
+        expected = self.expected_cache.get(state)
+        if expected is None:
+            b = self.lr_action_base[state]
+            check = self.lr_action_check
+            expected = [self.lr_symbols[c] for c in range(self.nterminals) if check[b + c] == c]
+            self.expected_cache[state] = expected
+        return list(expected)
+
+    # ----------------------------------------------------------------------
+    # accessing_symbol()
+    #
+    # Name of the symbol which is shifted (or reduced) to get into the state
+    # from the previous state in the stack. It is the same for every
+    # transition into the state.
+    # ----------------------------------------------------------------------
+    def accessing_symbol(self, prev_state, state):
+        symbol = self.symbol_cache.get(state)
+        if symbol is None:
+            b = self.lr_action_base[prev_state]
+            check, value = self.lr_action_check, self.lr_action_value
+            for c in range(self.nterminals):
+                if check[b + c] == c and value[b + c] == state:
+                    symbol = self.lr_symbols[c]
+                    break
+            else:
+                b = self.lr_goto_base[prev_state]
+                check, value = self.lr_goto_check, self.lr_goto_value
+                for c in range(len(self.nonterminal_ids)):
+                    if check[b + c] == c and value[b + c] == state:
+                        symbol = self.lr_symbols[self.nterminals + c]
+                        break
+                else:
+                    raise LALRError(f'No transition from state {prev_state} to {state}')
+            self.symbol_cache[state] = symbol
+        return symbol
+
+    # ----------------------------------------------------------------------
+    # dump() / load()
+    #
+    # Packed tables are stored as bytes of the integer arrays together with
+    # the list of symbol names. Productions are stored as (name, len) to check
+    # them against the grammar.
+    # ----------------------------------------------------------------------
     def dump(self):
-        return [
-            list(self.lr_action.items()),
-            list(self.lr_goto.items()),
-        ]
+        productions = tuple((str(p.name), p.len) for p in self.lr_productions)
+        tables = tuple(table.tobytes() for table in (
+            self.lr_action_base, self.lr_action_check, self.lr_action_value,
+            self.lr_goto_base, self.lr_goto_check, self.lr_goto_value,
+            self.lr_defaults,
+        ))
+        return tuple(map(str, self.lr_symbols)), self.nterminals, productions, tables
 
     def load(self, obj):
-        action, goto = obj
-        self.lr_action = dict(action)
-        self.lr_goto = dict(goto)
+        symbols, nterminals, productions, tables = obj
+
+        if list(productions) != [(p.name, p.len) for p in self.lr_productions]:
+            raise LALRError('LR tables do not match the grammar')
+        self.set_symbols(tuple(symbols), nterminals)
+
+        arrays = []
+        for data in tables:
+            table = array('i')
+            table.frombytes(data)
+            arrays.append(table)
+        (self.lr_action_base, self.lr_action_check, self.lr_action_value,
+         self.lr_goto_base, self.lr_goto_check, self.lr_goto_value,
+         self.lr_defaults) = arrays
+
+        self.lr_action = None
+        self.lr_goto = None
+        self.defaulted_states = {state: rule for state, rule in enumerate(self.lr_defaults) if rule}
 
     # Compute the LR(0) closure operation on I, where I is a set of LR(0) items.
     def lr0_closure(self, I):
@@ -1870,6 +2310,15 @@ class Parser(metaclass=ParserMeta):
     # Debugging filename where parsetab.out data can be written
     debugfile = None
 
+    # Directory for LR tables which were built at runtime. Default is $XDG_CACHE_HOME/sly
+    cache_dir = None
+
+    # Name of the module created by build_module(). Default is the module of the parser + '_tab'
+    generated_module = None
+
+    # Reduce functions of the generated module (None if it is not used)
+    _reducers = None
+
     @classmethod
     def __validate_tokens(cls):
         if not hasattr(cls, 'tokens'):
@@ -2004,34 +2453,122 @@ class Parser(metaclass=ParserMeta):
 
     @classmethod
     def _get_build_file(cls):
-        path = inspect.getfile(cls)
-        return path[: path.rfind('.')] + '.json'
+        try:
+            path = inspect.getfile(cls)
+        except (TypeError, OSError):
+            # parser is not defined in a module file
+            return None
+        return path[: path.rfind('.')] + '.lrtab'
+
+    @classmethod
+    def _get_cache_file(cls):
+        cache_dir = cls.cache_dir
+        if cache_dir is None:
+            cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+            cache_dir = os.path.join(cache_home, 'sly')
+        return os.path.join(cache_dir, f'{cls.__module__}.{cls.__qualname__}.{cls._fingerprint[:16]}.lrtab')
+
+    @classmethod
+    def _prune_cache_files(cls, path):
+        '''
+        Remove the tables of the parser built for other versions of the grammar
+        from the cache directory, path is the file of the current grammar
+        '''
+        dirname, filename = os.path.split(path)
+        pattern = re.compile(re.escape(f'{cls.__module__}.{cls.__qualname__}.') + r'[0-9a-f]{16}\.lrtab')
+        for name in os.listdir(dirname):
+            if name != filename and pattern.fullmatch(name):
+                try:
+                    os.unlink(os.path.join(dirname, name))
+                except OSError:
+                    pass
+
+    @classmethod
+    def _get_module_name(cls):
+        return cls.generated_module or f'{cls.__module__}_tab'
 
     @classmethod
-    def build_to_file(self):
-        path = self._get_build_file()
+    def build_to_file(cls):
+        path = cls._get_build_file()
+        write_lrtable(path, cls._lrtable, cls._fingerprint)
+        print('Built to', path)
 
-        lr_dump = self._lrtable.dump()
-        json.dump(lr_dump, open(path, 'w'))
+    @classmethod
+    def build_module(cls, path=None):
+        '''
+        Generate python module with LR tables and reduce functions of the parser.
+        It is used instead of the generic engine if it is importable by the name
+        cls.generated_module and matches the grammar
+        '''
+        if path is None:
+            path = inspect.getfile(cls)
+            path = os.path.join(os.path.dirname(path), cls._get_module_name().rsplit('.', 1)[-1] + '.py')
+        write_module(path, cls._lrtable, cls._fingerprint, source=f'{cls.__module__}.{cls.__qualname__}')
         print('Built to', path)
 
+    @classmethod
+    def __load_module(cls):
+        '''
+        Load LR tables and reduce functions from the generated module
+        '''
+        try:
+            module = importlib.import_module(cls._get_module_name())
+        except (ImportError, SyntaxError):
+            return None
+        lr_dump = read_module(module, cls._fingerprint)
+        if lr_dump is None:
+            cls.log.warning('Module %s is built for another grammar, it is not used', module.__name__)
+            return None
+        try:
+            lrtable = LRTable(cls._grammar, lr_dump=lr_dump)
+        except LALRError:
+            return None
+        cls._reducers = module.reducers(
+            cls._grammar.Productions, lrtable.lr_goto_base, lrtable.lr_goto_value, YaccSymbol, production_class
+        )
+        return lrtable
+
+    @classmethod
+    def __load_lrtables(cls):
+        '''
+        Load LR tables built for the same grammar: from the file next to the parser module
+        (created by build_to_file) or from the user cache directory
+        '''
+        for path in (cls._get_build_file(), cls._get_cache_file()):
+            if path is None:
+                continue
+            lr_dump = read_lrtable(path, cls._fingerprint)
+            if lr_dump is None:
+                continue
+            try:
+                return LRTable(cls._grammar, lr_dump=lr_dump)
+            except LALRError:
+                continue
+        return None
+
     @classmethod
     def __build_lrtables(cls):
         '''
         Build the LR Parsing tables from the grammar
         '''
-        # use cache
-        build_file = cls._get_build_file()
-        lr_dump = None
-        if os.path.exists(build_file):
+        cls._fingerprint = cls._grammar.fingerprint()
+
+        cls._reducers = None
+        lrtable = cls.__load_module()
+        if lrtable is None:
+            lrtable = cls.__load_lrtables()
+        if lrtable is None:
+            cls.log.warning('Prebuilt LR tables are not found for %s, building them', cls.__qualname__)
+            lrtable = LRTable(cls._grammar)
+
+            # save to cache
             try:
-                lr_dump = json.load(open(build_file, 'r'))
-            except Exception:
-                pass
-        if lr_dump is None:
-            print('Unable to load lr_table dump, parsing initialization might be slower')
+                path = cls._get_cache_file()
+                write_lrtable(path, lrtable, cls._fingerprint)
+                cls._prune_cache_files(path)
+            except OSError as e:
+                cls.log.warning('Unable to cache LR tables: %s', e)
 
-        lrtable = LRTable(cls._grammar, lr_dump=lr_dump)
         num_sr = len(lrtable.sr_conflicts)
 
         # Report shift/reduce and reduce/reduce conflicts
@@ -2125,26 +2662,139 @@ class Parser(metaclass=ParserMeta):
         self.statestack.append(0)
         self.state = 0
 
-    def parse(self, tokens):
+    def recognize(self, tokens, statestack=None):
+        '''
+        Run the LR automaton over the tokens without calling the grammar rules.
+        Parsing starts from a copy of statestack (the initial state by default).
+        None in tokens is the end of the input. Tokens can be a TokenStream:
+        only the arrays of types are read.
+
+        Returns the stack of states after the last token, True if the input is
+        accepted or None on a syntax error.
+        '''
+        lrtable = self._lrtable
+        action_base  = lrtable.lr_action_base
+        action_check = lrtable.lr_action_check
+        action_value = lrtable.lr_action_value
+        goto_base    = lrtable.lr_goto_base
+        goto_value   = lrtable.lr_goto_value
+        defaults     = lrtable.lr_defaults
+        prod_lhs     = lrtable.lr_prod_lhs
+        terminals    = lrtable.lr_symbols
+        nterminals   = lrtable.nterminals
+        terminal_ids = lrtable.terminal_ids
+        prod = self._grammar.Productions
+
+        if isinstance(tokens, TokenStream):
+            ids = [terminal_ids.get(name, nterminals) for name in tokens.type_names]
+            ltids = map(ids.__getitem__, tokens.types)
+        else:
+            def terminal_id(tok):
+                if tok is None:
+                    return terminal_ids['$end']
+                ltid = getattr(tok, 'type_id', None)
+                if ltid is None or ltid >= nterminals or terminals[ltid] != tok.type:
+                    ltid = terminal_ids.get(tok.type, nterminals)
+                return ltid
+            ltids = map(terminal_id, tokens)
+
+        statestack = [0] if statestack is None else list(statestack)
+        for ltid in ltids:
+            while True:
+                state = statestack[-1]
+                t = defaults[state]
+                if not t:
+                    i = action_base[state] + ltid
+                    if action_check[i] != ltid:
+                        return None
+                    t = action_value[i]
+                    if t == ERROR_ACTION:
+                        return None
+                if t > 0:
+                    statestack.append(t)
+                    break
+                if t == 0:
+                    return True
+                plen = prod[-t].len
+                if plen:
+                    del statestack[-plen:]
+                statestack.append(goto_value[goto_base[statestack[-1]] + prod_lhs[-t]])
+        return statestack
+
+    def next_terminals(self, statestack):
+        '''
+        Names of the terminals which can be shifted after the states of
+        statestack ('$end' if the input can be finished there).
+        '''
+        lrtable = self._lrtable
+        defaults = lrtable.lr_defaults
+        statestack = list(statestack)
+
+        # default reductions don't depend on the next token
+        while defaults[statestack[-1]] < 0:
+            t = defaults[statestack[-1]]
+            plen = self._grammar.Productions[-t].len
+            if plen:
+                del statestack[-plen:]
+            statestack.append(lrtable.lr_goto_value[lrtable.lr_goto_base[statestack[-1]] + lrtable.lr_prod_lhs[-t]])
+
+        # a reduction by the lookahead can be followed by the error: candidates are checked
+        result = []
+        for name in lrtable.expected_terminals(statestack[-1]):
+            sym = YaccSymbol()
+            sym.type = name
+            if self.recognize([None if name == '$end' else sym], statestack) is not None:
+                result.append(name)
+        return result
+
+    def stack_symbols(self, statestack):
         '''
-        Parse the given input tokens.
+        Names of the grammar symbols recognized in the states of statestack
+        '''
+        lrtable = self._lrtable
+        return [lrtable.accessing_symbol(prev, state) for prev, state in zip(statestack, statestack[1:])]
+
+    def parse(self, tokens, stacks=None):
+        '''
+        Parse the given input tokens. If stacks is set (copies of statestack and
+        symstack saved during other parsing) the parsing is continued from them.
         '''
         lookahead = None                                  # Current lookahead symbol
+        ltid = None                                       # Terminal number of the lookahead symbol
         lookaheadstack = []                               # Stack of lookahead symbols
-        actions = self._lrtable.lr_action                 # Local reference to action table (to avoid lookup on self.)
-        goto    = self._lrtable.lr_goto                   # Local reference to goto table (to avoid lookup on self.)
+        lrtable = self._lrtable
+        action_base  = lrtable.lr_action_base             # Local references to the packed tables (to avoid lookup on self.)
+        action_check = lrtable.lr_action_check
+        action_value = lrtable.lr_action_value
+        goto_base    = lrtable.lr_goto_base
+        goto_value   = lrtable.lr_goto_value
+        defaults     = lrtable.lr_defaults                # Default reductions of the states
+        prod_lhs     = lrtable.lr_prod_lhs                # Goto columns of the productions
+        terminals    = lrtable.lr_symbols                 # Symbol names, terminals go first
+        nterminals   = lrtable.nterminals
+        terminal_ids = lrtable.terminal_ids
+        reducers     = self._reducers                     # Reduce functions of the generated module
         prod    = self._grammar.Productions               # Local reference to production list (to avoid lookup on self.)
-        defaulted_states = self._lrtable.defaulted_states # Local reference to defaulted states
         pslice  = YaccProduction(None)                    # Production object passed to grammar rules
         errorcount = 0                                    # Used during error recovery
 
         # Set up the state and symbol stacks
+        if isinstance(tokens, TokenStream):
+            # Tokens are kept in the stream, they are not collected in used_tokens
+            self.token_stream = tokens
+            self.used_tokens = used_tokens = None
+            tokens = iter(tokens)
+        else:
+            self.token_stream = None
+            self.used_tokens = used_tokens = []
         self.tokens = tokens
-        self.used_tokens = []
         self.statestack = statestack = []                 # Stack of parsing states
         self.symstack = symstack = []                     # Stack of grammar symbols
         pslice._stack = symstack                          # Associate the stack with the production
         self.restart()
+        if stacks is not None:
+            statestack[:], symstack[:] = stacks
+            self.state = statestack[-1]
 
         # Set up position tracking
         track_positions = self.track_positions
@@ -2157,22 +2807,36 @@ class Parser(metaclass=ParserMeta):
             # Get the next symbol on the input.  If a lookahead symbol
             # is already set, we just use that. Otherwise, we'll pull
             # the next token off of the lookaheadstack or from the lexer
-            if self.state not in defaulted_states:
+            t = defaults[self.state]
+            if not t:
                 if not lookahead:
                     if not lookaheadstack:
                         lookahead = next(tokens, None)  # Get the next token
-                        self.used_tokens.append(lookahead)
+                        if used_tokens is not None:
+                            used_tokens.append(lookahead)
                     else:
                         lookahead = lookaheadstack.pop()
                     if not lookahead:
                         lookahead = YaccSymbol()
                         lookahead.type = '$end'
-                    
+                    ltid = None
+
+                if ltid is None:
+                    # Tokens from the lexer carry the number of their type. It is used
+                    # if the lexer numbers the tokens the same way as the parser
+                    ltype = lookahead.type
+                    ltid = getattr(lookahead, 'type_id', None)
+                    if ltid is None or ltid >= nterminals or terminals[ltid] != ltype:
+                        ltid = terminal_ids.get(ltype, nterminals)
+
                 # Check the action table
-                ltype = lookahead.type
-                t = actions[self.state].get(ltype)
-            else:
-                t = defaulted_states[self.state]
+                i = action_base[self.state] + ltid
+                if action_check[i] == ltid:
+                    t = action_value[i]
+                    if t == ERROR_ACTION:
+                        t = None
+                else:
+                    t = None
 
             if t is not None:
                 if t > 0:
@@ -2182,6 +2846,7 @@ class Parser(metaclass=ParserMeta):
 
                     symstack.append(lookahead)
                     lookahead = None
+                    ltid = None
 
                     # Decrease error count on successful shift
                     if errorcount:
@@ -2189,6 +2854,11 @@ class Parser(metaclass=ParserMeta):
                     continue
 
                 if t < 0:
+                    if reducers is not None:
+                        # specialized reduce function of the production
+                        self.state = reducers[-t](self, symstack, statestack)
+                        continue
+
                     # reduce a symbol on the stack, emit a production
                     self.production = p = prod[-t]
                     pname = p.name
@@ -2225,7 +2895,7 @@ class Parser(metaclass=ParserMeta):
                         del statestack[-plen:]
 
                     symstack.append(sym)
-                    self.state = goto[statestack[-1]][pname]
+                    self.state = goto_value[goto_base[statestack[-1]] + prod_lhs[-t]]
                     statestack.append(self.state)
                     continue
 
@@ -2253,12 +2923,13 @@ class Parser(metaclass=ParserMeta):
                     else:
                         errtoken = lookahead
 
-                    tok = self.error(errtoken, expected_tokens=list(actions[self.state].keys()))
+                    tok = self.error(errtoken, expected_tokens=lrtable.expected_terminals(self.state))
                     if tok:
                         # User must have done some kind of panic
                         # mode recovery on their own.  The
                         # returned token is the next lookahead
                         lookahead = tok
+                        ltid = None
                         self.errorok = True
                         continue
                     else:
@@ -2275,6 +2946,7 @@ class Parser(metaclass=ParserMeta):
 
                 if len(statestack) <= 1 and lookahead.type != '$end':
                     lookahead = None
+                    ltid = None
                     self.state = 0
                     # Nuke the lookahead stack
                     del lookaheadstack[:]
@@ -2294,6 +2966,7 @@ class Parser(metaclass=ParserMeta):
                         # Hmmm. Error is on top of stack, we'll just nuke input
                         # symbol and continue
                         lookahead = None
+                        ltid = None
                         continue
 
                     # Create the error symbol for the first time and make it the new lookahead symbol
@@ -2309,6 +2982,7 @@ class Parser(metaclass=ParserMeta):
                     t.value = lookahead
                     lookaheadstack.append(lookahead)
                     lookahead = t
+                    ltid = None
                 else:
                     sym = symstack.pop()
                     statestack.pop()
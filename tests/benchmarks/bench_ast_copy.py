@@ -0,0 +1,63 @@
+"""
+Copying of parsed AST.
+
+    env PYTHONPATH=./ python -m tests.benchmarks.bench_ast_copy
+
+ASTNode.copy() (copy.deepcopy uses it too) is compared with pickle round trip, it is used by ParseCache.
+Pickle fails with RecursionError on deep trees (long chains of OR and JOIN).
+copy(share_frozen=True) of the frozen tree shares all the subtrees, except the root node.
+"""
+import pickle
+import time
+
+from mindsdb_sql_parser import parse_sql
+
+
+def make_where(conditions):
+    where = ' or '.join(f"(t.col{i} = {i} and t.name{i} in ('a{i}', 'b{i}', {i}))" for i in range(conditions))
+    return f'select a, b from db.t where {where}'
+
+
+def make_select(columns):
+    targets = ', '.join(f'sum(t.col{i}) as s{i}' for i in range(columns))
+    return f'select {targets} from db.t as t join db.t2 as t2 on t.id = t2.id group by t.a'
+
+
+def make_join(tables):
+    joins = ' '.join(f'join db.t{i} as t{i} on t{i}.id = t.id and t{i}.x > {i}' for i in range(tables))
+    return f'select t.a, count(*) from db.t as t {joins} where t.b is not null group by 1 order by 2 desc limit 10'
+
+
+def measure(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def pickle_copy(ast):
+    return pickle.loads(pickle.dumps(ast, pickle.HIGHEST_PROTOCOL))
+
+
+def bench(sizes):
+    print(f'{"query":<10}{"size":>6}{"pickle":>10}{"copy":>10}{"frozen":>10}  (ms)')
+    for name, make in (('where', make_where), ('select', make_select), ('join', make_join)):
+        for size in sizes:
+            ast = parse_sql(make(size))
+            frozen = parse_sql(make(size)).freeze()
+
+            try:
+                t_pickle = f'{measure(lambda: pickle_copy(ast)) * 1e3:.2f}'
+            except RecursionError:
+                t_pickle = '-'
+            t_copy = measure(lambda: ast.copy())
+            t_frozen = measure(lambda: frozen.copy(share_frozen=True))
+            print(f'{name:<10}{size:>6}{t_pickle:>10}{t_copy * 1e3:>10.2f}{t_frozen * 1e3:>10.3f}')
+
+
+if __name__ == '__main__':
+    bench([10, 100, 1000])
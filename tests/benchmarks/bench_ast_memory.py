@@ -0,0 +1,76 @@
+"""
+Memory of parsed AST.
+
+    env PYTHONPATH=./ python -m tests.benchmarks.bench_ast_memory
+
+Queries with big WHERE and IN trees consist mostly of Identifier and Constant nodes.
+Bytes per node are the size of the instance and of its attribute dict (if the class has it),
+the size of AST is measured by tracemalloc and includes the values of attributes
+(lists of parts, strings, ...).
+"""
+import gc
+import sys
+import tracemalloc
+
+from mindsdb_sql_parser import parse_sql
+from mindsdb_sql_parser.ast import ASTNode, Identifier, Constant, BinaryOperation, Function, Select
+
+
+def make_where(conditions):
+    where = ' or '.join(f"(t.col{i} = {i} and t.name{i} in ('a{i}', 'b{i}', {i}))" for i in range(conditions))
+    return f'select a, b from db.t where {where}'
+
+
+def make_select(columns):
+    targets = ', '.join(f'sum(t.col{i}) as s{i}' for i in range(columns))
+    return f'select {targets} from db.t as t join db.t2 as t2 on t.id = t2.id group by t.a'
+
+
+def node_size(node):
+    size = sys.getsizeof(node)
+    if hasattr(node, '__dict__'):
+        size += sys.getsizeof(node.__dict__)
+    return size
+
+
+def count_nodes():
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, ASTNode))
+
+
+def bench_nodes():
+    print(f'{"node":<18}{"bytes":>8}')
+    nodes = [
+        Identifier(parts=['t', 'col']),
+        Constant(1),
+        BinaryOperation(op='=', args=[Constant(1), Constant(2)]),
+        Function(op='sum', args=[Constant(1)]),
+        Select(targets=[]),
+    ]
+    for node in nodes:
+        print(f'{type(node).__name__:<18}{node_size(node):>8}')
+
+
+def bench_queries(sizes):
+    print(f'{"query":<10}{"size":>8}{"nodes":>10}{"ast, MB":>10}{"bytes/node":>12}')
+    # tables of the parser are loaded by the first query
+    parse_sql(make_where(1))
+    for name, make in (('where', make_where), ('select', make_select)):
+        for size in sizes:
+            sql = make(size)
+            gc.collect()
+            before = count_nodes()
+
+            tracemalloc.start()
+            ast = parse_sql(sql)
+            memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            nodes = count_nodes() - before
+            print(f'{name:<10}{size:>8}{nodes:>10}{memory / 1e6:>10.2f}{memory / nodes:>12.0f}')
+            del ast
+
+
+if __name__ == '__main__':
+    bench_nodes()
+    print()
+    bench_queries([1000, 5000])
@@ -0,0 +1,50 @@
+"""
+Parsing of INSERT with many rows of literals.
+
+    env PYTHONPATH=./ python -m tests.benchmarks.bench_bulk_insert
+
+Rows of plain INSERT are scanned from the tokens without the parser, time has to grow
+linearly with the number of rows. With columnar=True the values are stored by columns
+and Constant nodes are not created.
+"""
+import time
+import tracemalloc
+
+from mindsdb_sql_parser import parse_sql
+
+
+def make_sql(rows):
+    values = ', '.join(f"({i}, {i}.5, 'name {i}', NULL)" for i in range(rows))
+    return f'INSERT INTO tbl (a, b, c, d) VALUES {values}'
+
+
+def measure(sql, **kwargs):
+    start = time.perf_counter()
+    ast = parse_sql(sql, **kwargs)
+    parse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ast.to_string()
+    render_time = time.perf_counter() - start
+    del ast
+
+    # memory is measured separately: tracing slows down the parsing
+    tracemalloc.start()
+    ast = parse_sql(sql, **kwargs)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return parse_time, render_time, size, peak
+
+
+def bench_insert(counts):
+    print(f'{"rows":<10}{"columnar":<10}{"parse, s":>10}{"render, s":>11}{"ast, MB":>10}{"peak, MB":>10}')
+    for rows in counts:
+        sql = make_sql(rows)
+        for columnar in (False, True):
+            parse_time, render_time, size, peak = measure(sql, columnar=columnar)
+            print(f'{rows:<10}{str(columnar):<10}{parse_time:>10.2f}{render_time:>11.2f}'
+                  f'{size / 1e6:>10.1f}{peak / 1e6:>10.1f}')
+
+
+if __name__ == '__main__':
+    bench_insert([10000, 50000, 100000])
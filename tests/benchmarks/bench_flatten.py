@@ -0,0 +1,58 @@
+"""
+Flattening of the chains of OR and UNION ALL to n-ary nodes.
+
+    env PYTHONPATH=./ python -m tests.benchmarks.bench_flatten
+
+The parser builds the chains as nested binary nodes: the depth of the tree is the number of terms.
+After flatten() (or parse_sql(sql, flatten=True)) they are one node with the list of arguments (queries),
+recursive to_tree works for any number of terms.
+"""
+import time
+
+from mindsdb_sql_parser.ast import flatten
+from tests.benchmarks.bench_render import make_where, make_union
+
+
+def measure(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def to_tree(ast):
+    try:
+        ast.to_tree()
+    except RecursionError:
+        return None
+    return measure(ast.to_tree)
+
+
+def bench(sizes):
+    print(f'{"query":<10}{"terms":>8}{"tree":>8}{"flatten, s":>12}{"to_string, s":>14}'
+          f'{"copy, s":>10}{"eq, s":>8}{"to_tree, s":>12}')
+    for name, make in (('where', make_where), ('union', make_union)):
+        for size in sizes:
+            for tree in ('nested', 'flat'):
+                ast = make(size)
+                t_flatten = '-'
+                if tree == 'flat':
+                    start = time.perf_counter()
+                    flatten(ast)
+                    t_flatten = f'{time.perf_counter() - start:.3f}'
+                other = ast.copy()
+                t_string = measure(ast.to_string)
+                t_copy = measure(ast.copy)
+                t_eq = measure(lambda: ast == other)
+                t_tree = to_tree(ast)
+                t_tree = 'error' if t_tree is None else f'{t_tree:.3f}'
+                print(f'{name:<10}{size:>8}{tree:>8}{t_flatten:>12}{t_string:>14.3f}'
+                      f'{t_copy:>10.3f}{t_eq:>8.3f}{t_tree:>12}')
+
+
+if __name__ == '__main__':
+    bench([1000, 10000])
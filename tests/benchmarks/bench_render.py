@@ -0,0 +1,58 @@
+"""
+Rendering of AST to sql.
+
+    env PYTHONPATH=./ python -m tests.benchmarks.bench_render
+
+Conditions of WHERE are the left-deep chain of BinaryOperation, UNION of many queries is the chain of Union nodes:
+the depth of the tree is the number of terms. The tree is rendered without recursion, fragments are
+written to the list (to_string) or to the stream (render).
+to_string of the frozen tree is rendered once: the next calls return the stored sql.
+"""
+import io
+import time
+
+from mindsdb_sql_parser.ast import Identifier, Constant, BinaryOperation, Select, Star, Union
+
+
+def make_where(terms):
+    where = Identifier('a')
+    for i in range(terms):
+        condition = BinaryOperation(op='=', args=[Identifier(f't.col{i}'), Constant(i)])
+        where = BinaryOperation(op='or', args=[where, condition])
+    return Select(targets=[Star()], from_table=Identifier('t'), where=where)
+
+
+def make_union(terms):
+    query = Select(targets=[Constant(0)], from_table=Identifier('t'))
+    for i in range(1, terms):
+        right = Select(targets=[Constant(i)], from_table=Identifier('t'))
+        query = Union(left=query, right=right, unique=False)
+    return query
+
+
+def measure(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def bench(sizes):
+    print(f'{"query":<10}{"terms":>8}{"sql, MB":>10}{"to_string, s":>14}{"render, s":>12}{"frozen, s":>12}')
+    for name, make in (('where', make_where), ('union', make_union)):
+        for size in sizes:
+            ast = make(size)
+            size_mb = len(ast.to_string()) / 1e6
+            t_string = measure(ast.to_string)
+            t_render = measure(lambda: ast.render(io.StringIO()))
+            ast.freeze().to_string()
+            t_frozen = measure(ast.to_string)
+            print(f'{name:<10}{size:>8}{size_mb:>10.2f}{t_string:>14.3f}{t_render:>12.3f}{t_frozen:>12.6f}')
+
+
+if __name__ == '__main__':
+    bench([1000, 10000, 50000])
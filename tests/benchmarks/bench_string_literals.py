@@ -0,0 +1,70 @@
+"""
+Lexing and parsing of big string literals.
+
+    env PYTHONPATH=./ python -m tests.benchmarks.bench_string_literals
+
+Time of the scanner of quoted strings has to grow linearly with the size of the literal,
+also for pathological inputs: many backslashes, doubled quotes, unterminated strings.
+For comparison, the regex of the QUOTE_STRING rule is matched on the small pathological inputs:
+it backtracks exponentially on an unterminated string of backslashes.
+"""
+import re
+import time
+
+from sly.lex import LexError
+
+from mindsdb_sql_parser import parse_sql
+from mindsdb_sql_parser.lexer import MindsDBLexer
+
+MB = 1024 * 1024
+
+CASES = {
+    'plain text': lambda size: 'lorem ipsum dolor sit amet, ' * (size // 28),
+    'escaped quotes': lambda size: "it\\'s \\\"ok\\\" " * (size // 14),
+    'doubled quotes': lambda size: "it''s ''ok'' " * (size // 13),
+    'backslashes': lambda size: '\\' * size,
+}
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def tokenize(sql):
+    try:
+        return list(MindsDBLexer().tokenize(sql))
+    except LexError:
+        # unterminated literal: the lexer fails on the rest of the text
+        return None
+
+
+def bench_literals(sizes):
+    print(f'{"case":<16}{"size":>8}{"lex, ms":>12}{"parse, ms":>12}{"unterminated, ms":>18}')
+    for name, make in CASES.items():
+        for size in sizes:
+            content = make(size)
+            sql = f"insert into kb (content) values ('{content}')"
+            unterminated = f"insert into kb (content) values ('{content}"
+
+            lex_time = measure(tokenize, sql)
+            parse_time = measure(parse_sql, sql)
+            unterminated_time = measure(tokenize, unterminated)
+            print(f'{name:<16}{size // MB:>6}MB{lex_time * 1000:>12.1f}{parse_time * 1000:>12.1f}'
+                  f'{unterminated_time * 1000:>18.1f}')
+
+
+def bench_regex(counts):
+    pattern = re.compile(MindsDBLexer.QUOTE_STRING)
+    print(f'\n{"backslashes":<16}{"regex, ms":>12}{"lexer, ms":>12}')
+    for count in counts:
+        text = "'" + '\\' * count + 'a'
+        regex_time = measure(pattern.match, text)
+        lexer_time = measure(tokenize, text)
+        print(f'{count:<16}{regex_time * 1000:>12.1f}{lexer_time * 1000:>12.3f}')
+
+
+if __name__ == '__main__':
+    bench_literals([MB, 4 * MB, 16 * MB])
+    bench_regex([16, 18, 20, 22, 24, 26])
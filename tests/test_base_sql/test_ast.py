@@ -1,5 +1,10 @@
+import io
+import pickle
 from copy import deepcopy
 
+import pytest
+
+from mindsdb_sql_parser import parse_sql
 from mindsdb_sql_parser.ast import *
 
 
@@ -27,6 +32,142 @@ class TestAST:
         ast.where.args[0] = Constant(1)
         assert ast.to_tree() != ast2.to_tree()
 
+    def test_copy_values(self):
+        ast = parse_sql("select a.b as c, f(x, 'y') from t1 where x in (1, 2.5) and d = '2020-01-01'")
+        ast.where.args[0].args = (*ast.where.args[0].args,)
+        ast.using = {'a': [Constant(1)], 'b': 'c'}
+        ast.targets[0].sub_select = Select(targets=[Constant(1)])
+
+        ast2 = ast.copy()
+        assert ast2 == ast
+        assert isinstance(ast2.where.args[0].args, type(()))
+        assert ast2.targets[0].sub_select == ast.targets[0].sub_select
+        assert not hasattr(ast2.targets[1], 'sub_select')
+
+        # lists, dicts and nodes are new, strings are shared
+        assert ast2.targets[0].parts is not ast.targets[0].parts
+        assert ast2.targets[0].parts[0] is ast.targets[0].parts[0]
+        assert ast2.using is not ast.using
+        assert ast2.using['a'][0] is not ast.using['a'][0]
+        assert ast2.targets[0].sub_select is not ast.targets[0].sub_select
+
+        insert = Insert(table=Identifier('t'), values=ColumnarValues([[1, 2], ['x', 'y']]), is_plain=True)
+        insert2 = insert.copy()
+        assert insert2 == insert
+        assert insert2.values.columns[0] is not insert.values.columns[0]
+
+    def test_copy_deep_tree(self):
+        where = Identifier('a')
+        for i in range(10000):
+            where = BinaryOperation(op='or', args=[where, Constant(i)])
+        ast = Select(targets=[Star()], where=where)
+
+        ast2 = ast.copy()
+        assert ast2.where is not where
+        assert ast2.where.args[1].value == 9999
+        assert ast2 == ast
+
+    def test_copy_frozen(self):
+        ast = parse_sql("select a from t1 where x in (1, 2) and y = 'z'")
+        ast.where.freeze()
+
+        # frozen constants are shared
+        ast2 = ast.copy()
+        assert ast2.where is not ast.where
+        assert ast2.where.args[1].args[1] is ast.where.args[1].args[1]
+        with pytest.raises(TypeError):
+            hash(ast2.where)
+
+        # frozen subtrees are shared
+        ast2 = ast.copy(share_frozen=True)
+        assert ast2.where is ast.where
+        assert ast2.targets[0] is not ast.targets[0]
+
+        ast.freeze()
+        ast2 = ast.copy(share_frozen=True)
+        assert ast2 is not ast and ast2 == ast
+        assert ast2.targets is not ast.targets
+
+    def test_render(self):
+        sql = "select a.b as c, sum(x) over (partition by y) from t1 join (select 1) as t2 on t1.id = t2.id " \
+              "where x in (1, 2) and not (y between 1 and 3) group by 1 order by 2 desc limit 10 " \
+              "union all select cast(a as int), case when b then 'x' else 'y' end, f(distinct c) from t3"
+        ast = parse_sql(sql)
+        assert ast.render() == ast.to_string()
+
+        stream = io.StringIO()
+        ast.render(stream)
+        assert stream.getvalue() == ast.to_string()
+
+        fragments = []
+
+        class Writer:
+            def write(self, fragment):
+                fragments.append(fragment)
+
+        ast.render(Writer())
+        assert len(fragments) > 10
+        assert ''.join(fragments) == ast.to_string()
+
+    def test_render_deep_tree(self):
+        where = Identifier('a')
+        for i in range(10000):
+            where = BinaryOperation(op='or', args=[where, Constant(i)])
+        ast = Select(targets=[Star()], where=where, parentheses=True, alias=Identifier('x'))
+        sql = ast.to_string()
+        assert sql.startswith('(SELECT * WHERE a OR 0 OR 1 OR ')
+        assert sql.endswith(' OR 9999) AS x')
+        assert ast.render() == sql
+
+        query = Select(targets=[Constant(0)])
+        for i in range(1, 3000):
+            query = Union(left=query, right=Select(targets=[Constant(i)]), unique=False)
+        assert query.to_string().count('UNION ALL') == 2999
+
+    def test_render_frozen(self):
+        ast = parse_sql('select a, (select b from t2 where c = 1) as x from t1 where a > 1 or b < 2')
+        sql = ast.to_string()
+        sub_select = ast.targets[1]
+        ast.freeze()
+
+        # sql of frozen node is rendered once, the cached sql of the child is used by the parent
+        assert str(ast.where) == 'a > 1 OR b < 2'
+        assert str(ast) == sql
+        assert ast._sql == sql and ast.where._sql == 'a > 1 OR b < 2'
+
+        # frozen nodes can't be changed
+        with pytest.raises(AttributeError):
+            ast.where.args = []
+        with pytest.raises(AttributeError):
+            del ast.where.op
+        with pytest.raises(AttributeError):
+            ast.limit = Constant(1)
+        # and their lists and dicts
+        with pytest.raises(TypeError):
+            ast.targets.append(Identifier('b'))
+        with pytest.raises(TypeError):
+            ast.where.args[0] = Identifier('c')
+        with pytest.raises(TypeError):
+            ast.from_table.parts += ['x']
+        assert isinstance(ast, Select) and type(ast).__name__ == 'Select' and type(ast) is not Select
+        assert ast == parse_sql(ast.to_string())
+        assert sub_select.to_string() == '(SELECT b FROM t2 WHERE c = 1) AS x'
+        assert sub_select.to_string(alias=False) == '(SELECT b FROM t2 WHERE c = 1)'
+        assert ast.render() == sql
+
+        # copies are not frozen: they are rendered again
+        ast = parse_sql('select a from t1 where a > 1 or b < 2').freeze()
+        str(ast)
+        for copied in (ast.copy(), deepcopy(ast), pickle.loads(pickle.dumps(ast, protocol=2))):
+            copied.where.args[0] = Identifier('c')
+            copied.targets.append(Identifier('b'))
+            assert str(copied) == 'SELECT a, b FROM t1 WHERE c OR b < 2'
+            assert type(copied.targets) is list and type(copied) is Select
+
+        copied = ast.copy(share_frozen=True)
+        copied.limit = Constant(1)
+        assert str(copied) == 'SELECT a FROM t1 WHERE a > 1 OR b < 2 LIMIT 1'
+
     def test_identifier_deepcopy_is_quoted(self):
         ident = Identifier('`a`')
         ident2 = deepcopy(ident)
@@ -49,3 +190,85 @@ class TestAST:
             for test_case in test_cases:
                 test_str = f'{test_case}.{test_cases[i]}'
                 assert Identifier(test_str).to_string() == test_str
+
+    def test_slots(self):
+        # attributes of nodes are declared in __slots__: instances don't have __dict__
+        def subclasses(cls):
+            for subclass in cls.__subclasses__():
+                yield subclass
+                yield from subclasses(subclass)
+
+        for cls in subclasses(ASTNode):
+            assert cls.__dictoffset__ == 0, cls.__name__
+
+        ast = parse_sql('select a.b as c, sum(x) from t1 join t2 on t1.id = t2.id where x in (1, 2) order by 1')
+        assert not hasattr(ast.targets[0], '__dict__')
+        assert pickle.loads(pickle.dumps(ast, pickle.HIGHEST_PROTOCOL)) == ast
+        assert deepcopy(ast) == ast
+
+    def test_identifier_sub_select(self):
+        ident = Identifier('a.b')
+        assert not hasattr(ident, 'sub_select')
+
+        ident.sub_select = Select(targets=[Constant(1)])
+        ident2 = deepcopy(ident)
+        assert ident2.sub_select == ident.sub_select
+        assert ident2.sub_select is not ident.sub_select
+
+    def test_equality(self):
+        sql = "select a.b as c, sum(x) from t1 join t2 on t1.id = t2.id where x in (1, 2) and y = 'z'"
+        assert parse_sql(sql) == parse_sql(sql)
+        assert parse_sql(sql) != parse_sql(sql.replace("'z'", "'w'"))
+
+        # lists and tuples are equal
+        assert BinaryOperation(op='=', args=[Identifier('a'), Constant(1)]) == \
+            BinaryOperation(op='=', args=(Identifier('a'), Constant(1)))
+
+        # values are compared with their types
+        assert Constant(1) != Constant(1.0)
+        assert Constant(1) != Constant(True)
+
+        assert Identifier('a') != Identifier('`a`')
+        assert Identifier('a') != Identifier('a', alias=Identifier('b'))
+        assert Constant(1) != Constant(1, parentheses=True)
+        assert Constant(1) != 1
+
+        # quotes and flags which are not rendered are compared by sql
+        assert Constant(1) == Constant(1, with_quotes=False)
+        assert hash(Constant(1).freeze()) == hash(Constant(1, with_quotes=False).freeze())
+        assert Constant('a') != Constant('a', with_quotes=False)
+        assert Identifier(parts=['t', '1']) == Identifier(parts=['t', '1'], is_quoted=[False, True])
+        assert Identifier('a', is_outer=True) == Identifier('a')
+
+        # the query is equal to the query parsed from its sql
+        for sql in (
+            'DESCRIBE MODEL pred.11',
+            'select t2."var (k)" from t2',
+            'SELECT * FROM customer, orders WHERE c_custkey = o_custkey(+)',
+            'CREATE TABLE t1 (a INT PRIMARY KEY, b varchar(10) DEFAULT x NOT NULL, c TEXT NULL)',
+            'CREATE TABLE t1 (a INT, b INT, PRIMARY KEY (a, b))',
+        ):
+            ast = parse_sql(sql)
+            assert parse_sql(ast.to_string()) == ast, sql
+
+    def test_freeze(self):
+        sql = "select a from t1 where x in (1, 2) and y = 'z'"
+        ast = parse_sql(sql)
+        with pytest.raises(TypeError):
+            hash(ast)
+
+        assert ast.freeze() is ast
+        assert hash(ast) == hash(parse_sql(sql).freeze())
+
+        # sub-expressions as keys
+        conditions = {}
+        for query in (sql, sql, sql.replace("'z'", "'w'")):
+            where = parse_sql(query).where.freeze()
+            conditions[where] = conditions.get(where, 0) + 1
+        assert sorted(conditions.values()) == [1, 2]
+
+        # copies are not frozen
+        for copy in (ast.copy(), deepcopy(ast), pickle.loads(pickle.dumps(ast, pickle.HIGHEST_PROTOCOL))):
+            assert copy == ast
+            with pytest.raises(TypeError):
+                hash(copy)
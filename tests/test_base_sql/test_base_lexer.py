@@ -1,3 +1,6 @@
+import pytest
+from sly.lex import LexError
+
 from mindsdb_sql_parser.lexer import MindsDBLexer
 
 lexer = MindsDBLexer()
@@ -337,3 +340,89 @@ class TestLexer:
         assert tokens[6].type == 'QUOTE_STRING'
         assert tokens[6].value == "'utf8mb4'"
 
+
+    def test_multiword_keywords(self):
+        sql = 'select * from knowledge base x group\n  by a Order By b nulls first fetch next 1 rows only'
+        tokens = list(lexer.tokenize(sql))
+        assert [t.type for t in tokens] == [
+            'SELECT', 'STAR', 'FROM', 'KNOWLEDGE_BASE', 'ID', 'GROUP_BY', 'ID', 'ORDER_BY', 'ID',
+            'NULLS_FIRST', 'FETCH_FIRST', 'INTEGER', 'ROWS_ONLY'
+        ]
+        assert tokens[3].value == 'knowledge base'
+        assert tokens[5].value == 'group\n  by'
+        assert tokens[9].value == 'nulls first'
+
+        tokens = list(lexer.tokenize('show knowledge_bases'))
+        assert tokens[1].type == 'KNOWLEDGE_BASES'
+
+        tokens = list(lexer.tokenize('a is not null and b not in (1) and not c is d'))
+        assert [t.type for t in tokens] == [
+            'ID', 'IS_NOT', 'NULL', 'AND', 'ID', 'NOT_IN', 'LPAREN', 'INTEGER', 'RPAREN',
+            'AND', 'NOT', 'ID', 'IS', 'ID'
+        ]
+
+    def test_keyword_boundaries(self):
+        # keywords are whole words
+        tokens = list(lexer.tokenize('select selected, from_x, group bys, order_by, fetch firsts'))
+        assert [t.type for t in tokens] == [
+            'SELECT', 'ID', 'COMMA', 'ID', 'COMMA', 'ID', 'ID', 'COMMA', 'ID', 'COMMA', 'ID', 'ID'
+        ]
+
+        # "$" is not a part of a word
+        tokens = list(lexer.tokenize('select$x'))
+        assert [(t.type, t.value) for t in tokens] == [('SELECT', 'select'), ('ID', '$x')]
+
+        tokens = list(lexer.tokenize('`select` primary_key'))
+        assert [(t.type, t.value) for t in tokens] == [('ID', '`select`'), ('ID', 'primary_key')]
+
+    def test_tokenize_compact(self):
+        sql = "select a, @var, @@sys_var, :param, 'str', \"dstr\" from t1\nwhere x = 1.5 -- comment\n group by 1"
+        stream = lexer.tokenize_compact(sql)
+
+        tokens = list(lexer.tokenize(sql))
+        assert len(stream) == len(tokens)
+        for i, token in enumerate(tokens):
+            assert stream.type(i) == token.type
+            assert stream.value(i) == token.value
+            assert repr(stream[i]) == repr(token)
+            assert stream[i].type_id == token.type_id
+
+        # changed values are stored, others are sliced from the text
+        assert stream.value(3) == 'var'
+        assert stream.value(7) == 'param'
+        assert set(stream.values) == {3, 5, 7}
+        assert stream[-1].value == '1'
+        assert [t.value for t in stream[-3:]] == ['1.5', 'group by', '1']
+
+    def test_quoted_strings(self):
+        # the same literals as matched by the regex of the rule
+        cases = [
+            ("'a\\'b' x", "'a\\'b'"),
+            ("'a''b' x", "'a''b'"),
+            ("'a\\\\' x'", "'a\\\\'"),
+            ("'a\\' b", "'a\\'"),
+            ("'a'' b", "'a'"),
+            ("'a\\'' b", "'a\\''"),
+            ("'\\\n' b", "'\\\n'"),
+        ]
+        for sql, value in cases:
+            for quote in ("'", '"'):
+                token = next(iter(lexer.tokenize(sql.replace("'", quote))))
+                assert token.type == ('QUOTE_STRING' if quote == "'" else 'DQUOTE_STRING')
+                assert token.value == value.replace("'", quote)
+
+    def test_quoted_strings_backslashes(self):
+        # the regex of the rule backtracks exponentially on these strings
+        sql = "select '" + '\\' * 1000 + "a"
+        with pytest.raises(LexError):
+            list(lexer.tokenize(sql))
+
+        sql = "select '" + '\\' * 1000 + "'"
+        tokens = list(lexer.tokenize(sql))
+        assert tokens[1].type == 'QUOTE_STRING'
+        assert tokens[1].value == "'" + '\\' * 1000 + "'"
+
+        sql = "select '" + '\\' * 1001 + "' from t"
+        tokens = list(lexer.tokenize(sql))
+        assert tokens[1].value == "'" + '\\' * 1001 + "'"
+        assert [t.type for t in tokens] == ['SELECT', 'QUOTE_STRING', 'FROM', 'ID']
@@ -132,3 +132,49 @@ b"
         query = parse_sql('select "/*  x */"')
         assert query == expected_query
 
+
+    def test_parse_token_stream(self):
+        from mindsdb_sql_parser import ErrorHandling
+        from mindsdb_sql_parser.lexer import MindsDBLexer
+        from mindsdb_sql_parser.parser import MindsDBParser
+
+        sql = "select a, b from t1 where c = 'x' group by a"
+        lexer, parser = MindsDBLexer(), MindsDBParser()
+        query = parser.parse(lexer.tokenize_compact(sql))
+        assert query == parse_sql(sql)
+        assert parser.used_tokens is None
+
+        # error message is the same as for the parsing of the token iterator
+        sql = "select a, from t1"
+        lexer, parser = MindsDBLexer(), MindsDBParser()
+        assert parser.parse(lexer.tokenize_compact(sql)) is None
+        message = ErrorHandling(lexer, parser).process()
+
+        with pytest.raises(ParsingException) as excinfo:
+            parse_sql(sql)
+        assert str(excinfo.value) == message
+
+    def test_error_suggestions(self):
+        # candidates are filtered by the rest of the query
+        with pytest.raises(ParsingException) as excinfo:
+            parse_sql('CREATE my_view ( SELECT * FROM pred )')
+        assert str(excinfo.value).endswith('Possible inputs: "JOB", "TABLE", "VIEW"')
+
+        # grammar rules are not called for the candidates
+        with pytest.raises(ParsingException) as excinfo:
+            parse_sql("ALTER DATABASE db PARAMETERS = {'A': 1, 'B': }")
+        assert str(excinfo.value).endswith('Possible inputs: "[string]", "FALSE", "[number]", "NULL", "TRUE"')
+
+    def test_recognize(self):
+        from mindsdb_sql_parser.lexer import MindsDBLexer
+        from mindsdb_sql_parser.parser import MindsDBParser
+
+        parser = MindsDBParser()
+        tokens = list(MindsDBLexer().tokenize('select a from t1 where b = 1'))
+        assert parser.recognize(tokens + [None]) is True
+        assert parser.recognize(tokens[:-1] + [None]) is None
+
+        # continue from the states
+        states = parser.recognize(tokens[:3])
+        assert parser.recognize(tokens[3:] + [None], states) is True
+        assert parser.recognize(tokens[3:] + [None], states) is True
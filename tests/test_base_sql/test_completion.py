@@ -0,0 +1,61 @@
+from mindsdb_sql_parser import complete, ParseSession
+
+
+class TestCompletion:
+    def test_keywords(self):
+        completion = complete('select a from t1 wh')
+        assert completion.prefix == 'wh'
+        assert completion.expected == ['[identifier]', 'WHERE']
+        assert (completion.statement, completion.clause) == ('SELECT', 'FROM')
+
+        completion = complete('select a from t1 group by a ')
+        assert 'ORDER BY' in completion.expected
+        assert 'HAVING' in completion.expected
+
+        completion = complete('')
+        assert 'SELECT' in completion.expected and 'CREATE' in completion.expected
+
+    def test_keyword_identifiers(self):
+        # keywords which are identifiers are not listed with identifier
+        expected = complete('select ').expected
+        assert 'CHARACTER' not in expected
+        # names of functions are listed after the other values
+        assert expected[-3:] == ['FULL', 'LEFT', 'RIGHT']
+
+        # they are keywords of join too
+        expected = complete('select a from t1 ').expected
+        assert {'JOIN', 'LEFT', 'RIGHT', 'FULL'} <= set(expected)
+        assert expected.index('LEFT') > expected.index('[identifier]')
+
+    def test_context(self):
+        completion = complete('create knowledge_base kb using ')
+        assert (completion.statement, completion.clause) == ('CREATE KNOWLEDGE_BASE', 'USING')
+        assert '[identifier]' in completion.expected
+
+        completion = complete('select * from (select a from t1 where ')
+        assert (completion.statement, completion.clause) == ('SELECT', 'WHERE')
+        assert {'[identifier]', '[number]', '[string]', 'NOT'} <= set(completion.expected)
+
+        completion = complete('update t1 set ')
+        assert (completion.statement, completion.clause) == ('UPDATE', 'SET')
+
+        # the last statement of the script
+        completion = complete('select 1; select a fr')
+        assert completion.expected == ['FROM', '[identifier]']
+
+    def test_cursor(self):
+        sql = "select a from t1 where b = 'x' -- comment"
+        assert complete(sql, sql.index('a from')).expected == complete('select ').expected
+        assert complete(sql, sql.index('x')).expected == []
+        assert complete(sql, sql.index('comment')).expected == []
+        assert complete('select a /* comment ').expected == []
+
+        # syntax error before the cursor
+        assert complete('select from from ').expected == []
+
+    def test_session(self):
+        sql = "select a, b from db.t1 as t where t.c = 'x' and d in (1, 2) order by a limit 5 /* end */"
+        session = ParseSession(sql, checkpoint_interval=4)
+        session.parse()
+        for cursor in range(len(sql) + 1):
+            assert session.complete(cursor) == complete(sql, cursor)
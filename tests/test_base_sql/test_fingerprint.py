@@ -0,0 +1,31 @@
+from mindsdb_sql_parser import fingerprint
+
+
+class TestFingerprint:
+    def test_literals(self):
+        sql = ("select a, count(*) from db.t1 where x = 1 and y in (1, 2.5, 'c') and z not in (2) "
+               "and w in (select 1) -- comment\n group   by a limit 10;")
+        fp = fingerprint(sql)
+        assert fp.template == (
+            'SELECT a, count (*) FROM db.t1 WHERE x = ? AND y IN (...) AND z NOT IN (...) '
+            'AND w IN (SELECT ?) GROUP BY a LIMIT ?'
+        )
+        assert fp.literals == [1, (1, 2.5, 'c'), (2,), 1, 10]
+
+        # the same template for other values
+        fp2 = fingerprint("SELECT a, COUNT(*) FROM db.t1 WHERE x = 2 AND y IN (3, 4) AND z NOT IN ('x', 'y') "
+                          "AND w IN (SELECT 5) GROUP BY a LIMIT 1")
+        assert fp2.template != fp.template  # function name is not changed
+        assert fingerprint(sql.replace('count', 'COUNT').replace("'c'", "'d', 3")).hash == fp2.hash
+
+    def test_names(self):
+        fp = fingerprint("SELECT @var, @@sys, :p, \"dq\", `Id` FROM t WHERE a = -1.5 and b = 'it''s'")
+        assert fp.template == 'SELECT @var, @@sys, :p, "dq", `Id` FROM t WHERE a = - ? AND b = ?'
+        assert fp.literals == [1.5, "it's"]
+
+    def test_hash(self):
+        fp = fingerprint('select 1')
+        assert fp.template == 'SELECT ?'
+        assert fp.hash == fingerprint('SELECT   2 ;').hash
+        assert fp.hash != fingerprint('select a').hash
+        assert len(fp.hash) == 16
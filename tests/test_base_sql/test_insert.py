@@ -1,6 +1,7 @@
 import pytest
 
 from mindsdb_sql_parser import parse_sql
+from mindsdb_sql_parser.exceptions import ParsingException
 from mindsdb_sql_parser.ast import *
 
 
@@ -73,6 +74,79 @@ class TestInsert:
         assert str(ast).lower() == sql.lower()
         assert ast.to_tree() == expected_ast.to_tree()
 
+    def test_insert_plain_values(self):
+        sql = "INSERT INTO tbl_name(a, b, c) VALUES (1, -2.5, 'x'), (-4, 5.0, NULL), (7, 8.25, 'it''s');"
+        expected_ast = Insert(
+            table=Identifier('tbl_name'),
+            columns=[Identifier('a'), Identifier('b'), Identifier('c')],
+            values=[
+                [Constant(1), Constant(-2.5), Constant('x')],
+                [Constant(-4), Constant(5.0), NullConstant()],
+                [Constant(7), Constant(8.25), Constant("it's")],
+            ]
+        )
+
+        ast = parse_sql(sql)
+        assert ast.is_plain
+        assert ast.to_tree() == expected_ast.to_tree()
+        assert str(ast) == str(expected_ast)
+        assert type(ast.values[1][2]) is NullConstant
+
+        ast = parse_sql(sql, columnar=True)
+        assert isinstance(ast.values, ColumnarValues)
+        assert ast.to_tree() == expected_ast.to_tree()
+        assert str(ast) == str(expected_ast)
+
+        values = ast.values
+        assert len(values) == 3
+        assert list(values.rows()) == [(1, -2.5, 'x'), (-4, 5.0, None), (7, 8.25, "it's")]
+        assert values.columns[0].typecode == 'q'
+        assert values.columns[1].typecode == 'd'
+        assert values.columns[2] == ['x', None, "it's"]
+        assert values[2][2].value == "it's"
+        assert [row[0].value for row in values[1:]] == [-4, 7]
+
+        # not only literals
+        for sql in (
+            "INSERT INTO tbl_name VALUES (1, 2), (3, 2 + 2)",
+            "INSERT INTO tbl_name VALUES (1, 2), (3)",
+        ):
+            ast = parse_sql(sql, columnar=True)
+            assert not ast.is_plain
+            assert isinstance(ast.values, list)
+
+    def test_insert_plain_values_rows(self):
+        from mindsdb_sql_parser.lexer import MindsDBLexer
+        from mindsdb_sql_parser.parser import MindsDBParser
+
+        # every row is checked: the result is the same as the result of the parser
+        for sql in (
+            'INSERT INTO tbl_name VALUES (1, 2), (3, "x"), (-4, NULL), (5, TRUE), (6, "y")',
+            "INSERT INTO tbl_name VALUES ('a', 1.5), ('b', -2.5), (NULL, 1)",
+        ):
+            ast = parse_sql(sql)
+            assert ast.is_plain
+            assert ast == MindsDBParser().parse(MindsDBLexer().tokenize(sql))
+
+        # malformed rows after the first one
+        for sql in (
+            "INSERT INTO tbl_name VALUES (1, 2), (3 4)",
+            "INSERT INTO tbl_name VALUES (1, 2), (3, 4,)",
+            "INSERT INTO tbl_name VALUES (1, 2), (3, 4) (5, 6)",
+            "INSERT INTO tbl_name VALUES (1, 2), (3, 4))",
+            "INSERT INTO tbl_name VALUES (1, 2), ()",
+            "INSERT INTO tbl_name VALUES (1, 2), (3, 4),",
+        ):
+            with pytest.raises(ParsingException):
+                parse_sql(sql)
+        for sql in (
+            "INSERT INTO tbl_name VALUES (1, 2), (3, a)",
+            "INSERT INTO tbl_name VALUES (1, 2), (3, -a)",
+        ):
+            ast = parse_sql(sql)
+            assert not ast.is_plain
+            assert ast == MindsDBParser().parse(MindsDBLexer().tokenize(sql))
+
 class TestInsertMDB:
 
     def test_insert_from_union(self):
@@ -0,0 +1,113 @@
+import pytest
+
+from mindsdb_sql_parser import parse_sql, ParseCache, TemplateParseCache
+from mindsdb_sql_parser.exceptions import ParsingException
+from mindsdb_sql_parser.ast import *
+
+
+class TestParseCache:
+    def test_hits(self):
+        cache = ParseCache()
+        sql = 'select a, b from t1 where c = 1'
+
+        query = cache.parse_sql(sql)
+        assert query == parse_sql(sql)
+        assert cache.stats() == {'entries': 1, 'bytes': cache.nbytes, 'hits': 0, 'misses': 1, 'evictions': 0}
+
+        # cached query is not changed by the caller
+        query.where = None
+        query.targets.append(Identifier('x'))
+
+        query2 = cache.parse_sql(sql)
+        assert query2 == parse_sql(sql)
+        assert query2 is not cache.parse_sql(sql)
+        assert cache.hits == 2
+
+        # dialect is a part of the key
+        cache.parse_sql(sql, dialect='mysql')
+        assert cache.misses == 2 and len(cache) == 2
+
+    def test_errors(self):
+        cache = ParseCache()
+        for _ in range(2):
+            with pytest.raises(ParsingException):
+                cache.parse_sql('select * from')
+        assert cache.misses == 2 and len(cache) == 0
+
+    def test_eviction(self):
+        cache = ParseCache(max_entries=2)
+        cache.parse_sql('select 1')
+        cache.parse_sql('select 2')
+        cache.parse_sql('select 1')
+        cache.parse_sql('select 3')
+
+        # least recently used is evicted
+        assert cache.evictions == 1
+        cache.parse_sql('select 1')
+        cache.parse_sql('select 3')
+        assert cache.hits == 3
+        cache.parse_sql('select 2')
+        assert cache.misses == 4
+
+        size = cache.nbytes
+        cache = ParseCache(max_bytes=size // 2 + 1)
+        cache.parse_sql('select 1')
+        cache.parse_sql('select 3')
+        assert len(cache) == 1 and cache.evictions == 1
+        assert cache.nbytes <= cache.max_bytes
+
+        cache.clear()
+        assert len(cache) == 0 and cache.nbytes == 0
+
+
+class TestTemplateParseCache:
+    def test_hits(self):
+        cache = TemplateParseCache()
+        template = "select a, b from t1 where c = {} and d > -{} and e <> {} limit {}"
+        values = [(1, 2.5, "'x'", 10), (7, 0.25, "'it''s'", 3), (0, 1000.0, "''", 1)]
+
+        for value in values:
+            sql = template.format(*value)
+            assert parse_sql(sql).where.args[0].args[1].args[1].value == -value[1]
+            query = cache.parse_sql(sql)
+            assert query == parse_sql(sql)
+            # the same values of literals are not mixed up
+            query.where = None
+
+        assert cache.stats() == {
+            'entries': 1, 'bytes': cache.nbytes, 'hits': 2, 'misses': 1, 'evictions': 0, 'fallbacks': 0
+        }
+
+        # different text between literals
+        cache.parse_sql('select a, b from t1 where c = 1 and d > -2.5 and e <> 3 limit 10')
+        cache.parse_sql('SELECT a, b from t1 where c = 1 and d > -2.5 and e <> \'x\' limit 10')
+        assert cache.misses == 3
+
+    def test_fallback(self):
+        cache = TemplateParseCache()
+        for value in range(3):
+            # literal inside the text of the nested query
+            sql = f'create view v1 from db (select {value})'
+            query = cache.parse_sql(sql)
+            assert query == parse_sql(sql)
+            assert query.query_str == f'select {value}'
+        assert cache.stats()['fallbacks'] == 2
+
+    def test_value_dependent_literal(self):
+        cache = TemplateParseCache()
+        # alias is split by dots: it is not lifted
+        for sql in ("select a as 'x', 1 from t", "select a as 'x.y', 2 from t",
+                    "select a as 'x', 3 from t", "select a as 'x.y', 4 from t"):
+            query = cache.parse_sql(sql)
+            assert query == parse_sql(sql)
+            assert str(query) == str(parse_sql(sql))
+        assert cache.stats()['misses'] == 1
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['fallbacks'] == 2
+
+    def test_errors(self):
+        cache = TemplateParseCache()
+        for sql in ('select * from t where a = 1 and', 'select ¤'):
+            with pytest.raises(Exception):
+                cache.parse_sql(sql)
+        assert len(cache) == 0
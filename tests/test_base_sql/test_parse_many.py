@@ -0,0 +1,55 @@
+import pickle
+
+from sly.lex import LexError
+
+from mindsdb_sql_parser import parse_sql, parse_many
+from mindsdb_sql_parser.exceptions import ParsingException
+
+
+class TestParseMany:
+    sqls = [
+        'select a, b from t1 where c = 1',
+        'select * from',
+        "insert into t2 (a, b) values (1, 'x'), (2, 'y')",
+        'select ¤',
+        'create view v1 from db (select 1)',
+    ] * 5
+
+    def check(self, results):
+        assert sorted(index for _, index in results) == list(range(len(self.sqls)))
+        for query, index in results:
+            sql = self.sqls[index]
+            if index % 5 == 1:
+                assert isinstance(query, ParsingException)
+            elif index % 5 == 3:
+                assert isinstance(query, LexError)
+                assert query.error_index == 7
+            else:
+                assert query == parse_sql(sql)
+
+    def test_ordered(self):
+        results = list(parse_many(self.sqls, workers=2, chunksize=3))
+        assert [index for _, index in results] == list(range(len(self.sqls)))
+        self.check(results)
+
+    def test_unordered(self):
+        # iterable is consumed lazily
+        results = list(parse_many(iter(self.sqls), workers=2, chunksize=4, ordered=False))
+        self.check(results)
+
+    def test_lex_error_pickle(self):
+        error = LexError('message', 'text', 1)
+        error2 = pickle.loads(pickle.dumps(error))
+        assert (str(error2), error2.text, error2.error_index) == ('message', 'text', 1)
+
+    def test_deep_tree(self):
+        # the trees which can't be pickled by the worker are parsed again by the caller
+        sqls = [
+            'select * from t1 where ' + ' or '.join(f'a = {i}' for i in range(500)),
+            ' union all '.join(f'select {i}' for i in range(500)),
+            'select 1',
+        ]
+        results = list(parse_many(sqls, workers=2, chunksize=2))
+        assert [index for _, index in results] == [0, 1, 2]
+        for query, index in results:
+            assert query == parse_sql(sqls[index])
@@ -0,0 +1,99 @@
+import io
+import mmap
+
+import pytest
+
+from sly.lex import LexError
+
+from mindsdb_sql_parser import parse_sql, parse_script
+from mindsdb_sql_parser.exceptions import ParsingException
+
+from mindsdb_sql_parser.ast import *
+from mindsdb_sql_parser.ast.mindsdb import *
+
+
+class TestScript:
+    script = (
+        "select 'a;b', \"c;d\" /* ; */ from t1 -- ;\n"
+        ";;\n"
+        "create view v1 from db (select 1; select 2);\n"
+        "select * from t1 wher a = 1;\n"
+        "select `x;y` from t2 where a = 'it\\'s; ok'  ;\n"
+        "insert into t3 (a) values (1)"
+    )
+
+    def check(self, result):
+        statements = [
+            "select 'a;b', \"c;d\" /* ; */ from t1",
+            "create view v1 from db (select 1; select 2)",
+            "select * from t1 wher a = 1",
+            "select `x;y` from t2 where a = 'it\\'s; ok'",
+            "insert into t3 (a) values (1)",
+        ]
+        assert [self.script[start:end] for _, (start, end) in result] == statements
+
+        for (ast, _), sql in zip(result, statements):
+            if isinstance(ast, Exception):
+                with pytest.raises(ParsingException) as excinfo:
+                    parse_sql(sql)
+                assert str(ast) == str(excinfo.value)
+            else:
+                assert ast == parse_sql(sql)
+
+        assert isinstance(result[2][0], ParsingException)
+        assert isinstance(result[1][0], CreateView)
+        assert result[1][0].query_str == 'select 1; select 2'
+
+    def test_string(self):
+        self.check(list(parse_script(self.script)))
+
+    def test_file(self):
+        # the statements are split between the chunks
+        for chunk_size in (1, 5, 100):
+            self.check(list(parse_script(io.StringIO(self.script), chunk_size=chunk_size)))
+            self.check(list(parse_script(io.BytesIO(self.script.encode()), chunk_size=chunk_size)))
+
+    def test_mmap(self, tmp_path):
+        path = tmp_path / 'script.sql'
+        path.write_bytes(self.script.encode())
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            self.check(list(parse_script(mm, chunk_size=16)))
+
+    def test_plain_insert(self):
+        # statements are parsed as by parse_sql
+        result = list(parse_script("insert into t1 (a) values (1), (2); insert into t2 select 1"))
+        assert result[0][0].is_plain and not result[1][0].is_plain
+        for ast, (start, end) in result:
+            assert ast.is_plain == parse_sql(ast.to_string()).is_plain
+
+    def test_byte_offsets(self):
+        script = "select 'ÿ€'; select '😀' from t1;\nselect 1"
+        data = script.encode()
+        statements = ["select 'ÿ€'", "select '😀' from t1", "select 1"]
+        for chunk_size in (1, 7, 100):
+            # offsets of bytes in the binary source
+            result = list(parse_script(io.BytesIO(data), chunk_size=chunk_size))
+            assert [data[start:end].decode() for _, (start, end) in result] == statements
+
+            result = list(parse_script(io.StringIO(script), chunk_size=chunk_size))
+            assert [script[start:end] for _, (start, end) in result] == statements
+
+    def test_lexer_error(self):
+        result = list(parse_script("select 1; select ¤; select 2"))
+        assert [type(ast) for ast, _ in result] == [Select, LexError, Select]
+
+    def test_unterminated(self):
+        # the quote is not a string: semicolon after it is a delimiter
+        result = list(parse_script(io.StringIO("select 1; select 'a; select 2"), chunk_size=4))
+        assert [type(ast) for ast, _ in result] == [Select, LexError, Select]
+        assert [span for _, span in result] == [(0, 8), (10, 19), (21, 29)]
+
+    def test_unbalanced_parenthesis(self):
+        # semicolon in parentheses ends the statement if it is not a part of raw query
+        script = "select 1; select (2; select 3; create view v1 from db (select 4; select (5)); select 6"
+        for source in (script, io.StringIO(script)):
+            result = list(parse_script(source, chunk_size=4))
+            assert [type(ast) for ast, _ in result] == [Select, ParsingException, Select, CreateView, Select]
+            assert [script[start:end] for _, (start, end) in result] == [
+                'select 1', 'select (2', 'select 3', 'create view v1 from db (select 4; select (5))', 'select 6'
+            ]
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from sly.lex import LexError
+
+from mindsdb_sql_parser import parse_sql, ParseSession
+from mindsdb_sql_parser.exceptions import ParsingException
+from mindsdb_sql_parser.ast import *
+
+
+def outcome(func):
+    try:
+        query = func()
+    except (ParsingException, LexError) as e:
+        return type(e), str(e)
+    return query.to_tree(), str(query)
+
+
+class TestParseSession:
+    view = 'create view v1 from db (\n' + 'select a, sum(b) from t where c = \'x\' group by a\nunion all\n' * 50 + 'select 1\n)'
+
+    def test_edits(self):
+        session = ParseSession(self.view, checkpoint_interval=16)
+        assert session.parse() == parse_sql(self.view)
+
+        # edit at the end: the beginning is not parsed again
+        offset = self.view.rindex('select 1')
+        session.edit(offset + 7, 1, '2')
+        query = session.parse()
+        assert query.query_str.endswith('select 2')
+        assert query == parse_sql(session.text)
+        assert session.relexed < 5
+        assert session.reparsed < 20
+
+        # error in the middle and its fix
+        session.edit(100, 0, ')')
+        with pytest.raises(ParsingException) as excinfo:
+            session.parse()
+        with pytest.raises(ParsingException) as excinfo2:
+            parse_sql(session.text)
+        assert str(excinfo.value) == str(excinfo2.value)
+
+        session.edit(100, 1, '')
+        assert session.parse() == parse_sql(session.text)
+
+    def test_comments(self):
+        # the end of the comment changes the tokens before the edit
+        sql = 'select a /* b from t1 where c = 1'
+        session = ParseSession(sql, checkpoint_interval=2)
+        outcome(session.parse)
+        session.edit(len(sql), 0, ' */ from t2')
+        assert session.parse() == parse_sql('select a from t2')
+
+    def test_lexer_error(self):
+        session = ParseSession('select a from t1')
+        session.parse()
+        session.edit(7, 0, '¤')
+        with pytest.raises(LexError):
+            session.parse()
+        session.edit(7, 1, '')
+        assert session.parse() == Select(targets=[Identifier('a')], from_table=Identifier('t1'))
+
+        with pytest.raises(ValueError):
+            session.edit(10, 20, '')
+
+    def test_random_edits(self):
+        rnd = random.Random(1)
+        snippets = [' ', '\n', 'a', '1', ',', '(', ')', "'", 'select', ' from ', 'where', '/*', '*/', '--', ';', 'group by']
+        for sql in (self.view, "select a, b from db.t1 as t where t.c = 'x' and d in (1, 2) order by a limit 5;"):
+            session = ParseSession(sql, checkpoint_interval=4)
+            for _ in range(100):
+                offset = rnd.randrange(len(sql) + 1)
+                length = min(rnd.randint(0, 3), len(sql) - offset)
+                text = rnd.choice(snippets)
+                sql = sql[:offset] + text + sql[offset + length:]
+                session.edit(offset, length, text)
+
+                assert outcome(session.parse) == outcome(lambda: parse_sql(sql))
@@ -0,0 +1,88 @@
+from mindsdb_sql_parser import (
+    StatementBuffer, statement_status, is_complete, parse_sql, COMPLETE, INCOMPLETE, INVALID
+)
+
+
+class TestStatementBuffer:
+    def test_status(self):
+        assert is_complete('select 1')
+        assert is_complete('select 1;')
+        assert is_complete("select a from t where b = 'x' -- comment")
+
+        for sql in (
+            '', 'select', 'select (1', "select 'abc", 'select `a', 'select 1 /* comment',
+            'select a from t where', 'select * from t order by', 'create view v1 from db (select 1;',
+            'select 1 /* ¤',
+        ):
+            assert statement_status(sql) == INCOMPLETE, sql
+
+        for sql in ('select from from', 'select 1 #', 'select 1; select 2', 'select 1 from;'):
+            assert statement_status(sql) == INVALID, sql
+
+    def test_continued_tokens(self):
+        # the last words can be changed by the next chunk
+        assert statement_status('select a from t order b') == INCOMPLETE
+        assert statement_status('select a from t group ') == COMPLETE
+        assert statement_status('create view if not ex') == INCOMPLETE
+        assert statement_status('select @') == INCOMPLETE
+        assert statement_status('select a from t where a !') == INCOMPLETE
+
+    def test_chunks(self):
+        sql = """
+            select a, b /* comment; */ from db.t1
+            where c = 'x;' and d in (1, 2) -- comment
+            group by a order by b;
+        """
+        for size in (1, 2, 5, 17):
+            buffer = StatementBuffer()
+            for i in range(0, len(sql), size):
+                status = buffer.feed(sql[i:i + size])
+                assert status == statement_status(sql[:i + size])
+            assert status == COMPLETE
+            assert buffer.text == sql
+
+        parse_sql(buffer.text)
+
+        buffer.clear()
+        assert buffer.feed('select 1 from') == INCOMPLETE
+        assert buffer.feed(' t1 a') == COMPLETE
+        assert buffer.feed(' b c') == INVALID
+        assert buffer.feed(' d') == INVALID
+
+    def test_escaped_quote(self):
+        # the chunk ends inside the string: 'it\' is a string till the next quote is received
+        lines = ["insert into t values ('it\\'s a\n", "multi line\n", "text');\n"]
+        buffer = StatementBuffer()
+        assert [buffer.feed(line) for line in lines] == [INCOMPLETE, INCOMPLETE, COMPLETE]
+        parse_sql(buffer.text)
+
+        buffer = StatementBuffer()
+        assert buffer.feed("SELECT 'women\\'s s") == statement_status("SELECT 'women\\'s s")
+        assert buffer.feed("occer' from t1 where") == INCOMPLETE
+        assert buffer.feed(" a = 1") == COMPLETE
+        assert parse_sql(buffer.text).targets[0].value == "women's soccer"
+
+        for sql in (
+            "select 'it\\'s', \"a\\\" b\" from t1 where a = 'x\\\\' and b = 'y\\'' -- ;\n",
+            "insert into t values ('a\\'b\\'c', 1), (\"d\\\"\", 2);",
+        ):
+            for size in (1, 3, 7):
+                buffer = StatementBuffer()
+                for i in range(0, len(sql), size):
+                    assert buffer.feed(sql[i:i + size]) == statement_status(sql[:i + size]), sql[:i + size]
+                assert buffer.status == COMPLETE
+
+    def test_long_input(self):
+        # processed tokens are not kept in the buffer
+        buffer = StatementBuffer()
+        buffer.feed('insert into t (a, b) values ')
+        for i in range(1000):
+            assert buffer.feed(f"({i}, 'x'), ") == INCOMPLETE
+        assert len(buffer._tail) < 100
+        assert buffer.feed('(0, "y")') == COMPLETE
+
+        buffer = StatementBuffer()
+        buffer.feed("select '")
+        for i in range(1000):
+            assert buffer.feed('a b ') == INCOMPLETE
+        assert buffer.feed("'") == COMPLETE
@@ -0,0 +1,173 @@
+from mindsdb_sql_parser import parse_sql
+from mindsdb_sql_parser.ast import *
+
+
+class TestVisitor:
+    def test_walk(self):
+        ast = parse_sql('select a, f(b) from t1 where x = 1')
+        nodes = [type(node).__name__ for node in walk(ast)]
+        assert nodes == ['Select', 'Identifier', 'Function', 'Identifier', 'Identifier',
+                         'BinaryOperation', 'Identifier', 'Constant']
+
+        nodes = [type(node).__name__ for node in walk(ast, postorder=True)]
+        assert nodes == ['Identifier', 'Identifier', 'Function', 'Identifier',
+                         'Identifier', 'Constant', 'BinaryOperation', 'Select']
+
+        # columns of the outer query
+        ast = parse_sql('select a from t1 where b in (select c from t2 where d = 1)')
+        columns = [
+            node.parts[-1] for node in walk(ast, prune=lambda node: isinstance(node, Select) and node is not ast)
+            if isinstance(node, Identifier)
+        ]
+        assert columns == ['a', 't1', 'b']
+
+    def test_iter_children(self):
+        ast = parse_sql("select case when a = 1 then 'x' else 'y' end from t1")
+        case = ast.targets[0]
+        children = [(type(child).__name__, name, index) for child, name, index in iter_children(case)]
+        assert children == [
+            ('BinaryOperation', 'rules', (0, 0)),
+            ('Constant', 'rules', (0, 1)),
+            ('Constant', 'default', ()),
+        ]
+
+    def test_visitor(self):
+        class Columns(Visitor):
+            def __init__(self):
+                super().__init__()
+                self.columns = []
+                self.operations = []
+
+            def enter_Identifier(self, node):
+                if not isinstance(self.parent, Select) or self.path[-1][1] != 'from_table':
+                    self.columns.append('.'.join(node.parts))
+
+            def enter_Operation(self, node):
+                self.operations.append(node.op)
+
+            def enter_Select(self, node):
+                if self.path[0][0] is not node:
+                    return self.SKIP
+
+        visitor = Columns()
+        visitor.visit(parse_sql('select t1.a, sum(b) from t1 where c > 1 and d in (select e from t2)'))
+        assert visitor.columns == ['t1.a', 'b', 'c', 'd']
+        assert visitor.operations == ['sum', 'and', '>', 'in']
+        assert visitor.path == []
+
+    def test_deep_tree(self):
+        where = Identifier('a')
+        for i in range(10000):
+            where = BinaryOperation(op='or', args=[where, Constant(i)])
+        ast = Select(targets=[Star()], where=where)
+
+        assert sum(1 for _ in walk(ast)) == 20003
+
+        class Depth(Visitor):
+            depth = 0
+
+            def enter_node(self, node):
+                self.depth = max(self.depth, len(self.path))
+
+        visitor = Depth()
+        visitor.visit(ast)
+        assert visitor.depth == 10002
+
+    def test_transformer(self):
+        # parameters are replaced by the values
+        class Parameters(Transformer):
+            def __init__(self, values):
+                super().__init__()
+                self.values = values
+
+            def leave_Parameter(self, node):
+                return Constant(self.values.pop(0))
+
+        ast = parse_sql('select a from t1 where b = ? and c in (select d from t2 where e > ?)')
+        select = ast.where.args[1].args[1]
+        transformer = Parameters([1, 2])
+        assert transformer.visit(ast) is ast
+        assert str(ast) == 'SELECT a FROM t1 WHERE b = 1 AND c IN (SELECT d FROM t2 WHERE e > 2)'
+        assert len(transformer.replaced) == 2
+        assert transformer.is_changed(ast) and transformer.is_changed(select)
+        assert not transformer.is_changed(ast.targets[0])
+        assert not transformer.is_changed(select.from_table)
+
+        # names of tables are changed in place
+        class Tables(Transformer):
+            def leave_Select(self, node):
+                if isinstance(node.from_table, Identifier) and len(node.from_table.parts) == 1:
+                    table = node.from_table
+                    node.from_table = Identifier(parts=['proj', *table.parts], alias=table.alias)
+                    return node
+
+        ast = parse_sql('select a from t1 join (select b from t2) as x')
+        transformer = Tables()
+        transformer.visit(ast)
+        assert str(ast) == 'SELECT a FROM t1 JOIN (SELECT b FROM proj.t2) AS x'
+        assert transformer.is_changed(ast.from_table) and transformer.is_changed(ast)
+        assert not transformer.is_changed(ast.from_table.left)
+        assert transformer.replaced == []
+
+    def test_transformer_tuple_root(self):
+        class Swap(Transformer):
+            def leave_Constant(self, node):
+                return Constant(node.value * 10)
+
+            def leave_Select(self, node):
+                return Union(left=node, right=Select(targets=[Constant(0)]))
+
+        args = (Identifier('a'), Constant(1))
+        ast = Select(targets=[Star()], where=BinaryOperation(op='=', args=args))
+        ast.where.args = args
+        root = Swap().visit(ast)
+        assert isinstance(root, Union) and root.left is ast
+        assert ast.where.args is not args
+        assert isinstance(ast.where.args, type(args))
+        assert ast.where.args[1].value == 10
+        assert str(root) == 'SELECT * WHERE a = 10\nUNION\nSELECT 0'
+
+    def test_flatten(self):
+        sql = 'SELECT a || b || c AS x FROM t WHERE a = 1 AND b = 2 AND c = 3 OR (d = 4 OR e = 5) OR f = 6'
+        ast = parse_sql(sql, flatten=True)
+        assert str(ast) == sql
+        where = ast.where
+        assert where.op == 'or' and len(where.args) == 3
+        assert where.args[0].op == 'and' and len(where.args[0].args) == 3
+        # in parentheses
+        assert where.args[1].parentheses and len(where.args[1].args) == 2
+        assert ast.targets[0].op == '||' and len(ast.targets[0].args) == 3
+        assert parse_sql(sql, flatten=True) == ast
+        assert ast != parse_sql(sql)
+
+        sql = 'SELECT 1\nUNION ALL\nSELECT 2\nUNION ALL\nSELECT 3\nUNION\nSELECT 4\nEXCEPT\nSELECT 5'
+        ast = parse_sql(sql)
+        assert flatten(ast) is ast
+        assert str(ast) == sql
+        assert isinstance(ast, Except) and ast.queries is None
+        union = ast.left
+        # two queries: not changed
+        assert union.unique and union.queries is None
+        assert not union.left.unique and union.left.left is None and union.left.right is None
+        assert [str(query) for query in union.left.queries] == ['SELECT 1', 'SELECT 2', 'SELECT 3']
+
+        ast = Union(queries=[Select(targets=[Constant(i)]) for i in range(3)], unique=False, alias=Identifier('x'))
+        assert str(ast) == '(SELECT 0\nUNION ALL\nSELECT 1\nUNION ALL\nSELECT 2) AS x'
+
+    def test_flatten_deep_tree(self):
+        query = Select(targets=[Constant(0)], from_table=Identifier('t'))
+        for i in range(1, 10000):
+            right = Select(targets=[Constant(i)], from_table=Identifier('t'))
+            query = Union(left=query, right=right, unique=False)
+        where = Identifier('a')
+        for i in range(10000):
+            where = BinaryOperation(op='or', args=[where, Constant(i)])
+        query.right.where = where
+        sql = str(query)
+
+        flatten(query)
+        assert len(query.queries) == 10000
+        assert len(query.queries[-1].where.args) == 10001
+        assert str(query) == sql
+        assert query.copy() == query
+        assert query.to_tree()
@@ -2,6 +2,7 @@ from mindsdb_sql_parser import parse_sql
 from mindsdb_sql_parser.ast.mindsdb import *
 from mindsdb_sql_parser.ast import *
 from mindsdb_sql_parser.lexer import MindsDBLexer
+from mindsdb_sql_parser.parser import MindsDBParser
 
 class TestViews:
     def test_create_view_lexer(self):
@@ -100,6 +101,25 @@ class TestViews:
         assert ast.query_str == 'select * from tbl'
         assert ast.using == {'param1': 'value1', 'param2': 123}
 
+    def test_view_query_source_text(self):
+        """Body of the view is the exact text of the query"""
+        query_str = (
+            "select a,\tb -- comment ()\n"
+            "  from tbl /* ( */ where x = 'it''s )'\r\n"
+            "  and y in (select max(c) from t2)"
+        )
+        sql = f'create view v1 from integration (\n{query_str});'
+
+        assert parse_sql(sql).query_str == query_str
+
+        # the same from tokens without the text
+        parser = MindsDBParser()
+        ast = parser.parse(MindsDBLexer().tokenize(f'create view v1 from integration ({query_str})'))
+        assert ast.query_str.split() == [
+            'select', 'a,', 'b', 'from', 'tbl', 'where', 'x', '=', "'it''s", ")'",
+            'and', 'y', 'in', '(select', 'max(c)', 'from', 't2)',
+        ]
+
     # def test_create_dataset_full(self):
     #     sql = "CREATE DATASET my_view FROM integr AS ( SELECT * FROM pred )"
     #     ast = parse_sql(sql)
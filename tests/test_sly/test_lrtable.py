@@ -0,0 +1,177 @@
+import os
+import sys
+import tempfile
+
+from sly import Lexer, Parser
+from sly.yacc import read_lrtable, write_lrtable, write_module
+
+
+class CalcLexer(Lexer):
+    tokens = {NUMBER, PLUS, TIMES, LPAREN, RPAREN}
+    ignore = ' '
+
+    NUMBER = r'\d+'
+    PLUS = r'\+'
+    TIMES = r'\*'
+    LPAREN = r'\('
+    RPAREN = r'\)'
+
+
+def make_parser(directory, with_parens=True, module=None):
+
+    class CalcParser(Parser):
+        tokens = CalcLexer.tokens
+        cache_dir = directory
+        generated_module = module
+        precedence = (
+            ('left', PLUS),
+            ('left', TIMES),
+        )
+
+        @_('expr PLUS expr',
+           'expr TIMES expr')
+        def expr(self, p):
+            if p[1] == '+':
+                return p.expr0 + p.expr1
+            return p.expr0 * p.expr1
+
+        if with_parens:
+            @_('LPAREN expr RPAREN')
+            def expr(self, p):
+                return p.expr
+
+        @_('NUMBER')
+        def expr(self, p):
+            return int(p.NUMBER)
+
+    return CalcParser
+
+
+def calc(parser_cls, text):
+    return parser_cls().parse(CalcLexer().tokenize(text))
+
+
+class TestLRTable:
+    def test_cache_is_reused(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            parser_cls = make_parser(cache_dir)
+            # tables were built and saved
+            assert parser_cls._lrtable.state_descriptions
+            assert os.path.exists(parser_cls._get_cache_file())
+
+            # tables are loaded without grammar analysis
+            cached_cls = make_parser(cache_dir)
+            assert not cached_cls._lrtable.state_descriptions
+
+            assert calc(parser_cls, '2 + 3 * (4 + 1)') == 17
+            assert calc(cached_cls, '2 + 3 * (4 + 1)') == 17
+            # the parser uses only packed tables
+            assert cached_cls._lrtable._lr_action is None
+
+    def test_cache_is_pruned(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = make_parser(cache_dir)._get_cache_file()
+            other = os.path.join(cache_dir, os.path.basename(path).replace('CalcParser', 'OtherParser'))
+            write_lrtable(other, make_parser(cache_dir)._lrtable, '0' * 32)
+
+            # the grammar is changed: the tables of the previous version are removed
+            changed_path = make_parser(cache_dir, with_parens=False)._get_cache_file()
+            assert changed_path != path
+            assert sorted(os.listdir(cache_dir)) == sorted(os.path.basename(p) for p in (changed_path, other))
+
+    def test_load_tables(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            parser_cls = make_parser(cache_dir)
+            path = os.path.join(cache_dir, 'calc.lrtab')
+            write_lrtable(path, parser_cls._lrtable, parser_cls._fingerprint)
+
+            lr_dump = read_lrtable(path, parser_cls._fingerprint)
+            assert lr_dump is not None
+
+            lrtable = type(parser_cls._lrtable)(parser_cls._grammar, lr_dump=lr_dump)
+            assert lrtable.lr_action == parser_cls._lrtable.lr_action
+            assert lrtable.lr_goto == parser_cls._lrtable.lr_goto
+            assert lrtable.defaulted_states == parser_cls._lrtable.defaulted_states
+            # no grammar analysis on load
+            assert not lrtable.state_descriptions
+
+    def test_packed_tables(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            lrtable = make_parser(cache_dir)._lrtable
+            for state, actions in lrtable.lr_action.items():
+                base = lrtable.lr_action_base[state]
+                for name, tid in lrtable.terminal_ids.items():
+                    i = base + tid
+                    if lrtable.lr_action_check[i] == tid:
+                        assert actions[name] == lrtable.lr_action_value[i]
+                    else:
+                        assert name not in actions
+                assert sorted(lrtable.expected_terminals(state)) == sorted(actions)
+
+            for state, gotos in lrtable.lr_goto.items():
+                base = lrtable.lr_goto_base[state]
+                for name, value in gotos.items():
+                    assert lrtable.lr_goto_value[base + lrtable.nonterminal_ids[name]] == value
+
+    def test_token_type_id(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            lrtable = make_parser(cache_dir)._lrtable
+            for token in CalcLexer().tokenize('2 + 3 * (4 + 1)'):
+                assert lrtable.terminal_ids[token.type] == token.type_id
+
+    def test_fingerprint_mismatch(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            parser_cls = make_parser(cache_dir)
+            other_cls = make_parser(cache_dir, with_parens=False)
+            assert parser_cls._fingerprint != other_cls._fingerprint
+
+            # the same grammar has the same fingerprint
+            assert make_parser(cache_dir)._fingerprint == parser_cls._fingerprint
+
+            path = os.path.join(cache_dir, 'calc.lrtab')
+            write_lrtable(path, parser_cls._lrtable, parser_cls._fingerprint)
+            assert read_lrtable(path, other_cls._fingerprint) is None
+
+    def test_damaged_file(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            parser_cls = make_parser(cache_dir)
+            path = os.path.join(cache_dir, 'calc.lrtab')
+            write_lrtable(path, parser_cls._lrtable, parser_cls._fingerprint)
+
+            with open(path, 'rb') as f:
+                data = f.read()
+            with open(path, 'wb') as f:
+                f.write(data[:len(data) // 2])
+
+            assert read_lrtable(path, parser_cls._fingerprint) is None
+            assert read_lrtable(os.path.join(cache_dir, 'missing.lrtab'), parser_cls._fingerprint) is None
+
+
+class TestGeneratedModule:
+    def test_generated_module(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            parser_cls = make_parser(cache_dir)
+            assert parser_cls._reducers is None
+
+            write_module(os.path.join(cache_dir, 'calc_tab.py'), parser_cls._lrtable, parser_cls._fingerprint)
+            sys.path.insert(0, cache_dir)
+            try:
+                generated_cls = make_parser(cache_dir, module='calc_tab')
+                # the same grammar: reduce functions of the module are used
+                assert generated_cls._reducers is not None
+                for text in ('2 + 3 * (4 + 1)', '(1 + 2) * 3', '7'):
+                    assert calc(generated_cls, text) == calc(parser_cls, text)
+
+                # another grammar: generic engine
+                other_cls = make_parser(cache_dir, with_parens=False, module='calc_tab')
+                assert other_cls._reducers is None
+                assert calc(other_cls, '2 + 3 * 4') == 14
+            finally:
+                sys.path.remove(cache_dir)
+                sys.modules.pop('calc_tab', None)
+
+    def test_missing_module(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            parser_cls = make_parser(cache_dir, module='calc_missing_tab')
+            assert parser_cls._reducers is None
+            assert calc(parser_cls, '2 * 3') == 6
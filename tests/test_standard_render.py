@@ -3,6 +3,8 @@ import pkgutil
 import sys
 import os
 import importlib
+import pathlib
+import tempfile
 
 from mindsdb_sql_parser import parse_sql, Parameter, Select
 
@@ -32,25 +34,29 @@ def check_module(module):
                 # skip tests that expected error
                 continue
             sig = inspect.signature(test_method)
-            args = []
-            # add dialect
-            if 'dialect' in sig.parameters:
-                args.append('mindsdb')
-            if 'cat' in sig.parameters:
-                # skip it
+            if set(sig.parameters) - {'dialect', 'tmp_path'}:
+                # skip tests with other fixtures
                 continue
 
-            test_method(*args)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                args = []
+                for name in sig.parameters:
+                    if name == 'dialect':
+                        args.append('mindsdb')
+                    elif name == 'tmp_path':
+                        args.append(pathlib.Path(tmp_dir))
 
+                test_method(*args)
 
-def parse_sql2(sql):
+
+def parse_sql2(sql, **kwargs):
 
     params = []
     def check_param_f(node, **kwargs):
         if isinstance(node, Parameter):
             params.append(node)
 
-    query = parse_sql(sql)
+    query = parse_sql(sql, **kwargs)
 
     if isinstance(query, Select) and isinstance(query.from_table, Parameter):
         # skip queries with params
@@ -60,7 +66,7 @@ def parse_sql2(sql):
     sql2 = query.to_string()
 
     # Parse again
-    query2 = parse_sql(sql2)
+    query2 = parse_sql(sql2, **kwargs)
 
     # compare result from first and second parsing
     assert str(query) == str(query2)